@@ -0,0 +1,509 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import types
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib import pyplot as plt
+from matplotlib.backend_bases import MouseEvent
+import cv2
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from AnnotationSession import AnnotationSession
+from MarkerRenderer import MarkerRenderer
+from Filmstrip import image_extent
+from PointSet import PointSet
+import VideoFrameSelector
+
+# (name, fourcc, container) of the synthetic video encodings. OpenCV's VideoWriter does not expose the GOP
+# length, so it is varied through the codec: MJPG is intra-only and mp4v puts a keyframe every 12 frames.
+# The measured mean keyframe interval is reported with every result.
+VIDEO_CODECS = (('mjpg', 'MJPG', 'avi'), ('mp4v', 'mp4v', 'mp4'))
+FULL_CONFIG = {
+    'resolutions': [(640, 360), (1280, 720), (1920, 1080)],
+    'video_lengths': [300, 1800],
+    'folder_lengths': [100, 1000, 5000],
+    'point_counts': [1, 10, 100, 1000, 5000],
+    'dense_point_counts': [1000, 10000, 50000],
+    'csv_rows': [1000, 10000, 50000],
+    'startup_runs': 10,
+    'samples': 50
+}
+QUICK_CONFIG = {
+    'resolutions': [(640, 360)],
+    'video_lengths': [120],
+    'folder_lengths': [50, 500],
+    'point_counts': [1, 100, 1000],
+    'dense_point_counts': [1000, 10000],
+    'csv_rows': [1000, 10000],
+    'startup_runs': 3,
+    'samples': 20
+}
+# Time from interpreter start until the main window is shown that the startup benchmark checks against. It
+# cannot be measured without a display.
+STARTUP_TARGET_MS = 300
+
+# Run in a fresh interpreter by bench_startup. Prints the milliseconds since interpreter start at which the
+# front end was imported, the window became viewable and the background module loader finished.
+STARTUP_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, sys.argv[1])
+import VideoFrameSelector
+result = {'import_ms': (time.perf_counter() - start) * 1000.0, 'window_ms': None}
+if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+    app = VideoFrameSelector.VideoFrameSelector()
+    while not app.root.winfo_viewable():
+        app.root.update()
+    result['window_ms'] = (time.perf_counter() - start) * 1000.0
+    while app.module_loader.ident is None:
+        app.root.update()
+    app.module_loader.join()
+    app.root.destroy()
+else:
+    VideoFrameSelector.load_modules()
+result['ready_ms'] = (time.perf_counter() - start) * 1000.0
+print(json.dumps(result))
+"""
+
+"""
+Function: summarize
+--------------------------
+Returns the count, mean, median, 95th percentile, minimum and maximum of a list of durations in seconds,
+converted to milliseconds.
+"""
+def summarize(durations):
+    ms = np.asarray(durations, dtype=np.float64) * 1000.0
+    return {
+        'count': int(ms.size),
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'min_ms': float(ms.min()),
+        'max_ms': float(ms.max())
+    }
+
+"""
+Function: synthetic_frame
+--------------------------
+Returns a BGR test frame: a smooth gradient that scrolls with the frame number, a moving square and the
+frame number printed on it, so consecutive frames differ like real footage and compress realistically.
+"""
+def synthetic_frame(frame_num, width, height):
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = (x[None, :] + frame_num * 3) % 256
+    frame[..., 1] = (y[:, None] + frame_num * 2) % 256
+    frame[..., 2] = ((x[None, :] + y[:, None]) / 2) % 256
+    size = max(height // 6, 8)
+    left = (frame_num * 7) % max(width - size, 1)
+    top = (frame_num * 5) % max(height - size, 1)
+    cv2.rectangle(frame, (left, top), (left + size, top + size), (255, 255, 255), -1)
+    cv2.putText(frame, str(frame_num), (10, height - 10), cv2.FONT_HERSHEY_SIMPLEX, height / 360, (0, 0, 0), 2)
+    return frame
+
+"""
+Function: make_video
+--------------------------
+Writes a synthetic video of frame_count frames with cv2.VideoWriter and returns its path.
+"""
+def make_video(work_dir, width, height, frame_count, codec):
+    name, fourcc, container = codec
+    path = os.path.join(work_dir, f"video_{name}_{width}x{height}_{frame_count}.{container}")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), 30, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a {fourcc} video writer")
+    for frame_num in range(frame_count):
+        writer.write(synthetic_frame(frame_num, width, height))
+    writer.release()
+    return path
+
+"""
+Function: make_image_folder
+--------------------------
+Writes frame_count synthetic frames as numbered JPG files into a new folder and returns its path.
+"""
+def make_image_folder(work_dir, width, height, frame_count):
+    path = os.path.join(work_dir, f"images_{width}x{height}_{frame_count}")
+    os.makedirs(path, exist_ok=True)
+    for frame_num in range(frame_count):
+        cv2.imwrite(os.path.join(path, f"{frame_num}.jpg"), synthetic_frame(frame_num, width, height))
+    return path
+
+"""
+Function: time_get_frame
+--------------------------
+Measures AnnotationSession.get_frame on a loaded session, for random frames and for a run of sequential
+frames. The frame cache is cleared before every random access and before the sequential run, so every
+measurement includes decoding.
+"""
+def time_get_frame(session, samples):
+    rng = random.Random(0)
+    random_times = []
+    for frame_num in (rng.randrange(session.frame_count) for _ in range(samples)):
+        session.frame_cache.clear()
+        start = time.perf_counter()
+        session.get_frame(frame_num)
+        random_times.append(time.perf_counter() - start)
+
+    session.frame_cache.clear()
+    first = rng.randrange(max(session.frame_count - samples, 1))
+    sequential_times = []
+    for frame_num in range(first, min(first + samples, session.frame_count)):
+        start = time.perf_counter()
+        session.get_frame(frame_num)
+        sequential_times.append(time.perf_counter() - start)
+    return {'random': summarize(random_times), 'sequential': summarize(sequential_times)}
+
+"""
+Function: bench_video_access
+--------------------------
+get_frame latency on synthetic videos of every resolution, length and codec, together with the time to
+open the video with and without a seek index on disk.
+"""
+def bench_video_access(work_dir, config):
+    results = []
+    for width, height in config['resolutions']:
+        for frame_count in config['video_lengths']:
+            for codec in VIDEO_CODECS:
+                path = make_video(work_dir, width, height, frame_count, codec)
+                session = AnnotationSession(prefetch=False, annotations_root=os.path.join(work_dir, 'annotations'))
+                start = time.perf_counter()
+                session.load_video(path)
+                cold_load = time.perf_counter() - start
+                start = time.perf_counter()
+                session.load_video(path)
+                warm_load = time.perf_counter() - start
+                keyframes = session.seek_index.keyframes if session.seek_index is not None else []
+                result = {
+                    'codec': codec[0],
+                    'width': width,
+                    'height': height,
+                    'frames': session.frame_count,
+                    'mean_keyframe_interval': session.frame_count / max(len(keyframes), 1),
+                    'load_without_index_ms': cold_load * 1000.0,
+                    'load_with_index_ms': warm_load * 1000.0
+                }
+                result.update(time_get_frame(session, config['samples']))
+                session.close()
+                results.append(result)
+                print(f"[INFO] video {codec[0]} {width}x{height} {frame_count} frames: "
+                      f"random {result['random']['p50_ms']:.1f} ms, "
+                      f"sequential {result['sequential']['p50_ms']:.1f} ms")
+    return results
+
+"""
+Function: bench_image_folders
+--------------------------
+load_image_folder startup time for growing folders, with and without a cached manifest, and get_frame
+latency on each folder.
+"""
+def bench_image_folders(work_dir, config):
+    results = []
+    width, height = config['resolutions'][0]
+    for frame_count in config['folder_lengths']:
+        path = make_image_folder(work_dir, width, height, frame_count)
+        session = AnnotationSession(prefetch=False, annotations_root=os.path.join(work_dir, 'annotations'))
+        start = time.perf_counter()
+        session.load_image_folder(path)
+        cold_load = time.perf_counter() - start
+        start = time.perf_counter()
+        session.load_image_folder(path)
+        warm_load = time.perf_counter() - start
+        result = {
+            'width': width,
+            'height': height,
+            'frames': session.frame_count,
+            'load_without_manifest_ms': cold_load * 1000.0,
+            'load_with_manifest_ms': warm_load * 1000.0
+        }
+        result.update(time_get_frame(session, config['samples']))
+        session.close()
+        results.append(result)
+        print(f"[INFO] image folder {frame_count} frames: load {cold_load * 1000.0:.1f} ms "
+              f"({warm_load * 1000.0:.1f} ms with manifest), random {result['random']['p50_ms']:.1f} ms")
+    return results
+
+"""
+Function: annotation_view
+--------------------------
+Returns a VideoFrameSelector that is not attached to a Tk window, holding just the state its point handlers
+use: the session on frame 0, the figure and axes of the frame, their MarkerRenderer and one entry per
+object. The entry of the first object is active.
+"""
+def annotation_view(session, fig, ax, renderer, object_names):
+    VideoFrameSelector.load_modules()
+    view = VideoFrameSelector.VideoFrameSelector.__new__(VideoFrameSelector.VideoFrameSelector)
+    view.session = session
+    view.current_fig, view.current_ax = fig, ax
+    view.current_frame_num = 0
+    view.object_points = session.frame_points(0)
+    view.marker_renderer = renderer
+    view.object_entries = [{'entry': types.SimpleNamespace(text=name), 'color': 'red', 'active': i == 0}
+                           for i, name in enumerate(object_names)]
+    view.drag = view.selection_start = view.selection_end = view.selection_action = None
+    view.selected_indices = []
+    return view
+
+"""
+Function: mouse_event
+--------------------------
+Returns a synthetic matplotlib mouse event at frame coordinates (x, y) of the axes.
+"""
+def mouse_event(name, ax, x, y, button=1):
+    display_x, display_y = ax.transData.transform((x, y))
+    return MouseEvent(name, ax.figure.canvas, display_x, display_y, button=button)
+
+"""
+Function: bench_redraw
+--------------------------
+Redraw cost of the annotation view on the Agg backend as the number of points on a frame grows. Drives the
+VideoFrameSelector handlers with synthetic mouse events: a click is on_click followed by on_release, which
+adds a point to the session and blits its marker with the MarkerRenderer (a press next to an existing point
+goes through the drag path first), and clear_points clears the active object and blits. A full figure draw
+is timed for comparison.
+"""
+def bench_redraw(config):
+    results = []
+    width, height = config['resolutions'][-1]
+    frame = cv2.cvtColor(synthetic_frame(0, width, height), cv2.COLOR_BGR2RGB)
+    rng = np.random.default_rng(0)
+    object_names = [f"object{i}" for i in range(4)]
+    for point_count in config['point_counts']:
+        session = AnnotationSession(prefetch=False)
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.imshow(frame, extent=image_extent(width, height))
+        ax.axis("off")
+        renderer = MarkerRenderer(fig, ax)
+        fig.canvas.draw()
+        view = annotation_view(session, fig, ax, renderer, object_names)
+
+        xs = rng.uniform(0, width - 1, point_count)
+        ys = rng.uniform(0, height - 1, point_count)
+        click_times = []
+        # The handlers log every point, which is still formatted but not written to the console.
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for i, (x, y) in enumerate(zip(xs, ys)):
+                for j, entry in enumerate(view.object_entries):
+                    entry['active'] = j == i % len(object_names)
+                press = mouse_event('button_press_event', ax, x, y)
+                release = mouse_event('button_release_event', ax, x, y)
+                start = time.perf_counter()
+                view.on_click(press)
+                view.on_release(release)
+                click_times.append(time.perf_counter() - start)
+        assert len(view.object_points) == point_count
+
+        start = time.perf_counter()
+        fig.canvas.draw()
+        full_draw = time.perf_counter() - start
+
+        clear_times = []
+        for i in range(len(object_names)):
+            for j, entry in enumerate(view.object_entries):
+                entry['active'] = j == i
+            start = time.perf_counter()
+            view.clear_points(None)
+            clear_times.append(time.perf_counter() - start)
+        assert len(view.object_points) == 0
+
+        plt.close(fig)
+        result = {
+            'points': point_count,
+            'on_click': summarize(click_times[-min(len(click_times), config['samples']):]),
+            'clear_points': summarize(clear_times),
+            'full_draw_ms': full_draw * 1000.0
+        }
+        results.append(result)
+        print(f"[INFO] redraw with {point_count} points: click {result['on_click']['p50_ms']:.2f} ms, "
+              f"clear {result['clear_points']['p50_ms']:.2f} ms, full draw {full_draw * 1000.0:.1f} ms")
+    return results
+
+"""
+Function: bench_point_index
+--------------------------
+Hit-testing cost on dense point sets: nearest-point lookups within a pick radius (as for right-click
+deletion and dragging), rectangle selections of a tenth of the frame and the rebuild of the grid index
+after a point is moved.
+"""
+def bench_point_index(config):
+    results = []
+    width, height = config['resolutions'][-1]
+    rng = np.random.default_rng(0)
+    for point_count in config['dense_point_counts']:
+        point_set = PointSet()
+        points = rng.uniform((0, 0), (width, height), (point_count, 2))
+        for i in range(4):
+            point_set.add_many(f"object{i}", points[i::4], 'red')
+
+        queries = rng.uniform((0, 0), (width, height), (config['samples'], 2))
+        nearest_times = []
+        for x, y in queries:
+            start = time.perf_counter()
+            point_set.nearest(x, y, max_distance=10)
+            nearest_times.append(time.perf_counter() - start)
+
+        rect_times = []
+        for x, y in queries:
+            start = time.perf_counter()
+            point_set.in_rect(x, y, x + width / 10, y + height / 10)
+            rect_times.append(time.perf_counter() - start)
+
+        rebuild_times = []
+        for i, (x, y) in enumerate(queries):
+            point_set.move(i, x, y)
+            start = time.perf_counter()
+            point_set.nearest(x, y, max_distance=10)
+            rebuild_times.append(time.perf_counter() - start)
+
+        result = {'points': point_count, 'nearest': summarize(nearest_times), 'in_rect': summarize(rect_times),
+                  'nearest_after_move': summarize(rebuild_times)}
+        results.append(result)
+        print(f"[INFO] point index with {point_count} points: nearest {result['nearest']['p50_ms']:.3f} ms, "
+              f"rectangle {result['in_rect']['p50_ms']:.3f} ms, "
+              f"after a move {result['nearest_after_move']['p50_ms']:.2f} ms")
+    return results
+
+"""
+Function: bench_save
+--------------------------
+save_points latency as the annotation store grows, for every store backend. The store is first filled
+with the given number of rows, then a frame of 20 new points is saved repeatedly with the store kept open,
+and the time to open the filled store is measured.
+"""
+def bench_save(work_dir, config):
+    results = []
+    for backend in ('csv', 'sqlite'):
+        for row_count in config['csv_rows']:
+            annotations_root = os.path.join(work_dir, f"annotations_{backend}_{row_count}")
+            session = AnnotationSession(prefetch=False, store_backend=backend, annotations_root=annotations_root)
+            rows = [(f"{frame_num // 20}", f"object{frame_num % 4}", frame_num % 640, frame_num % 360)
+                    for frame_num in range(row_count)]
+            session.import_points(rows, video_filename='bench.mp4')
+            session.close()
+
+            start = time.perf_counter()
+            session = AnnotationSession(prefetch=False, store_backend=backend, annotations_root=annotations_root)
+            session.video_filename = 'bench.mp4'
+            session.get_annotation_store()
+            open_time = time.perf_counter() - start
+
+            save_times = []
+            next_frame = row_count // 20 + 1
+            for frame_num in range(next_frame, next_frame + config['samples']):
+                for i in range(20):
+                    session.add_point(frame_num, f"object{i % 4}", i * 7, i * 5, 'red')
+                start = time.perf_counter()
+                session.save(frame_num)
+                save_times.append(time.perf_counter() - start)
+            session.close()
+
+            result = {'backend': backend, 'rows': row_count, 'open_ms': open_time * 1000.0,
+                      'save_points': summarize(save_times)}
+            results.append(result)
+            print(f"[INFO] save to {backend} store with {row_count} rows: "
+                  f"{result['save_points']['p50_ms']:.2f} ms, open {open_time * 1000.0:.1f} ms")
+    return results
+
+"""
+Function: bench_startup
+--------------------------
+Cold start of the annotation tool, each run in a fresh interpreter: the time until VideoFrameSelector is
+imported, until its window is viewable (only with a display) and until the heavy modules loaded in the
+background are ready. The process time includes interpreter startup. The window time is checked against
+STARTUP_TARGET_MS; without a display meets_target is None, since the import time is not the time until the
+window is shown.
+"""
+def bench_startup(config):
+    runs = []
+    for _ in range(config['startup_runs']):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, SRC_DIR], check=True,
+                                capture_output=True, text=True).stdout
+        process_time = time.perf_counter() - start
+        run = json.loads(output.strip().splitlines()[-1])
+        run['process_ms'] = process_time * 1000.0
+        runs.append(run)
+
+    result = {'target_ms': STARTUP_TARGET_MS}
+    for key in ('import_ms', 'window_ms', 'ready_ms', 'process_ms'):
+        values = [run[key] for run in runs if run[key] is not None]
+        result[key] = summarize(np.asarray(values) / 1000.0) if values else None
+    if result['window_ms'] is None:
+        result['meets_target'] = None
+        window, verdict = "no display, ", "not measured"
+    else:
+        result['meets_target'] = result['window_ms']['p50_ms'] <= STARTUP_TARGET_MS
+        window = f"window {result['window_ms']['p50_ms']:.0f} ms, "
+        verdict = 'met' if result['meets_target'] else 'missed'
+    ready = f"{result['ready_ms']['p50_ms']:.0f} ms" if result['ready_ms'] else "not measured"
+    print(f"[INFO] startup: import {result['import_ms']['p50_ms']:.0f} ms, {window}modules ready {ready} "
+          f"(target {STARTUP_TARGET_MS} ms to window: {verdict})")
+    return result
+
+"""
+Function: environment
+--------------------------
+Describes the machine and library versions a run was made with.
+"""
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'opencv': cv2.__version__,
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__
+    }
+
+BENCHMARKS = {
+    'video_access': lambda work_dir, config: bench_video_access(work_dir, config),
+    'image_folders': lambda work_dir, config: bench_image_folders(work_dir, config),
+    'redraw': lambda work_dir, config: bench_redraw(config),
+    'point_index': lambda work_dir, config: bench_point_index(config),
+    'save': lambda work_dir, config: bench_save(work_dir, config),
+    'startup': lambda work_dir, config: bench_startup(config)
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for frame access, rendering and persistence.")
+    parser.add_argument('--output', default='benchmark_results.json', help="JSON results file")
+    parser.add_argument('--quick', action='store_true', help="run a small configuration")
+    parser.add_argument('--only', choices=sorted(BENCHMARKS), action='append',
+                        help="run only this benchmark (may be repeated)")
+    parser.add_argument('--work-dir', help="directory for the synthetic inputs (default: a temporary directory)")
+    args = parser.parse_args(argv)
+
+    config = QUICK_CONFIG if args.quick else FULL_CONFIG
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="frame_selector_bench_")
+    os.makedirs(work_dir, exist_ok=True)
+    report = {'environment': environment(), 'config': config, 'results': {}}
+    try:
+        for name in args.only or BENCHMARKS:
+            start = time.perf_counter()
+            report['results'][name] = BENCHMARKS[name](work_dir, config)
+            print(f"[INFO] {name} finished in {time.perf_counter() - start:.1f}s")
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"[INFO] Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,658 @@
+import os
+import cv2
+import numpy as np
+from FrameCache import FrameCache, DEFAULT_CACHE_BYTES
+from FramePrefetcher import FramePrefetcher
+from SeekIndex import SeekIndex
+from AnnotationStore import open_annotation_store, read_annotated_frames
+from AnnotationWriter import AnnotationWriter
+from FrameStream import FrameStream, read_frame_at
+from PointPropagator import PointPropagator
+from PromptSuggester import PromptSuggester
+from PromptExport import export_prompts
+from ImageFolderManifest import ImageFolderManifest
+from Filmstrip import display_proxy
+from PointSet import PointSet
+from Instrumentation import timed
+
+class AnnotationSession:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a GUI-free annotation session. The session loads a video or a folder of numbered images,
+    serves frames through the decoded frame cache, keeps the unsaved points of every frame per object and
+    saves them to the annotation store of the input. The rows last saved from every frame are remembered, so
+    saving a frame again also removes the rows of points that were moved or deleted since. cache_bytes sets
+    the memory budget of the frame cache, prefetch enables background decoding of
+    prefetch_ahead/prefetch_behind frames around the position passed to request_prefetch, store_backend
+    selects the annotation store ('csv' or 'sqlite') and annotations_root is the directory holding one
+    annotation folder per video. Annotation stores are opened once and kept open until the input is
+    released.
+
+    Giving a CapturePool switches the session to workspace mode for cycling through many clips: loading
+    another input parks the current one instead of releasing it. Its capture handle stays in the pool and
+    its seek index or manifest and its unsaved points are kept, as are all annotation stores, so switching
+    back neither reopens the file (unless the pool evicted it) nor reparses its annotations.
+    """
+    def __init__(self, cache_bytes=DEFAULT_CACHE_BYTES, prefetch=False, prefetch_ahead=30, prefetch_behind=10,
+                 store_backend='csv', annotations_root='annotations', capture_pool=None):
+        self.video_filename = None
+        self.video_path = None
+        self.image_folder = None
+        self.image_files = []
+        self.image_manifest = None
+        self.cap = None
+        self.seek_index = None
+        self.frame_count = 0
+        self.frame_cache = FrameCache(cache_bytes)
+        self.next_decode_frame = None
+
+        self.prefetch = prefetch
+        self.prefetch_ahead = prefetch_ahead
+        self.prefetch_behind = prefetch_behind
+        self.prefetcher = None
+
+        self.store_backend = store_backend
+        self.annotations_root = annotations_root
+        self.annotation_stores = {}
+        self.writer = None
+        self.capture_pool = capture_pool
+        self.parked = {}
+        self.points = {}
+        self.saved_rows = {}
+        self.edits = 0
+
+    """
+    Method: source_path
+    --------------------------
+    Returns the path of the loaded video or image folder, or None if nothing is loaded.
+    """
+    @property
+    def source_path(self):
+        return self.video_path if self.cap is not None else self.image_folder
+
+    """
+    Method: load_video
+    --------------------------
+    Takes a video path as input and loads the video using OpenCV. Releases any previously loaded input,
+    initializes the video capture object, and sets up the frame count. The frame count and seek positions
+    come from the seek index stored next to the video, which is built on the first load. Raises ValueError
+    if the video cannot be opened.
+    """
+    def load_video(self, video_path):
+        self.release()
+        if self.capture_pool is not None:
+            cap, reused = self.capture_pool.get(video_path)
+        else:
+            cap, reused = cv2.VideoCapture(video_path), False
+        if not cap.isOpened():
+            # A parked clip that cannot be reopened stays parked with its unsaved points.
+            raise ValueError("Failed to load video. Check the file path.")
+        state = self.parked.pop(video_path, None)
+
+        self.cap = cap
+        self.video_path = video_path
+        self.video_filename = os.path.basename(video_path)
+        if state is not None:
+            self.seek_index = state['seek_index']
+            self.frame_count = state['frame_count']
+            self.points = state['points']
+            self.saved_rows = state['saved_rows']
+            self.next_decode_frame = state['next_decode_frame'] if reused else 0
+            self.start_prefetcher()
+            return
+        self.seek_index = SeekIndex.load_or_build(video_path)
+        if self.seek_index is not None and self.seek_index.frame_count > 0:
+            self.frame_count = self.seek_index.frame_count
+        else:
+            self.seek_index = None
+            self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.next_decode_frame = 0
+        self.start_prefetcher()
+
+    """
+    Method: load_image_folder
+    --------------------------
+    Loads a folder of images named by frame number (0.jpg, 1.jpg, ...). The sorted file list and image sizes
+    come from the folder's cached manifest, which is rebuilt when files are added, removed or renamed.
+    Releases any previously loaded input. Raises ValueError if a filename is not an integer or if the folder
+    holds no JPG/PNG files.
+    """
+    def load_image_folder(self, folder_path):
+        state = self.parked.get(folder_path)
+        manifest = state['image_manifest'] if state is not None else ImageFolderManifest.load_or_build(folder_path)
+
+        self.release()
+        state = self.parked.pop(folder_path, state)
+        self.image_folder = folder_path
+        self.video_filename = os.path.basename(os.path.normpath(folder_path))
+        self.image_manifest = manifest
+        self.image_files = manifest.paths
+        self.frame_count = len(self.image_files)
+        if state is not None:
+            self.points = state['points']
+            self.saved_rows = state['saved_rows']
+        self.start_prefetcher()
+
+    """
+    Method: release
+    --------------------------
+    Releases the loaded input: stops the prefetcher, closes the video capture and annotation stores and
+    drops cached frames and unsaved points. In workspace mode the input is parked instead: the capture
+    stays in the pool and the seek index or manifest, the unsaved points and the stores are kept.
+    """
+    def release(self):
+        self.stop_prefetcher()
+        self.flush_saves()
+        if self.capture_pool is not None and self.source_path is not None:
+            self.parked[self.source_path] = {
+                'seek_index': self.seek_index,
+                'image_manifest': self.image_manifest,
+                'frame_count': self.frame_count,
+                'next_decode_frame': self.next_decode_frame,
+                'points': self.points,
+                'saved_rows': self.saved_rows
+            }
+        else:
+            if self.cap is not None:
+                self.cap.release()
+            if self.image_manifest is not None:
+                self.image_manifest.close()
+            self.close_stores()
+        self.cap = None
+        self.seek_index = None
+        self.video_path = None
+        self.video_filename = None
+        self.image_folder = None
+        self.image_files = []
+        self.image_manifest = None
+        self.frame_count = 0
+        self.next_decode_frame = None
+        self.frame_cache.clear()
+        self.points = {}
+        self.saved_rows = {}
+
+    """
+    Method: start_prefetcher
+    --------------------------
+    Starts a background prefetcher for the loaded input if prefetching is enabled. The prefetcher decodes
+    frames around the requested position into the frame cache on its own thread.
+    """
+    def start_prefetcher(self):
+        self.stop_prefetcher()
+        if not self.prefetch or self.frame_count == 0:
+            return
+        self.prefetcher = FramePrefetcher(
+            self.frame_cache, self.frame_count,
+            video_path=self.video_path if self.cap is not None else None,
+            image_manifest=self.image_manifest,
+            seek_index=self.seek_index,
+            ahead=self.prefetch_ahead, behind=self.prefetch_behind
+        )
+        self.prefetcher.request(0)
+
+    """
+    Method: stop_prefetcher
+    --------------------------
+    Stops the background prefetcher, if one is running, and releases its video capture handle.
+    """
+    def stop_prefetcher(self):
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            self.prefetcher = None
+
+    """
+    Method: request_prefetch
+    --------------------------
+    Moves the prefetch window to the given frame number. Does nothing when prefetching is disabled.
+    """
+    def request_prefetch(self, frame_num):
+        if self.prefetcher is not None:
+            self.prefetcher.request(frame_num)
+
+    """
+    Method: get_frame
+    --------------------------
+    Retrieves a specific frame from the video by frame number. Frames are served from the decoded frame
+    cache when possible. When the requested frame directly follows the last decoded one it is read straight
+    from the stream without seeking. Otherwise the seek index is used to seek to the nearest keyframe and
+    decode forward to the exact frame. Converts the frame from BGR to RGB color space and returns it. Prints
+    status messages about frame retrieval.
+    """
+    def get_frame(self, frame_num):
+        frame = self.frame_cache.get(frame_num)
+        if frame is not None:
+            return frame
+
+        if self.cap is not None:
+            print(f"[INFO] Retrieving frame {frame_num}/{self.frame_count} from video...")
+            with timed('decode'):
+                frame, self.next_decode_frame = read_frame_at(self.cap, frame_num, self.next_decode_frame,
+                                                              self.seek_index)
+            if frame is not None:
+                with timed('color_convert'):
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                self.frame_cache.put(frame_num, frame)
+                return frame
+            print(f"[WARNING] Frame {frame_num} could not be retrieved.")
+            return None
+        elif self.image_files:
+            print(f"[INFO] Retrieving frame {frame_num}/{self.frame_count} from images...")
+            if 0 <= frame_num < len(self.image_files):
+                with timed('decode'):
+                    img = self.image_manifest.read(frame_num)
+                if img is not None:
+                    with timed('color_convert'):
+                        frame = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+                    self.frame_cache.put(frame_num, frame)
+                    return frame
+            print(f"[WARNING] Image frame {frame_num} could not be retrieved.")
+            return None
+        else:
+            print("[WARNING] No video or image folder loaded.")
+            return None
+
+    """
+    Method: get_preview
+    --------------------------
+    Returns an RGB preview of a frame that fits within max_width x max_height, together with the
+    (width, height) of the full-resolution frame, or (None, None) if the frame cannot be retrieved. Image
+    folder frames that are not cached are decoded at reduced resolution instead of in full.
+    """
+    def get_preview(self, frame_num, max_width, max_height):
+        if self.image_manifest is not None and frame_num not in self.frame_cache:
+            size = self.image_manifest.frame_size(frame_num) if 0 <= frame_num < self.frame_count else None
+            if size is not None:
+                with timed('decode'):
+                    img = self.image_manifest.read(frame_num, max_width, max_height)
+                if img is not None:
+                    with timed('color_convert'):
+                        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+                    return display_proxy(img, max_width, max_height), size
+        frame = self.get_frame(frame_num)
+        if frame is None:
+            return None, None
+        return display_proxy(frame, max_width, max_height), (frame.shape[1], frame.shape[0])
+
+    """
+    Method: frame_points
+    --------------------------
+    Returns the unsaved points of a frame as a PointSet holding the points and colors of every object. The
+    point set is live: it reflects later edits.
+    """
+    def frame_points(self, frame_num):
+        point_set = self.points.get(frame_num)
+        if point_set is None:
+            point_set = self.points[frame_num] = PointSet()
+        return point_set
+
+    """
+    Method: add_point
+    --------------------------
+    Adds a point to an object on a frame and returns its index in the frame's point set. The color is
+    remembered the first time the object gets a point. edits counts the points added, moved or removed over
+    the session, which tells autosave whether anything changed.
+    """
+    def add_point(self, frame_num, object_name, x, y, color=None):
+        self.edits += 1
+        return self.frame_points(frame_num).add(object_name, x, y, color)
+
+    """
+    Method: add_points
+    --------------------------
+    Adds a sequence or (n, 2) array of points to an object on a frame and returns their indices.
+    """
+    def add_points(self, frame_num, object_name, points, color=None):
+        indices = self.frame_points(frame_num).add_many(object_name, points, color)
+        self.edits += len(indices)
+        return indices
+
+    """
+    Method: remove_point
+    --------------------------
+    Removes the point at the given index among the points of an object on a frame and returns it as (x, y),
+    or returns None if there is no such point.
+    """
+    def remove_point(self, frame_num, object_name, index=-1):
+        point_set = self.frame_points(frame_num)
+        indices = point_set.indices_of(object_name)
+        if not -len(indices) <= index < len(indices):
+            return None
+        self.edits += 1
+        _, x, y = point_set.remove([indices[index]])[0]
+        return x, y
+
+    """
+    Method: remove_nearest_point
+    --------------------------
+    Removes the point of any object on a frame that is closest to (x, y), if it lies within max_distance.
+    Returns the removed point as (object_name, x, y), or None if no point was close enough.
+    """
+    def remove_nearest_point(self, frame_num, x, y, max_distance=None):
+        point_set = self.frame_points(frame_num)
+        index = point_set.nearest(x, y, max_distance)
+        if index is None:
+            return None
+        self.edits += 1
+        return point_set.remove([index])[0]
+
+    """
+    Method: remove_points
+    --------------------------
+    Removes the points with the given indices from a frame and returns them as (object_name, x, y) tuples.
+    """
+    def remove_points(self, frame_num, indices):
+        removed = self.frame_points(frame_num).remove(indices)
+        self.edits += len(removed)
+        return removed
+
+    """
+    Method: move_point
+    --------------------------
+    Moves the point with the given index on a frame to (x, y).
+    """
+    def move_point(self, frame_num, index, x, y):
+        self.edits += 1
+        self.frame_points(frame_num).move(index, x, y)
+
+    """
+    Method: clear_object
+    --------------------------
+    Clears all unsaved points of one object on a frame while keeping the object itself.
+    """
+    def clear_object(self, frame_num, object_name):
+        self.edits += 1
+        self.frame_points(frame_num).clear(object_name)
+
+    """
+    Method: clear_frame
+    --------------------------
+    Drops every unsaved point of a frame.
+    """
+    def clear_frame(self, frame_num):
+        self.edits += 1
+        self.points.pop(frame_num, None)
+
+    """
+    Method: get_annotation_store
+    --------------------------
+    Returns the annotation store of the loaded input, opening it on first use. Stores are kept open until
+    the input is released, so their files are only parsed once. video_filename overrides the name of the
+    loaded input, which allows writing annotations without opening the video.
+    """
+    def get_annotation_store(self, video_filename=None):
+        video_filename = video_filename or self.video_filename
+        if video_filename is None:
+            raise ValueError("No video or image folder loaded")
+        dir_path = self.annotation_dir(video_filename)
+        store = self.annotation_stores.get(dir_path)
+        if store is None:
+            os.makedirs(dir_path, exist_ok=True)
+            store = self.annotation_stores[dir_path] = open_annotation_store(dir_path, self.store_backend)
+        return store
+
+    """
+    Method: annotation_dir
+    --------------------------
+    Returns the directory holding the annotation store of a video or image folder.
+    """
+    def annotation_dir(self, video_filename):
+        return os.path.join(self.annotations_root, os.path.splitext(video_filename)[0])
+
+    """
+    Method: annotated_frames
+    --------------------------
+    Returns the sorted annotated frame numbers of a video, by default the loaded input. An open store is
+    asked after pending background saves are written; otherwise the store file is read without opening the
+    store, so no annotation folder or database is created for a video that has none.
+    """
+    def annotated_frames(self, video_filename=None):
+        video_filename = video_filename or self.video_filename
+        store = self.annotation_stores.get(self.annotation_dir(video_filename))
+        if store is not None:
+            self.flush_saves()
+            return store.frames(video_filename)
+        return read_annotated_frames(self.annotation_dir(video_filename), video_filename, self.store_backend)
+
+    """
+    Method: close_stores
+    --------------------------
+    Waits for pending background saves and closes every open annotation store.
+    """
+    def close_stores(self):
+        self.flush_saves()
+        for store in self.annotation_stores.values():
+            store.close()
+        self.annotation_stores = {}
+
+    """
+    Method: save
+    --------------------------
+    Saves the unsaved points of one frame, or of every frame if no frame number is given, to the annotation
+    store. A frame saved before is replaced: rows saved from it earlier whose points have since been moved
+    or removed are deleted from the store, while rows the session did not write are kept. points replaces
+    the session's unsaved points with another mapping of frame number to PointSet; those are only added.
+    Points already in the store are skipped. Returns the number of points added.
+    """
+    def save(self, frame_num=None, points=None):
+        rows, stale, saved = self._rows_to_save(frame_num, points)
+        if not rows and not stale:
+            return 0
+        store = self.get_annotation_store()
+        self.flush_saves()
+        if stale:
+            store.delete(stale)
+        added = store.upsert(rows)
+        self._mark_saved(saved)
+        return added
+
+    """
+    Method: _rows_to_save
+    --------------------------
+    Returns (rows, stale, saved): the rows of the points to save, the rows saved earlier from the session's
+    points that no longer match a point, and the rows to remember as saved per frame once written.
+    """
+    def _rows_to_save(self, frame_num, points):
+        tracked = points is None
+        points = self.points if tracked else points
+        if frame_num is not None:
+            frames = [frame_num]
+        elif tracked:
+            frames = sorted(points.keys() | self.saved_rows.keys())
+        else:
+            frames = sorted(points)
+        rows, stale, saved = [], [], {}
+        for frame in frames:
+            point_set = points.get(frame)
+            frame_rows = [] if point_set is None else [
+                (self.video_filename, frame, obj_name, int(x), int(y)) for obj_name, x, y in point_set.rows()]
+            rows.extend(frame_rows)
+            if tracked:
+                saved[frame] = set(frame_rows)
+                stale.extend(row for row in self.saved_rows.get(frame, ()) if row not in saved[frame])
+        return rows, stale, saved
+
+    def _mark_saved(self, saved):
+        for frame, rows in saved.items():
+            if rows:
+                self.saved_rows[frame] = rows
+            else:
+                self.saved_rows.pop(frame, None)
+
+    """
+    Method: save_async
+    --------------------------
+    Like save, but hands the points to a background writer and returns at once. The points are copied
+    before returning, so later edits do not change what is written. Saves queued in quick succession are
+    merged into one write. Returns the number of points queued to be added or removed; the outcome is
+    reported by save_results. The points count as saved once queued, so the next save is compared against
+    them; if the write fails, save_results marks its stale rows as saved again so the next save retries
+    removing them.
+    """
+    def save_async(self, frame_num=None, points=None):
+        rows, stale, saved = self._rows_to_save(frame_num, points)
+        if not rows and not stale:
+            return 0
+        store = self.get_annotation_store()
+        if self.writer is None:
+            self.writer = AnnotationWriter()
+        self.writer.submit(store, rows, stale)
+        self._mark_saved(saved)
+        return len(rows) + len(stale)
+
+    """
+    Method: save_results
+    --------------------------
+    Returns the results of the background writes finished since the last call, as dictionaries with the
+    store path, the number of points added and removed, the number of saves merged and the error, if any.
+    """
+    def save_results(self):
+        results = self.writer.poll() if self.writer is not None else []
+        for result in results:
+            if result['error'] is not None:
+                for row in result['stale']:
+                    saved_rows = self._saved_rows_of(row[0])
+                    if saved_rows is not None:
+                        saved_rows.setdefault(row[1], set()).add(row)
+        return results
+
+    """
+    Method: _saved_rows_of
+    --------------------------
+    Returns the rows last saved per frame of the loaded or a parked input with the given name, or None.
+    """
+    def _saved_rows_of(self, video_filename):
+        if video_filename == self.video_filename:
+            return self.saved_rows
+        for path, state in self.parked.items():
+            if os.path.basename(os.path.normpath(path)) == video_filename:
+                return state['saved_rows']
+        return None
+
+    """
+    Method: saving
+    --------------------------
+    Returns True while background saves are queued or being written.
+    """
+    def saving(self):
+        return self.writer is not None and not self.writer.idle()
+
+    """
+    Method: flush_saves
+    --------------------------
+    Waits until every background save has been written. Called before the store is read, written directly
+    or closed, so the store is only used by one thread at a time.
+    """
+    def flush_saves(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    """
+    Method: propagate
+    --------------------------
+    Tracks the saved points of a frame forward to last_frame and backward to first_frame with pyramidal
+    Lucas-Kanade optical flow, streaming the frames sequentially, and saves the tracked points through save.
+    Returns the number of points added. Raises ValueError if frame_num lies outside the range.
+    """
+    def propagate(self, frame_num, first_frame, last_frame, propagator=None):
+        if self.source_path is None:
+            raise ValueError("No video or image folder loaded")
+        first_frame = max(first_frame, 0)
+        last_frame = min(last_frame, self.frame_count - 1)
+        if not first_frame <= frame_num <= last_frame:
+            raise ValueError(f"Frame {frame_num} lies outside the range {first_frame}-{last_frame}")
+        objects = {}
+        store = self.get_annotation_store()
+        self.flush_saves()
+        for _, _, object_name, x, y in store.query_frame(self.video_filename, frame_num):
+            objects.setdefault(object_name, []).append((x, y))
+        if not objects:
+            return 0
+
+        propagator = propagator or PointPropagator()
+        tracked = propagator.track(FrameStream.from_session(self), objects, frame_num, first_frame, last_frame)
+        print(f"[INFO] Propagated points of frame {frame_num} to {len(tracked)} frames.")
+        tracked_points = {}
+        for frame, frame_objects in tracked.items():
+            point_set = tracked_points[frame] = PointSet()
+            for object_name, points in frame_objects.items():
+                point_set.add_many(object_name, points)
+        return self.save(points=tracked_points)
+
+    """
+    Method: suggest_points
+    --------------------------
+    Returns (points, scores) with candidate prompts inside the rectangle spanned by (x0, y0, x1, y1) on a
+    frame, ranked best first. The points are only suggested; nothing is added to the frame. Returns empty
+    arrays if the frame cannot be retrieved.
+    """
+    def suggest_points(self, frame_num, rect, suggester=None):
+        frame = self.get_frame(frame_num)
+        if frame is None:
+            return np.empty((0, 2)), np.empty(0)
+        return (suggester or PromptSuggester()).suggest(frame, rect)
+
+    """
+    Method: suggest_frames
+    --------------------------
+    Batch mode of suggest_points. Adds the prompts suggested inside the same rectangle on every given frame
+    to an object as unsaved points, so they can be reviewed before saving. Frames are decoded in ascending
+    order on the calling thread and analyzed in parallel on worker threads. Returns a dictionary mapping
+    each frame to the number of points added.
+    """
+    def suggest_frames(self, frame_numbers, rect, object_name, color=None, suggester=None, workers=4):
+        if self.source_path is None:
+            raise ValueError("No video or image folder loaded")
+        frame_numbers = sorted({frame_num for frame_num in frame_numbers if 0 <= frame_num < self.frame_count})
+        frames = ((frame_num, frame) for frame_num in frame_numbers
+                  for frame in [self.get_frame(frame_num)] if frame is not None)
+        added = {}
+        for frame_num, points, _ in (suggester or PromptSuggester()).suggest_many(frames, rect, workers):
+            added[frame_num] = len(self.add_points(frame_num, object_name, points, color))
+        return added
+
+    """
+    Method: import_points
+    --------------------------
+    Adds many (frame_number, object_name, x, y) point prompts to the annotation store in one batch, without
+    decoding any frames. video_filename selects the video the points belong to and defaults to the loaded
+    input. Returns the number of points added.
+    """
+    def import_points(self, points, video_filename=None):
+        video_filename = video_filename or self.video_filename
+        store = self.get_annotation_store(video_filename)
+        self.flush_saves()
+        return store.upsert(
+            (video_filename, frame, object_name, x, y) for frame, object_name, x, y in points)
+
+    """
+    Method: export_prompts
+    --------------------------
+    Writes the saved points of a video, by default the loaded input, as a columnar prompt export that
+    PromptReader streams per frame. output_dir defaults to a prompts folder next to the video's annotation
+    store. Waits for pending background saves first. Returns (output_dir, number of points written).
+    """
+    def export_prompts(self, output_dir=None, video_filename=None):
+        video_filename = video_filename or self.video_filename
+        store = self.get_annotation_store(video_filename)
+        self.flush_saves()
+        output_dir = output_dir or os.path.join(os.path.dirname(store.path), 'prompts')
+        return output_dir, export_prompts(store, video_filename, output_dir)
+
+    """
+    Method: close
+    --------------------------
+    Releases the loaded input, the parked inputs of workspace mode and every resource held by the session.
+    """
+    def close(self):
+        self.release()
+        if self.writer is not None:
+            self.writer.stop()
+            self.writer = None
+        for state in self.parked.values():
+            if state['image_manifest'] is not None:
+                state['image_manifest'].close()
+        self.parked = {}
+        self.close_stores()
+        if self.capture_pool is not None:
+            self.capture_pool.close()
@@ -0,0 +1,405 @@
+import csv
+import io
+import os
+import sqlite3
+from Instrumentation import timed
+
+CSV_HEADER = ['video_name', 'frame_number', 'object_name', 'x', 'y']
+STORE_BACKENDS = ('csv', 'sqlite')
+
+class AnnotationStore:
+    """
+    Method: __init__
+    --------------------------
+    Base class of the annotation stores. A store holds rows of (video_name, frame_number, object_name, x, y)
+    with integer frame numbers and pixel coordinates, never holds the same row twice, and can be queried by
+    frame or by object. path is the file the store is kept in.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    """
+    Method: upsert
+    --------------------------
+    Adds the given rows, skipping rows that are already stored. Returns the number of rows added.
+    """
+    def upsert(self, rows):
+        raise NotImplementedError
+
+    """
+    Method: delete
+    --------------------------
+    Removes the given rows, skipping rows that are not stored. Returns the number of rows removed.
+    """
+    def delete(self, rows):
+        raise NotImplementedError
+
+    """
+    Method: delete_frame
+    --------------------------
+    Removes every row of one frame of a video, optionally only those of one object. Returns the number of
+    rows removed.
+    """
+    def delete_frame(self, video_name, frame_number, object_name=None):
+        raise NotImplementedError
+
+    """
+    Method: query_frame
+    --------------------------
+    Returns the rows of one frame of a video in the order they were added.
+    """
+    def query_frame(self, video_name, frame_number):
+        raise NotImplementedError
+
+    """
+    Method: query_object
+    --------------------------
+    Returns the rows of one object of a video across all frames, ordered by frame.
+    """
+    def query_object(self, video_name, object_name):
+        raise NotImplementedError
+
+    """
+    Method: frames
+    --------------------------
+    Returns the sorted frame numbers of a video that have at least one row.
+    """
+    def frames(self, video_name):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __len__(self):
+        raise NotImplementedError
+
+"""
+Function: normalize_row
+--------------------------
+Returns an annotation row as a (video_name, frame_number, object_name, x, y) tuple with integer frame number
+and coordinates, the form in which rows are compared and stored.
+"""
+def normalize_row(row):
+    video_name, frame_number, object_name, x, y = row
+    return (str(video_name), int(frame_number), str(object_name), int(x), int(y))
+
+"""
+Function: _is_complete_row
+--------------------------
+Returns True if a line of points.csv parses as the header or as a complete annotation row.
+"""
+def _is_complete_row(line):
+    rows = list(csv.reader(io.StringIO(line, newline='')))
+    if len(rows) != 1 or len(rows[0]) != len(CSV_HEADER):
+        return False
+    if rows[0] == CSV_HEADER:
+        return True
+    try:
+        normalize_row(rows[0])
+    except ValueError:
+        return False
+    return True
+
+class CsvAnnotationStore(AnnotationStore):
+    """
+    Method: __init__
+    --------------------------
+    Initializes an append-only CSV store in the points.csv format. The file is parsed once when the store is
+    opened and kept in an in-memory index by row, by frame and by object, so saving only appends the new
+    rows. Every save is appended with a single write followed by fsync, and a new file or a rewrite after
+    deleting rows goes through a temporary file and an atomic rename. Before appending, the length of the
+    file is written to a <path>.journal file, which is removed once the append is on disk. If a crash cuts
+    an append short, the journal is still there and everything after the recorded length is ignored, even
+    if a cut line happens to parse as a row. Opening the store never writes to the file; the unfinished
+    append is cut off just before the next save appends. A last line without a line break that the store
+    did not write is kept if it is a complete row, and its line break is added by the next save.
+    """
+    def __init__(self, path):
+        super().__init__(path)
+        self._rows = set()
+        self._by_frame = {}
+        self._by_object = {}
+        self._torn_tail = None
+        self._missing_newline = False
+        if os.path.exists(path):
+            with timed('csv_load'):
+                reader = csv.reader(io.StringIO(self._read_complete_lines(), newline=''))
+                next(reader, None)
+                for row in reader:
+                    if row:
+                        self._index(normalize_row(row))
+
+    """
+    Method: _read_complete_lines
+    --------------------------
+    Returns the complete lines of the file. An append the journal shows to be unfinished is left out and its
+    offset is remembered so the next save cuts it off. Otherwise a last line without a line break is
+    returned if it parses as a complete row or the header, and is left out like an unfinished append if not.
+    """
+    def _read_complete_lines(self):
+        with open(self.path, 'rb') as csvfile:
+            data = csvfile.read()
+        length = self._journaled_length()
+        if length is not None and length < len(data) and not data.endswith(b'\n'):
+            print(f"[WARNING] Ignoring an unfinished save at the end of {self.path}, it is removed on the next "
+                  f"save")
+            self._torn_tail = length
+            data = data[:length]
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            if _is_complete_row(data[end:].decode(errors='replace')):
+                self._missing_newline = True
+            else:
+                print(f"[WARNING] Ignoring a partially written line at the end of {self.path}, it is removed "
+                      f"on the next save")
+                self._torn_tail = end
+                data = data[:end]
+        return data.decode()
+
+    @property
+    def _journal_path(self):
+        return f"{self.path}.journal"
+
+    """
+    Method: _journaled_length
+    --------------------------
+    Returns the file length recorded before the last append if that append did not finish, otherwise None.
+    """
+    def _journaled_length(self):
+        try:
+            with open(self._journal_path, 'r') as journal:
+                return int(journal.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_journal(self, length):
+        temp_path = f"{self._journal_path}.tmp"
+        with open(temp_path, 'w') as journal:
+            journal.write(str(length))
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temp_path, self._journal_path)
+
+    def _remove_journal(self):
+        if os.path.exists(self._journal_path):
+            os.remove(self._journal_path)
+
+    def _index(self, row):
+        if row in self._rows:
+            return False
+        self._rows.add(row)
+        self._by_frame.setdefault((row[0], row[1]), {})[row] = None
+        self._by_object.setdefault((row[0], row[2]), {})[row] = None
+        return True
+
+    def _unindex(self, row):
+        self._rows.discard(row)
+        for index, key in ((self._by_frame, (row[0], row[1])), (self._by_object, (row[0], row[2]))):
+            rows = index.get(key)
+            if rows is not None:
+                rows.pop(row, None)
+                if not rows:
+                    del index[key]
+
+    def upsert(self, rows):
+        new_rows = [row for row in dict.fromkeys(map(normalize_row, rows)) if row not in self._rows]
+        if not new_rows:
+            return 0
+        block = io.StringIO(newline='')
+        writer = csv.writer(block)
+        with timed('csv_write'):
+            # A file cut back to nothing has lost its header, so it is written anew like a missing one.
+            if os.path.exists(self.path) and self._torn_tail != 0:
+                if self._torn_tail is not None:
+                    offset = self._torn_tail
+                else:
+                    offset = os.path.getsize(self.path)
+                    if self._missing_newline:
+                        block.write(writer.dialect.lineterminator)
+                writer.writerows(new_rows)
+                self._write_journal(offset)
+                with open(self.path, 'rb+') as csvfile:
+                    csvfile.seek(offset)
+                    csvfile.truncate()
+                    csvfile.write(block.getvalue().encode())
+                    csvfile.flush()
+                    os.fsync(csvfile.fileno())
+                self._remove_journal()
+                self._torn_tail = None
+                self._missing_newline = False
+            else:
+                writer.writerow(CSV_HEADER)
+                writer.writerows(new_rows)
+                self._replace_file(block.getvalue())
+        for row in new_rows:
+            self._index(row)
+        return len(new_rows)
+
+    def delete(self, rows):
+        rows = [row for row in dict.fromkeys(map(normalize_row, rows)) if row in self._rows]
+        for row in rows:
+            self._unindex(row)
+        if rows:
+            self._rewrite()
+        return len(rows)
+
+    def delete_frame(self, video_name, frame_number, object_name=None):
+        rows = [row for row in self._by_frame.get((video_name, int(frame_number)), {})
+                if object_name is None or row[2] == object_name]
+        for row in rows:
+            self._unindex(row)
+        if rows:
+            self._rewrite()
+        return len(rows)
+
+    def _rewrite(self):
+        block = io.StringIO(newline='')
+        writer = csv.writer(block)
+        writer.writerow(CSV_HEADER)
+        writer.writerows(self)
+        with timed('csv_write'):
+            self._replace_file(block.getvalue())
+
+    def _replace_file(self, contents):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', newline='') as csvfile:
+            csvfile.write(contents)
+            csvfile.flush()
+            os.fsync(csvfile.fileno())
+        os.replace(temp_path, self.path)
+        self._remove_journal()
+        self._torn_tail = None
+        self._missing_newline = False
+
+    def query_frame(self, video_name, frame_number):
+        return list(self._by_frame.get((video_name, int(frame_number)), {}))
+
+    def query_object(self, video_name, object_name):
+        return sorted(self._by_object.get((video_name, object_name), {}), key=lambda row: row[1])
+
+    def frames(self, video_name):
+        return sorted(frame for video, frame in self._by_frame if video == video_name)
+
+    def __iter__(self):
+        for rows in self._by_frame.values():
+            yield from rows
+
+    def __len__(self):
+        return len(self._rows)
+
+class SqliteAnnotationStore(AnnotationStore):
+    """
+    Method: __init__
+    --------------------------
+    Initializes an embedded SQLite store. Rows are kept in one table with a unique index on
+    (video_name, frame_number, object_name, x, y), which also serves queries by frame, and a second index
+    for queries by object. When the database is first created next to an existing points.csv, the CSV rows
+    are imported into it. The connection may be used from the background annotation writer; callers make
+    sure only one thread uses the store at a time.
+    """
+    def __init__(self, path, import_csv=None):
+        super().__init__(path)
+        is_new = not os.path.exists(path)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS annotations (
+                video_name TEXT NOT NULL,
+                frame_number INTEGER NOT NULL,
+                object_name TEXT NOT NULL,
+                x INTEGER NOT NULL,
+                y INTEGER NOT NULL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS annotations_unique
+                ON annotations (video_name, frame_number, object_name, x, y);
+            CREATE INDEX IF NOT EXISTS annotations_object
+                ON annotations (video_name, object_name, frame_number);
+        """)
+        if is_new and import_csv is not None and os.path.exists(import_csv):
+            self.upsert(CsvAnnotationStore(import_csv))
+
+    def upsert(self, rows):
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO annotations VALUES (?, ?, ?, ?, ?)", map(normalize_row, rows))
+            return self.connection.total_changes - before
+
+    def delete(self, rows):
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "DELETE FROM annotations WHERE video_name = ? AND frame_number = ? AND object_name = ? "
+                "AND x = ? AND y = ?", map(normalize_row, rows))
+            return self.connection.total_changes - before
+
+    def delete_frame(self, video_name, frame_number, object_name=None):
+        with self.connection:
+            if object_name is None:
+                cursor = self.connection.execute(
+                    "DELETE FROM annotations WHERE video_name = ? AND frame_number = ?",
+                    (video_name, int(frame_number)))
+            else:
+                cursor = self.connection.execute(
+                    "DELETE FROM annotations WHERE video_name = ? AND frame_number = ? AND object_name = ?",
+                    (video_name, int(frame_number), object_name))
+            return cursor.rowcount
+
+    def query_frame(self, video_name, frame_number):
+        return self.connection.execute(
+            "SELECT * FROM annotations WHERE video_name = ? AND frame_number = ? ORDER BY rowid",
+            (video_name, int(frame_number))).fetchall()
+
+    def query_object(self, video_name, object_name):
+        return self.connection.execute(
+            "SELECT * FROM annotations WHERE video_name = ? AND object_name = ? ORDER BY frame_number, rowid",
+            (video_name, object_name)).fetchall()
+
+    def frames(self, video_name):
+        return [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT frame_number FROM annotations WHERE video_name = ? ORDER BY frame_number",
+            (video_name,))]
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM annotations").fetchone()[0]
+
+"""
+Function: open_annotation_store
+--------------------------
+Opens the annotation store kept in the given directory with the chosen backend: 'csv' for points.csv or
+'sqlite' for points.sqlite. A new SQLite store starts with the rows of an existing points.csv.
+"""
+def open_annotation_store(dir_path, backend='csv'):
+    csv_path = os.path.join(dir_path, 'points.csv')
+    if backend == 'csv':
+        return CsvAnnotationStore(csv_path)
+    if backend == 'sqlite':
+        return SqliteAnnotationStore(os.path.join(dir_path, 'points.sqlite'), import_csv=csv_path)
+    raise ValueError(f"Unknown annotation store backend '{backend}', expected one of {STORE_BACKENDS}")
+
+"""
+Function: read_annotated_frames
+--------------------------
+Returns the sorted annotated frame numbers of a video from the store kept in the given directory without
+creating or changing any file, so it can be used to list clips nobody has annotated yet. Returns an empty
+list if there is no store. The SQLite database is opened read-only; while it does not exist yet, the
+points.csv it would be created from is read instead.
+"""
+def read_annotated_frames(dir_path, video_name, backend='csv'):
+    csv_path = os.path.join(dir_path, 'points.csv')
+    sqlite_path = os.path.join(dir_path, 'points.sqlite')
+    if backend == 'sqlite' and os.path.exists(sqlite_path):
+        connection = sqlite3.connect(f"file:{sqlite_path}?mode=ro", uri=True)
+        try:
+            return [row[0] for row in connection.execute(
+                "SELECT DISTINCT frame_number FROM annotations WHERE video_name = ? ORDER BY frame_number",
+                (video_name,))]
+        except sqlite3.Error:
+            return []
+        finally:
+            connection.close()
+    if os.path.exists(csv_path):
+        return CsvAnnotationStore(csv_path).frames(video_name)
+    return []
@@ -0,0 +1,126 @@
+import queue
+import threading
+import time
+
+class AnnotationWriter:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a background writer for annotation stores. Saves are queued as rows for a store and written
+    on the writer's own thread. After the first queued save the writer waits coalesce_delay seconds, so a
+    burst of saves is merged into a single delete and upsert per store. The outcome of every write is put on
+    the results queue as a dictionary with the store path, the number of rows added and removed, the number
+    of saves merged into the write, the error, if any, and the stale rows that were to be removed.
+    """
+    def __init__(self, coalesce_delay=0.2):
+        self.coalesce_delay = coalesce_delay
+        self.pending = []
+        self.busy = False
+        self.running = True
+        self.condition = threading.Condition()
+        self.results = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="AnnotationWriter", daemon=True)
+        self.thread.start()
+
+    """
+    Method: submit
+    --------------------------
+    Queues rows to be added to a store and, optionally, stale rows to be removed from it first.
+    """
+    def submit(self, store, rows, stale=()):
+        with self.condition:
+            if not self.running:
+                raise RuntimeError("The annotation writer has been stopped")
+            self.pending.append((store, rows, stale))
+            self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                self.busy = True
+                running = self.running
+            if running:
+                time.sleep(self.coalesce_delay)
+            with self.condition:
+                batch, self.pending = self.pending, []
+            self._write(batch)
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+
+    """
+    Method: _write
+    --------------------------
+    Merges the queued saves per store in order and writes each store once. A row removed by a later save is
+    no longer added, and a row added again by a later save is no longer removed.
+    """
+    def _write(self, batch):
+        merged = {}
+        for store, rows, stale in batch:
+            entry = merged.setdefault(id(store), {'store': store, 'rows': {}, 'stale': set(), 'saves': 0})
+            for row in stale:
+                entry['rows'].pop(row, None)
+                entry['stale'].add(row)
+            for row in rows:
+                entry['rows'][row] = None
+                entry['stale'].discard(row)
+            entry['saves'] += 1
+        for entry in merged.values():
+            store = entry['store']
+            added = removed = 0
+            try:
+                if entry['stale']:
+                    removed = store.delete(entry['stale'])
+                added, error = store.upsert(entry['rows']), None
+            except Exception as e:
+                error = e
+            self.results.put({'path': store.path, 'added': added, 'removed': removed, 'saves': entry['saves'],
+                              'error': error, 'stale': list(entry['stale'])})
+
+    """
+    Method: idle
+    --------------------------
+    Returns True if no save is queued or being written. Results of finished writes are already on the
+    results queue when this returns True.
+    """
+    def idle(self):
+        with self.condition:
+            return not self.pending and not self.busy
+
+    """
+    Method: flush
+    --------------------------
+    Blocks until every queued save has been written.
+    """
+    def flush(self):
+        with self.condition:
+            while self.pending or self.busy:
+                self.condition.wait()
+
+    """
+    Method: poll
+    --------------------------
+    Returns the results of all writes finished since the last call without blocking.
+    """
+    def poll(self):
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return results
+
+    """
+    Method: stop
+    --------------------------
+    Writes the remaining queued saves without waiting for more and stops the writer thread.
+    """
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join()
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+import cv2
+
+DEFAULT_MAX_OPEN = 4
+
+class CapturePool:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a pool of open cv2.VideoCapture handles keyed by video path. Handles stay open after use so
+    switching back to a recently used video does not reopen the file. At most max_open handles are kept;
+    opening another one releases the least recently used handle.
+    """
+    def __init__(self, max_open=DEFAULT_MAX_OPEN):
+        if max_open < 1:
+            raise ValueError("max_open must be at least 1")
+        self.max_open = max_open
+        self.captures = OrderedDict()
+        self.opens = 0
+        self.reuses = 0
+
+    """
+    Method: get
+    --------------------------
+    Returns (capture, reused) for a video: the pooled handle with reused True, or a newly opened handle with
+    reused False. A handle that failed to open is returned but not pooled, so callers check isOpened.
+    """
+    def get(self, video_path):
+        cap = self.captures.get(video_path)
+        if cap is not None:
+            self.captures.move_to_end(video_path)
+            self.reuses += 1
+            return cap, True
+
+        cap = cv2.VideoCapture(video_path)
+        self.opens += 1
+        if not cap.isOpened():
+            return cap, False
+        self.captures[video_path] = cap
+        while len(self.captures) > self.max_open:
+            _, evicted = self.captures.popitem(last=False)
+            evicted.release()
+        return cap, False
+
+    def __contains__(self, video_path):
+        return video_path in self.captures
+
+    def __len__(self):
+        return len(self.captures)
+
+    """
+    Method: release
+    --------------------------
+    Releases the pooled handle of a video, if there is one.
+    """
+    def release(self, video_path):
+        cap = self.captures.pop(video_path, None)
+        if cap is not None:
+            cap.release()
+
+    """
+    Method: close
+    --------------------------
+    Releases every pooled handle.
+    """
+    def close(self):
+        while self.captures:
+            _, cap = self.captures.popitem()
+            cap.release()
+
+    def stats(self):
+        return {'open': len(self.captures), 'max_open': self.max_open, 'opens': self.opens, 'reuses': self.reuses}
@@ -0,0 +1,194 @@
+import json
+import os
+import cv2
+import numpy as np
+from FrameStream import read_frame_at
+
+FILMSTRIP_VERSION = 1
+THUMB_WIDTH = 96
+MAX_THUMBNAILS = 2000
+
+class Filmstrip:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a filmstrip from an array of RGB thumbnails with shape (count, height, width, 3). Thumbnail i
+    shows frame i * stride. The array is usually memory-mapped from the sidecar file, so showing previews
+    never decodes the video.
+    """
+    def __init__(self, thumbnails, stride, frame_count):
+        self.thumbnails = thumbnails
+        self.stride = stride
+        self.frame_count = frame_count
+        self.thumb_height = thumbnails.shape[1]
+        self.thumb_width = thumbnails.shape[2]
+
+    """
+    Method: sidecar_paths
+    --------------------------
+    Returns the paths of the thumbnail array and its metadata file, stored next to the video or image folder
+    as <source>.filmstrip.npy and <source>.filmstrip.json.
+    """
+    @staticmethod
+    def sidecar_paths(source_path):
+        source_path = source_path.rstrip(os.sep)
+        return f"{source_path}.filmstrip.npy", f"{source_path}.filmstrip.json"
+
+    """
+    Method: load
+    --------------------------
+    Memory-maps the filmstrip of a video or image folder. Returns None if there is no sidecar or if the source
+    or its frame count has changed since the filmstrip was generated.
+    """
+    @classmethod
+    def load(cls, source_path, frame_count):
+        array_path, meta_path = cls.sidecar_paths(source_path)
+        if not (os.path.exists(array_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, 'r') as meta_file:
+                meta = json.load(meta_file)
+            stat = os.stat(source_path)
+            if (meta.get('version') != FILMSTRIP_VERSION or meta.get('source_size') != stat.st_size
+                    or meta.get('source_mtime') != stat.st_mtime or meta.get('frame_count') != frame_count):
+                return None
+            thumbnails = np.load(array_path, mmap_mode='r')
+            return cls(thumbnails, meta['stride'], frame_count)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    """
+    Method: build
+    --------------------------
+    Generates the filmstrip of a video (video_path) or image folder (image_files) and saves it next to
+    source_path. At most max_thumbnails thumbnails are made, evenly spaced over the whole input. Video
+    frames are read forward through the stream, or through the seek index when one is given; images are
+    decoded at reduced resolution. progress(done, total) is called after every thumbnail and the build stops
+    early, returning None, once cancelled() returns True.
+    """
+    @classmethod
+    def build(cls, source_path, frame_count, video_path=None, image_files=None, seek_index=None,
+              thumb_width=THUMB_WIDTH, max_thumbnails=MAX_THUMBNAILS, progress=None, cancelled=None):
+        if frame_count <= 0:
+            return None
+        stride = max(1, -(-frame_count // max_thumbnails))
+        frame_numbers = range(0, frame_count, stride)
+        array_path, meta_path = cls.sidecar_paths(source_path)
+        temp_path = f"{array_path}.tmp"
+
+        reader = _FrameReader(video_path, image_files, seek_index)
+        thumbnails = None
+        completed = False
+        try:
+            for i, frame_num in enumerate(frame_numbers):
+                if cancelled is not None and cancelled():
+                    return None
+                frame = reader.read(frame_num)
+                if frame is None:
+                    if thumbnails is None:
+                        return None
+                    thumbnails[i] = thumbnails[i - 1]
+                    continue
+                if thumbnails is None:
+                    thumb_height = max(1, round(thumb_width * frame.shape[0] / frame.shape[1]))
+                    thumbnails = np.lib.format.open_memmap(
+                        temp_path, mode='w+', dtype=np.uint8,
+                        shape=(len(frame_numbers), thumb_height, thumb_width, 3))
+                thumb = cv2.resize(frame, (thumb_width, thumbnails.shape[1]), interpolation=cv2.INTER_AREA)
+                thumbnails[i] = cv2.cvtColor(thumb, cv2.COLOR_BGR2RGB)
+                if progress is not None:
+                    progress(i + 1, len(frame_numbers))
+            completed = thumbnails is not None
+        finally:
+            reader.release()
+            if thumbnails is not None:
+                thumbnails.flush()
+                del thumbnails
+            if not completed and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        try:
+            stat = os.stat(source_path)
+            os.replace(temp_path, array_path)
+            with open(meta_path, 'w') as meta_file:
+                json.dump({
+                    'version': FILMSTRIP_VERSION,
+                    'source_size': stat.st_size,
+                    'source_mtime': stat.st_mtime,
+                    'frame_count': frame_count,
+                    'stride': stride
+                }, meta_file)
+        except OSError as e:
+            print(f"[WARNING] Could not write filmstrip for {source_path}: {e}")
+            return None
+        return cls.load(source_path, frame_count)
+
+    """
+    Method: thumbnail
+    --------------------------
+    Returns the thumbnail closest to the given frame number.
+    """
+    def thumbnail(self, frame_num):
+        index = min(max(int(round(frame_num / self.stride)), 0), len(self.thumbnails) - 1)
+        return self.thumbnails[index]
+
+    """
+    Method: strip
+    --------------------------
+    Returns a single RGB image of the given width made of thumbnails sampled evenly over the whole input,
+    used as the filmstrip under the frame slider.
+    """
+    def strip(self, width):
+        tiles = max(1, -(-width // self.thumb_width))
+        indices = np.linspace(0, len(self.thumbnails) - 1, tiles).round().astype(int)
+        strip = np.concatenate([self.thumbnails[i] for i in indices], axis=1)
+        return np.ascontiguousarray(strip[:, :width])
+
+class _FrameReader:
+    """
+    Method: __init__
+    --------------------------
+    Reads BGR frames for filmstrip generation from a video, through its own capture handle, or from a list of
+    image files.
+    """
+    def __init__(self, video_path, image_files, seek_index):
+        self.image_files = image_files or []
+        self.seek_index = seek_index
+        self.cap = cv2.VideoCapture(video_path) if video_path is not None else None
+        self.next_decode_frame = 0
+
+    def read(self, frame_num):
+        if self.cap is None:
+            if 0 <= frame_num < len(self.image_files):
+                return cv2.imread(self.image_files[frame_num], cv2.IMREAD_REDUCED_COLOR_4)
+            return None
+        frame, self.next_decode_frame = read_frame_at(self.cap, frame_num, self.next_decode_frame,
+                                                      self.seek_index)
+        return frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+"""
+Function: display_proxy
+--------------------------
+Returns a copy of the image downscaled to fit within max_width x max_height, or the image itself if it
+already fits. Used to show screen-resolution proxies of full-resolution frames.
+"""
+def display_proxy(image, max_width, max_height):
+    height, width = image.shape[:2]
+    scale = min(max_width / width, max_height / height)
+    if scale >= 1:
+        return image
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+"""
+Function: image_extent
+--------------------------
+Returns the imshow extent of a full-resolution image of the given size. Drawing a proxy with this extent
+keeps the axes in full-resolution pixel coordinates, so mouse clicks map back to the original frame.
+"""
+def image_extent(width, height):
+    return (-0.5, width - 0.5, height - 0.5, -0.5)
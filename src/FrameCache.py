@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+class FrameCache:
+    """
+    Method: __init__
+    --------------------------
+    Initializes an LRU cache of decoded RGB frames keyed by frame number. The cache is bounded by the total
+    number of bytes held rather than the number of frames, so the same budget works for SD and 4K footage.
+    Hit and miss counters are kept so the budget can be sized from real sessions.
+    """
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    """
+    Method: get
+    --------------------------
+    Returns the cached frame for the given frame number and marks it as most recently used, or None if the
+    frame is not cached. Updates the hit and miss counters.
+    """
+    def get(self, frame_num):
+        with self._lock:
+            frame = self._frames.get(frame_num)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(frame_num)
+            self.hits += 1
+            return frame
+
+    """
+    Method: put
+    --------------------------
+    Stores a decoded frame and evicts the least recently used frames until the cache fits within its byte
+    budget. Frames larger than the whole budget are not cached. Cached frames are made read-only so callers
+    cannot modify the shared copy.
+    """
+    def put(self, frame_num, frame):
+        if frame is None or frame.nbytes > self.max_bytes:
+            return
+        frame.flags.writeable = False
+        with self._lock:
+            previous = self._frames.pop(frame_num, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            self._frames[frame_num] = frame
+            self.current_bytes += frame.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._frames.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+    """
+    Method: clear
+    --------------------------
+    Drops every cached frame and resets the hit and miss counters. Called whenever a new video or image
+    folder is loaded.
+    """
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    """
+    Method: stats
+    --------------------------
+    Returns a dictionary with the hit and miss counters, the hit rate and the current memory usage of the
+    cache.
+    """
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'frames': len(self._frames),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def __contains__(self, frame_num):
+        with self._lock:
+            return frame_num in self._frames
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frames)
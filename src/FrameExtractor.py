@@ -0,0 +1,95 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import numpy as np
+from FrameStream import FrameStream, init_decode_worker
+from SeekIndex import SeekIndex
+
+IMAGE_FORMATS = ('jpg', 'png')
+
+"""
+Function: extract_frames
+--------------------------
+Splits a video into numbered image files that load_image_folder can open. Every stride-th frame is written
+as <n>.<image_format> with n counting up from 0, so the file number is the frame number in the image-folder
+input. The video is cut into ranges of chunk_frames output frames which are decoded, optionally resized to
+width x height (one of them may be None to keep the aspect ratio) and encoded in a pool of worker processes
+(workers defaults to the number of CPUs). The workers locate frames through the seek index built here, which
+is handed to them directly, so frame numbers are exact even where the index cannot be saved next to the
+video. quality is the JPEG quality (0-100) or the PNG compression level
+(0-9). Prints throughput while running and returns the number of frames written.
+"""
+def extract_frames(video_path, output_dir, stride=1, width=None, height=None, image_format='jpg', quality=None,
+                   workers=None, chunk_frames=256):
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format '{image_format}', expected one of {IMAGE_FORMATS}")
+    if stride < 1:
+        raise ValueError("stride must be at least 1")
+    index = SeekIndex.load_or_build(video_path)
+    if index is None or index.frame_count == 0:
+        raise ValueError("Failed to load video. Check the file path.")
+    os.makedirs(output_dir, exist_ok=True)
+
+    total = -(-index.frame_count // stride)
+    ranges = [(first, min(first + chunk_frames, total)) for first in range(0, total, chunk_frames)]
+    tasks = [(video_path, output_dir, first, last, stride, width, height, image_format, quality)
+             for first, last in ranges]
+
+    written = 0
+    start = time.perf_counter()
+    # Spawned workers, forking a process that runs decoder or GUI threads is not safe.
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(np.asarray(index.records),),
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [executor.submit(_extract_range, *task) for task in tasks]
+        for future in as_completed(futures):
+            written += future.result()
+            elapsed = time.perf_counter() - start
+            print(f"[INFO] Extracted {written}/{total} frames ({written / max(elapsed, 1e-9):.1f} frames/s)")
+    return written
+
+_seek_index = None
+
+"""
+Function: _init_worker
+--------------------------
+Initializer of the extraction workers. Each worker receives the records of the seek index once and keeps the
+index for all of its tasks.
+"""
+def _init_worker(index_records):
+    global _seek_index
+    init_decode_worker()
+    _seek_index = SeekIndex(index_records)
+
+"""
+Function: _extract_range
+--------------------------
+Worker task. Decodes output frames [first, last) of a video sequentially, starting with a single seek through
+the worker's seek index, and writes them as numbered image files. Returns the number of files written.
+"""
+def _extract_range(video_path, output_dir, first, last, stride, width, height, image_format, quality):
+    stream = FrameStream(video_path=video_path, seek_index=_seek_index)
+    params = []
+    if quality is not None:
+        flag = cv2.IMWRITE_JPEG_QUALITY if image_format == 'jpg' else cv2.IMWRITE_PNG_COMPRESSION
+        params = [flag, int(quality)]
+
+    written = 0
+    for frame_num, frame in stream.frames(first * stride, last * stride, step=stride):
+        if width is not None or height is not None:
+            frame = _resize(frame, width, height)
+        path = os.path.join(output_dir, f"{frame_num // stride}.{image_format}")
+        if not cv2.imwrite(path, frame, params):
+            raise OSError(f"Failed to write {path}")
+        written += 1
+    return written
+
+def _resize(frame, width, height):
+    frame_height, frame_width = frame.shape[:2]
+    if width is None:
+        width = round(frame_width * height / frame_height)
+    elif height is None:
+        height = round(frame_height * width / frame_width)
+    interpolation = cv2.INTER_AREA if width < frame_width else cv2.INTER_LINEAR
+    return cv2.resize(frame, (width, height), interpolation=interpolation)
@@ -0,0 +1,188 @@
+import threading
+import time
+import cv2
+from Filmstrip import display_proxy
+
+DEFAULT_FPS = 30.0
+SPEEDS = (0.25, 0.5, 1.0, 1.5, 2.0, 4.0)
+
+class FramePlayer:
+    """
+    Method: __init__
+    --------------------------
+    Initializes real-time playback of a video (video_path) or an image folder (image_manifest) from
+    start_frame. A background thread decodes frames sequentially on its own capture handle at the native
+    frame rate times speed, scales them to fit max_width x max_height and leaves the newest one for the GUI
+    to pick up with latest. Video frames are fetched with grab and only retrieved (decoded to an image) when
+    they are on time; frames whose display time has already passed are grabbed and dropped, so playback
+    keeps to the clock when decoding or rendering falls behind. overlay optionally maps frame numbers to a
+    list of (x, y, rgb_color) points in full-resolution pixels that are drawn on those frames. Image folders
+    are played at fps, DEFAULT_FPS by default; videos use the frame rate stored in the file unless fps is
+    given.
+    """
+    def __init__(self, frame_count, start_frame=0, video_path=None, image_manifest=None, seek_index=None,
+                 fps=None, speed=1.0, max_width=640, max_height=360, overlay=None):
+        self.frame_count = frame_count
+        self.video_path = video_path
+        self.image_manifest = image_manifest
+        self.seek_index = seek_index
+        self.fps = fps
+        self.max_width = max_width
+        self.max_height = max_height
+        self.overlay = overlay or {}
+        self.shown = 0
+        self.dropped = 0
+        self.finished = False
+
+        self._speed = speed
+        self._start_frame = start_frame
+        self._anchor = None
+        self._latest = None
+        self._taken = start_frame
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="FramePlayer", daemon=True)
+        self._thread.start()
+
+    """
+    Method: set_speed
+    --------------------------
+    Changes the playback speed. The clock restarts from the frame being played, so changing speed never
+    causes a burst of dropped frames.
+    """
+    def set_speed(self, speed):
+        with self._lock:
+            self._speed = speed
+            self._anchor = None
+
+    """
+    Method: latest
+    --------------------------
+    Returns (frame_number, rgb_image) of the newest decoded frame if it has not been returned before,
+    otherwise None. Frames decoded while the GUI was busy are replaced by newer ones and counted as dropped.
+    """
+    def latest(self):
+        with self._lock:
+            latest, self._latest = self._latest, None
+        if latest is not None:
+            self._taken = latest[0]
+            self.shown += 1
+        return latest
+
+    """
+    Method: current_frame
+    --------------------------
+    Returns the number of the frame last returned by latest, which is the frame on screen.
+    """
+    def current_frame(self):
+        return self._taken
+
+    def playing(self):
+        return self._thread.is_alive()
+
+    """
+    Method: stop
+    --------------------------
+    Stops playback and waits for the decoding thread to finish. Returns the frame on screen.
+    """
+    def stop(self):
+        self._stopped.set()
+        self._thread.join(timeout=1.0)
+        return self._taken
+
+    """
+    Method: _due
+    --------------------------
+    Returns how many seconds from now the given frame should be shown, negative if it is late. The clock
+    is anchored at the first frame played after a start or a speed change.
+    """
+    def _due(self, frame_num, fps):
+        now = time.perf_counter()
+        with self._lock:
+            if self._anchor is None:
+                self._anchor = (now, frame_num)
+            anchor_time, anchor_frame = self._anchor
+            speed = self._speed
+        return anchor_time + (frame_num - anchor_frame) / (fps * speed) - now
+
+    def _publish(self, frame_num, image):
+        image = display_proxy(image, self.max_width, self.max_height)
+        points = self.overlay.get(frame_num)
+        if points:
+            if not image.flags.writeable:
+                image = image.copy()
+            scale = image.shape[1] / self._full_width
+            for x, y, color in points:
+                cv2.drawMarker(image, (int(x * scale), int(y * scale)), color, cv2.MARKER_CROSS, 12, 2)
+        with self._lock:
+            if self._latest is not None:
+                self.dropped += 1
+            self._latest = (frame_num, image)
+
+    def _run(self):
+        try:
+            if self.video_path is not None:
+                self._play_video()
+            elif self.image_manifest is not None:
+                self._play_images()
+        finally:
+            self.finished = not self._stopped.is_set()
+
+    def _play_video(self):
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            fps = self.fps or cap.get(cv2.CAP_PROP_FPS) or DEFAULT_FPS
+            self._full_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            frame_num = self._start_frame
+            if self.seek_index is not None:
+                frame, _ = self.seek_index.read_frame(cap, frame_num, None)
+                if frame is None:
+                    return
+                self._wait(self._due(frame_num, fps))
+                self._publish(frame_num, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                frame_num += 1
+            elif frame_num > 0:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            while frame_num < self.frame_count and not self._stopped.is_set():
+                if not cap.grab():
+                    return
+                due = self._due(frame_num, fps)
+                # Late by more than a frame: skip the decode and color conversion of this one.
+                if due < -1.0 / fps and frame_num < self.frame_count - 1:
+                    with self._lock:
+                        self.dropped += 1
+                else:
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        return
+                    self._wait(due)
+                    self._publish(frame_num, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                frame_num += 1
+        finally:
+            cap.release()
+
+    def _play_images(self):
+        fps = self.fps or DEFAULT_FPS
+        frame_num = self._start_frame
+        while frame_num < self.frame_count and not self._stopped.is_set():
+            due = self._due(frame_num, fps)
+            if due < -1.0 / fps and frame_num < self.frame_count - 1:
+                # Images need no sequential decode, jump straight to the frame that is due.
+                skip = min(int(-due * fps * self._speed), self.frame_count - 1 - frame_num)
+                with self._lock:
+                    self.dropped += skip
+                frame_num += max(skip, 1)
+                continue
+            frame = self.image_manifest.read(frame_num, self.max_width, self.max_height)
+            if frame is None:
+                return
+            # Without a known size the manifest reads the image at full resolution.
+            size = self.image_manifest.frame_size(frame_num)
+            self._full_width = size[0] if size is not None else frame.shape[1]
+            self._wait(due)
+            self._publish(frame_num, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            frame_num += 1
+
+    def _wait(self, seconds):
+        if seconds > 0:
+            self._stopped.wait(seconds)
@@ -0,0 +1,164 @@
+import threading
+import cv2
+from FrameStream import read_frame_at
+from ImageFolderManifest import DECODE_WORKERS
+
+SETTLE_SECONDS = 0.03
+
+class FramePrefetcher:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a background worker that decodes a window of frames around the current slider position into
+    the shared frame cache. The worker owns its own cv2.VideoCapture handle, so it never touches the capture
+    used by the GUI thread. Image folders are read through their manifest in parallel batches. When a seek
+    index is given, video frames are located through it. ahead and behind set how many frames after and
+    before the requested position are decoded.
+    """
+    def __init__(self, frame_cache, frame_count, video_path=None, image_manifest=None, seek_index=None,
+                 ahead=30, behind=10):
+        self.frame_cache = frame_cache
+        self.frame_count = frame_count
+        self.video_path = video_path
+        self.image_manifest = image_manifest
+        self.seek_index = seek_index
+        self.ahead = ahead
+        self.behind = behind
+
+        self._cap = None
+        self._next_decode_frame = None
+        self._frame_bytes = None
+        self._center = None
+        self._generation = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="FramePrefetcher", daemon=True)
+        self._thread.start()
+
+    """
+    Method: request
+    --------------------------
+    Moves the prefetch window to the given frame number. Any work still running for an older position is
+    abandoned at the next frame boundary.
+    """
+    def request(self, frame_num):
+        with self._condition:
+            self._center = frame_num
+            self._generation += 1
+            self._condition.notify()
+
+    """
+    Method: stop
+    --------------------------
+    Stops the worker thread and releases its video capture handle. The wait for the thread is bounded, so a
+    decode may still be running when this returns, but no frame is put in the cache after it returns.
+    """
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._generation += 1
+            self._condition.notify()
+        self._thread.join(timeout=1.0)
+
+    """
+    Method: _run
+    --------------------------
+    Worker loop. Waits for a request, lets the slider settle briefly so intermediate positions of a drag
+    are skipped, then decodes the requested frame, the frames ahead of it and finally the frames behind it.
+    """
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    while self._center is None and not self._stopped:
+                        self._condition.wait()
+                    if self._stopped:
+                        return
+                    generation = self._generation
+                    self._condition.wait(SETTLE_SECONDS)
+                    if self._stopped:
+                        return
+                    if generation != self._generation:
+                        continue
+                    center = self._center
+                    self._center = None
+
+                self._prefetch_range(center, min(center + 1, self.frame_count), generation)
+                ahead, behind = self._window_size()
+                self._prefetch_range(center, min(center + ahead + 1, self.frame_count), generation)
+                self._prefetch_range(max(center - behind, 0), center, generation)
+        finally:
+            if self._cap is not None:
+                self._cap.release()
+
+    """
+    Method: _window_size
+    --------------------------
+    Returns the number of frames to decode ahead of and behind the position. The window is shrunk so it fits
+    in the cache budget, otherwise the worker would evict the frames it has just decoded.
+    """
+    def _window_size(self):
+        if self._frame_bytes is None:
+            return self.ahead, self.behind
+        capacity = max(self.frame_cache.max_bytes // self._frame_bytes - 1, 0)
+        if self.ahead + self.behind <= capacity:
+            return self.ahead, self.behind
+        ahead = capacity * self.ahead // max(self.ahead + self.behind, 1)
+        return ahead, capacity - ahead
+
+    def _is_stale(self, generation):
+        return generation != self._generation
+
+    """
+    Method: _prefetch_range
+    --------------------------
+    Decodes every uncached frame in [start, end). Images are decoded a batch at a time on the manifest's
+    thread pool. Video frames are read sequentially through read_frame_at: short runs of frames that are
+    already cached are skipped with grab() instead of a seek, longer runs are skipped with a seek.
+    """
+    def _prefetch_range(self, start, end, generation):
+        if self.image_manifest is not None:
+            pending = [n for n in range(start, end) if n not in self.frame_cache]
+            batch_size = DECODE_WORKERS * 2
+            for i in range(0, len(pending), batch_size):
+                if self._is_stale(generation):
+                    return
+                batch = pending[i:i + batch_size]
+                for frame_num, img in zip(batch, self.image_manifest.read_batch(batch)):
+                    if img is not None:
+                        self._store(frame_num, img)
+            return
+
+        if self.video_path is None:
+            return
+        if self._cap is None:
+            self._cap = cv2.VideoCapture(self.video_path)
+            self._next_decode_frame = 0
+            if not self._cap.isOpened():
+                print(f"[WARNING] Prefetcher could not open {self.video_path}.")
+                self.video_path = None
+                return
+
+        pending = [n for n in range(start, end) if n not in self.frame_cache]
+        for frame_num in pending:
+            if self._is_stale(generation):
+                return
+            frame, self._next_decode_frame = read_frame_at(self._cap, frame_num, self._next_decode_frame,
+                                                           self.seek_index)
+            if frame is None:
+                return
+            self._store(frame_num, frame)
+
+    """
+    Method: _store
+    --------------------------
+    Puts a decoded frame in the cache unless the prefetcher has been stopped. The check and the put happen
+    under the lock stop takes, so a decode that outlives stop cannot put a frame of the previous input into
+    the cache after it has been cleared for the next one.
+    """
+    def _store(self, frame_num, frame):
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self._frame_bytes = frame.nbytes
+        with self._condition:
+            if not self._stopped:
+                self.frame_cache.put(frame_num, frame)
@@ -0,0 +1,101 @@
+import cv2
+
+SEEK_THRESHOLD = 8
+
+class FrameStream:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a sequential reader over a video (video_path) or a list of numbered image files
+    (image_files). Each call to frames opens its own capture handle, seeks once to the first frame and then
+    decodes forward, so reading a range never seeks per frame. A seek index, when given, makes the initial
+    seek frame-exact.
+    """
+    def __init__(self, video_path=None, image_files=None, seek_index=None):
+        self.video_path = video_path
+        self.image_files = image_files or []
+        self.seek_index = seek_index
+
+    """
+    Method: from_session
+    --------------------------
+    Returns a stream over the input loaded in an AnnotationSession.
+    """
+    @classmethod
+    def from_session(cls, session):
+        return cls(video_path=session.video_path if session.cap is not None else None,
+                   image_files=session.image_files, seek_index=session.seek_index)
+
+    """
+    Method: frames
+    --------------------------
+    Yields (frame_number, frame) for every step-th frame in [start, end). Frames are BGR images, or
+    single-channel images when grayscale is set. Skipped video frames are passed over with grab(), which
+    avoids the color conversion and copy of a full read. Stops early at the end of the input.
+    """
+    def frames(self, start, end, step=1, grayscale=False):
+        if self.image_files:
+            flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+            for frame_num in range(max(start, 0), min(end, len(self.image_files)), step):
+                frame = cv2.imread(self.image_files[frame_num], flags)
+                if frame is None:
+                    return
+                yield frame_num, frame
+            return
+
+        if self.video_path is None or start >= end:
+            return
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            if self.seek_index is not None:
+                frame, _ = self.seek_index.read_frame(cap, start, None)
+                ret = frame is not None
+            else:
+                if start > 0:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+                ret, frame = cap.read()
+            frame_num = start
+            while ret:
+                if grayscale:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                yield frame_num, frame
+                for _ in range(step - 1):
+                    frame_num += 1
+                    if frame_num >= end or not cap.grab():
+                        return
+                frame_num += 1
+                if frame_num >= end:
+                    return
+                ret, frame = cap.read()
+        finally:
+            cap.release()
+
+"""
+Function: read_frame_at
+--------------------------
+Reads an exact frame from a capture for random access by a long-lived reader. next_decode_frame is the frame
+the capture will return next, or None if that is unknown. With a seek index the frame is located through
+it. Otherwise a frame at most SEEK_THRESHOLD frames ahead is reached by skipping the frames in between with
+grab(), and any other frame by a seek. Returns the BGR frame, or None, and the new next_decode_frame.
+"""
+def read_frame_at(cap, frame_num, next_decode_frame, seek_index=None):
+    if seek_index is not None:
+        return seek_index.read_frame(cap, frame_num, next_decode_frame)
+    if next_decode_frame is None or not 0 <= frame_num - next_decode_frame <= SEEK_THRESHOLD:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+        next_decode_frame = frame_num
+    while next_decode_frame < frame_num:
+        if not cap.grab():
+            return None, None
+        next_decode_frame += 1
+    ret, frame = cap.read()
+    return (frame, frame_num + 1) if ret else (None, None)
+
+"""
+Function: init_decode_worker
+--------------------------
+Initializer of the worker processes that decode frames in parallel. The workers already run in parallel,
+so OpenCV is kept from starting its own thread pool in each of them.
+"""
+def init_decode_worker():
+    cv2.setNumThreads(1)
@@ -0,0 +1,208 @@
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+
+MANIFEST_VERSION = 1
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+REDUCED_READ_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                      (2, cv2.IMREAD_REDUCED_COLOR_2))
+DECODE_WORKERS = 4
+
+class ImageFolderManifest:
+    """
+    Method: __init__
+    --------------------------
+    Initializes the manifest of a folder of numbered images: the image filenames sorted by frame number and
+    the (width, height) of every image, with 0 for images whose size could not be read from the header.
+    Images are decoded through a small thread pool, since cv2.imread releases the GIL.
+    """
+    def __init__(self, folder_path, names, sizes):
+        self.folder_path = folder_path
+        self.names = names
+        self.paths = [os.path.join(folder_path, name) for name in names]
+        self.sizes = np.asarray(sizes, dtype=np.int32).reshape(-1, 2)
+        self.executor = None
+
+    """
+    Method: sidecar_path
+    --------------------------
+    Returns the path of the manifest file, stored next to the folder as <folder>.manifest.json. Keeping it
+    outside the folder means writing it does not change the folder's modification time.
+    """
+    @staticmethod
+    def sidecar_path(folder_path):
+        return f"{os.path.normpath(folder_path)}.manifest.json"
+
+    """
+    Method: scan
+    --------------------------
+    Lists the JPG/PNG files of a folder with a single os.scandir pass and returns their names sorted by the
+    integer frame number in the filename. Raises ValueError if a filename is not an integer or if there are
+    no images.
+    """
+    @staticmethod
+    def scan(folder_path):
+        numbered = []
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                stem, extension = os.path.splitext(entry.name)
+                if extension.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                try:
+                    numbered.append((int(stem), entry.name))
+                except ValueError:
+                    raise ValueError("Image filenames must be integers (e.g., 0.jpg, 1.jpg, ...)")
+        if not numbered:
+            raise ValueError("No JPG/PNG files found in folder.")
+        numbered.sort()
+        return [name for _, name in numbered]
+
+    """
+    Method: build
+    --------------------------
+    Scans a folder and reads the size of every image from its file header, using a thread pool.
+    """
+    @classmethod
+    def build(cls, folder_path):
+        names = cls.scan(folder_path)
+        with ThreadPoolExecutor(max_workers=DECODE_WORKERS) as executor:
+            sizes = list(executor.map(image_size, (os.path.join(folder_path, name) for name in names)))
+        return cls(folder_path, names, sizes)
+
+    """
+    Method: load
+    --------------------------
+    Loads the cached manifest of a folder. Returns None if there is no manifest, if it was written by a
+    different version or if the folder's modification time has changed since, which happens whenever files
+    are added, removed or renamed.
+    """
+    @classmethod
+    def load(cls, folder_path):
+        manifest_path = cls.sidecar_path(folder_path)
+        try:
+            with open(manifest_path, 'r') as manifest_file:
+                manifest = json.load(manifest_file)
+            if (manifest.get('version') != MANIFEST_VERSION
+                    or manifest.get('folder_mtime_ns') != os.stat(folder_path).st_mtime_ns):
+                return None
+            return cls(folder_path, manifest['names'], list(zip(manifest['widths'], manifest['heights'])))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    """
+    Method: save
+    --------------------------
+    Writes the manifest next to the folder together with the folder's modification time. Errors are reported
+    and otherwise ignored, since a missing manifest only costs a rescan.
+    """
+    def save(self):
+        manifest_path = self.sidecar_path(self.folder_path)
+        try:
+            folder_mtime_ns = os.stat(self.folder_path).st_mtime_ns
+            temp_path = f"{manifest_path}.tmp"
+            with open(temp_path, 'w') as manifest_file:
+                json.dump({
+                    'version': MANIFEST_VERSION,
+                    'folder_mtime_ns': folder_mtime_ns,
+                    'names': self.names,
+                    'widths': self.sizes[:, 0].tolist(),
+                    'heights': self.sizes[:, 1].tolist()
+                }, manifest_file)
+            os.replace(temp_path, manifest_path)
+        except OSError as e:
+            print(f"[WARNING] Could not write manifest for {self.folder_path}: {e}")
+
+    """
+    Method: load_or_build
+    --------------------------
+    Returns the cached manifest of a folder, building and saving it first if there is no valid one.
+    """
+    @classmethod
+    def load_or_build(cls, folder_path):
+        manifest = cls.load(folder_path)
+        if manifest is None:
+            manifest = cls.build(folder_path)
+            manifest.save()
+        return manifest
+
+    def __len__(self):
+        return len(self.paths)
+
+    """
+    Method: frame_size
+    --------------------------
+    Returns the (width, height) of a frame, or None if it is unknown.
+    """
+    def frame_size(self, frame_num):
+        width, height = self.sizes[frame_num]
+        return (int(width), int(height)) if width > 0 and height > 0 else None
+
+    """
+    Method: read
+    --------------------------
+    Decodes a frame as a BGR image. When max_width and max_height are given and the frame size is known, the
+    JPEG/PNG decoder is asked for the largest reduced resolution (1/2, 1/4 or 1/8) that still covers that
+    size, which is much cheaper than a full decode. Returns None if the image cannot be read.
+    """
+    def read(self, frame_num, max_width=None, max_height=None):
+        flags = cv2.IMREAD_COLOR
+        size = self.frame_size(frame_num)
+        if max_width is not None and max_height is not None and size is not None:
+            for factor, reduced_flags in REDUCED_READ_FLAGS:
+                if size[0] // factor >= max_width or size[1] // factor >= max_height:
+                    flags = reduced_flags
+                    break
+        return cv2.imread(self.paths[frame_num], flags)
+
+    """
+    Method: read_batch
+    --------------------------
+    Decodes several frames in parallel on the manifest's thread pool and returns the BGR images in the
+    order of frame_nums.
+    """
+    def read_batch(self, frame_nums, max_width=None, max_height=None):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="ImageDecoder")
+        return list(self.executor.map(lambda n: self.read(n, max_width, max_height), frame_nums))
+
+    """
+    Method: close
+    --------------------------
+    Shuts down the decoding thread pool.
+    """
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+"""
+Function: image_size
+--------------------------
+Returns the (width, height) of a JPEG or PNG file read from its header without decoding the image, or
+(0, 0) if the header cannot be parsed.
+"""
+def image_size(path):
+    try:
+        with open(path, 'rb') as image_file:
+            header = image_file.read(26)
+            if header[:8] == b'\x89PNG\r\n\x1a\n' and header[12:16] == b'IHDR':
+                return struct.unpack('>II', header[16:24])
+            if header[:2] != b'\xff\xd8':
+                return 0, 0
+            image_file.seek(2)
+            while True:
+                marker = image_file.read(2)
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return 0, 0
+                while marker[1] == 0xFF:
+                    marker = marker[1:] + image_file.read(1)
+                segment_length = struct.unpack('>H', image_file.read(2))[0]
+                if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                    height, width = struct.unpack('>xHH', image_file.read(5))
+                    return width, height
+                image_file.seek(segment_length - 2, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return 0, 0
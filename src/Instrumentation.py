@@ -0,0 +1,221 @@
+import atexit
+import bisect
+import contextlib
+import cProfile
+import csv
+import io
+import json
+import os
+import pstats
+import threading
+import time
+
+INSTRUMENT_ENV = 'FRAME_SELECTOR_INSTRUMENT'
+INSTRUMENT_DIR_ENV = 'FRAME_SELECTOR_INSTRUMENT_DIR'
+INSTRUMENT_MODES = ('stats', 'profile')
+BUCKET_EDGES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_NULL_TIMER = contextlib.nullcontext()
+
+class LatencyHistogram:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a latency histogram with fixed bucket edges in milliseconds. Keeps the count, total,
+    minimum and maximum of the recorded durations and the number of durations per bucket; the last bucket
+    holds everything above the largest edge.
+    """
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+
+    def record(self, duration_ms):
+        self.counts[bisect.bisect_left(BUCKET_EDGES_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.min_ms = min(self.min_ms, duration_ms)
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    """
+    Method: percentile
+    --------------------------
+    Returns an upper bound of the given percentile (0-100): the upper edge of the bucket that contains it,
+    or the maximum for the last bucket.
+    """
+    def percentile(self, percent):
+        if self.count == 0:
+            return 0.0
+        target = self.count * percent / 100.0
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return min(BUCKET_EDGES_MS[i], self.max_ms) if i < len(BUCKET_EDGES_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'min_ms': self.min_ms if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'buckets': [{'le_ms': edge, 'count': count}
+                        for edge, count in zip(list(BUCKET_EDGES_MS) + [None], self.counts)]
+        }
+
+class _Timer:
+    def __init__(self, instrumentation, stage):
+        self.instrumentation = instrumentation
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.instrumentation.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+class Instrumentation:
+    """
+    Method: __init__
+    --------------------------
+    Initializes the timing instrumentation. While disabled, timed returns a shared no-op context manager, so
+    instrumented code pays a single attribute check. mode is 'stats' for latency histograms per stage or
+    'profile' to also run cProfile on the main thread; output_dir is where the reports are written at exit.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.mode = None
+        self.output_dir = None
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.profiler = None
+        self.started = None
+
+    """
+    Method: enable
+    --------------------------
+    Turns the instrumentation on and registers the reports to be written when the interpreter exits.
+    Raises ValueError for an unknown mode.
+    """
+    def enable(self, mode='stats', output_dir='instrumentation'):
+        if mode not in INSTRUMENT_MODES:
+            raise ValueError(f"Unknown instrumentation mode '{mode}', expected one of {INSTRUMENT_MODES}")
+        if self.enabled:
+            return
+        self.enabled = True
+        self.mode = mode
+        self.output_dir = output_dir
+        self.started = time.strftime('%Y%m%d-%H%M%S')
+        if mode == 'profile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        atexit.register(self.write_reports)
+        print(f"[INFO] Instrumentation enabled ({mode}), reports go to {output_dir}")
+
+    """
+    Method: timed
+    --------------------------
+    Returns a context manager that records the time spent in its block under the given stage.
+    """
+    def timed(self, stage):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def record(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(seconds * 1000.0)
+
+    """
+    Method: report
+    --------------------------
+    Returns the histograms of all stages that recorded at least one duration, keyed by stage.
+    """
+    def report(self):
+        with self.lock:
+            return {stage: histogram.as_dict() for stage, histogram in sorted(self.histograms.items())}
+
+    def export_json(self, path):
+        with open(path, 'w') as json_file:
+            json.dump({'started': self.started, 'mode': self.mode, 'stages': self.report()}, json_file, indent=2)
+
+    """
+    Method: export_csv
+    --------------------------
+    Writes one row of summary statistics per stage.
+    """
+    def export_csv(self, path):
+        columns = ['count', 'total_ms', 'mean_ms', 'min_ms', 'max_ms', 'p50_ms', 'p95_ms', 'p99_ms']
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['stage'] + columns)
+            for stage, stats in self.report().items():
+                writer.writerow([stage] + [stats[column] for column in columns])
+
+    """
+    Method: write_reports
+    --------------------------
+    Writes the JSON and CSV reports, and the cProfile statistics in profile mode, to the output directory
+    and prints a per-stage summary. Errors are reported and otherwise ignored, since this runs at exit.
+    """
+    def write_reports(self):
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base_path = os.path.join(self.output_dir, f"timings_{self.started}")
+            self.export_json(f"{base_path}.json")
+            self.export_csv(f"{base_path}.csv")
+            for stage, stats in self.report().items():
+                print(f"[INFO] {stage}: {stats['count']} calls, mean {stats['mean_ms']:.2f} ms, "
+                      f"p95 <= {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms")
+            if self.profiler is not None:
+                self.profiler.disable()
+                self.profiler.dump_stats(f"{base_path}.prof")
+                summary = io.StringIO()
+                pstats.Stats(self.profiler, stream=summary).sort_stats('cumulative').print_stats(25)
+                print(summary.getvalue())
+            print(f"[INFO] Instrumentation reports written to {base_path}.*")
+        except OSError as e:
+            print(f"[WARNING] Could not write instrumentation reports: {e}")
+
+instrumentation = Instrumentation()
+
+"""
+Function: timed
+--------------------------
+Returns a context manager timing its block under the given stage of the process-wide instrumentation, or a
+no-op context manager while instrumentation is off.
+"""
+def timed(stage):
+    return instrumentation.timed(stage)
+
+"""
+Function: enable_from_environment
+--------------------------
+Enables the process-wide instrumentation when FRAME_SELECTOR_INSTRUMENT is set to 'stats' (or '1') or
+'profile'. FRAME_SELECTOR_INSTRUMENT_DIR overrides the report directory.
+"""
+def enable_from_environment():
+    mode = os.environ.get(INSTRUMENT_ENV, '').strip().lower()
+    if mode in ('', '0', 'off'):
+        return
+    try:
+        instrumentation.enable('stats' if mode == '1' else mode,
+                               os.environ.get(INSTRUMENT_DIR_ENV, 'instrumentation'))
+    except ValueError as e:
+        print(f"[WARNING] {e}")
+
+enable_from_environment()
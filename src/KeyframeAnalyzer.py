@@ -0,0 +1,307 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import cv2
+import numpy as np
+from FrameStream import FrameStream, init_decode_worker
+from SeekIndex import SeekIndex
+
+KEYFRAMES_VERSION = 1
+ANALYSIS_WIDTH = 64
+HISTOGRAM_BINS = 32
+CHUNK_SAMPLES = 512
+MIN_SEGMENT = 12
+MAX_KEYFRAMES = 50
+CUT_THRESHOLD = 0.25
+DRIFT_THRESHOLD = 0.4
+
+class KeyframeAnalysis:
+    """
+    Method: __init__
+    --------------------------
+    Initializes the result of a scene-change analysis. segments is the list of (start, end) frame ranges the
+    input was split into and keyframes the ranked list of representative frames, each a dictionary with the
+    frame number, the start and end of its segment and its rank score. The first keyframe is the most useful
+    one to annotate; each following one is the frame least like the frames ranked before it.
+    """
+    def __init__(self, keyframes, segments, frame_count, step=1):
+        self.keyframes = keyframes
+        self.segments = segments
+        self.frame_count = frame_count
+        self.step = step
+
+    def __len__(self):
+        return len(self.keyframes)
+
+    """
+    Method: frames
+    --------------------------
+    Returns the frame numbers of the keyframes in rank order.
+    """
+    def frames(self):
+        return [keyframe['frame'] for keyframe in self.keyframes]
+
+    """
+    Method: sidecar_path
+    --------------------------
+    Returns the path of the analysis result, stored next to the video or image folder as
+    <source>.keyframes.json.
+    """
+    @staticmethod
+    def sidecar_path(source_path):
+        return f"{source_path.rstrip(os.sep)}.keyframes.json"
+
+    """
+    Method: load
+    --------------------------
+    Loads the saved analysis of a video or image folder. Returns None if there is none or if the source or
+    its frame count has changed since it was analyzed.
+    """
+    @classmethod
+    def load(cls, source_path, frame_count):
+        path = cls.sidecar_path(source_path)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as json_file:
+                data = json.load(json_file)
+            stat = os.stat(source_path)
+            if (data.get('version') != KEYFRAMES_VERSION or data.get('source_size') != stat.st_size
+                    or data.get('source_mtime') != stat.st_mtime or data.get('frame_count') != frame_count):
+                return None
+            return cls(data['keyframes'], [tuple(segment) for segment in data['segments']], frame_count,
+                       data['step'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    """
+    Method: save
+    --------------------------
+    Writes the analysis next to its video or image folder. Failures are reported as a warning only, the
+    analysis is simply redone next time.
+    """
+    def save(self, source_path):
+        path = self.sidecar_path(source_path)
+        try:
+            stat = os.stat(source_path)
+            with open(path + '.tmp', 'w') as json_file:
+                json.dump({
+                    'version': KEYFRAMES_VERSION,
+                    'source_size': stat.st_size,
+                    'source_mtime': stat.st_mtime,
+                    'frame_count': self.frame_count,
+                    'step': self.step,
+                    'segments': self.segments,
+                    'keyframes': self.keyframes
+                }, json_file)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"[WARNING] Could not write keyframes for {source_path}: {e}")
+
+    """
+    Method: analyze
+    --------------------------
+    Streams a video (video_path) or list of numbered image files (image_files) once and recommends the
+    frames to annotate. Every step-th frame is reduced to a small grayscale image, and the mean absolute
+    difference to the previous sample and the distance between their intensity histograms are computed.
+    The input is cut into chunks of chunk_samples samples which are analyzed in a pool of worker processes
+    (workers defaults to the number of CPUs). Hard cuts are placed at peaks of the combined change score, at
+    least min_segment samples apart, and segments that drift too far from their first frame (fades, slow
+    pans) are split again. The frame closest to the average look of each segment represents it, and at most
+    max_keyframes of them are ranked. progress is called with (samples done, total samples) and cancelled
+    is checked between chunks; a cancelled analysis returns None. The result is saved next to source_path.
+    Raises ValueError if no frame can be read.
+    """
+    @classmethod
+    def analyze(cls, source_path, frame_count, video_path=None, image_files=None, step=1, workers=None,
+                chunk_samples=CHUNK_SAMPLES, min_segment=MIN_SEGMENT, max_keyframes=MAX_KEYFRAMES,
+                progress=None, cancelled=None):
+        if step < 1:
+            raise ValueError("step must be at least 1")
+        total = -(-frame_count // step)
+        if total == 0:
+            return None
+
+        ranges = [(first, min(first + chunk_samples, total)) for first in range(0, total, chunk_samples)]
+        tasks = []
+        for first, last in ranges:
+            # Each chunk also reads the sample before it, so the first difference of a chunk is known.
+            read_first = max(first - 1, 0)
+            if image_files:
+                tasks.append((None, image_files[read_first * step:last * step], 0, (last - read_first) * step,
+                              step, first > 0))
+            else:
+                tasks.append((video_path, None, read_first * step, last * step, step, first > 0))
+
+        results = {}
+        if len(tasks) == 1 or workers == 1:
+            for i, task in enumerate(tasks):
+                if cancelled is not None and cancelled():
+                    return None
+                results[i] = _analyze_range(*task)
+                if progress is not None:
+                    progress(sum(len(diffs) for diffs, _ in results.values()), total)
+        else:
+            # Spawned workers, forking a process that runs decoder or GUI threads is not safe.
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_decode_worker,
+                                           mp_context=multiprocessing.get_context('spawn'))
+            try:
+                futures = {executor.submit(_analyze_range, *task): i for i, task in enumerate(tasks)}
+                for future in as_completed(futures):
+                    if cancelled is not None and cancelled():
+                        return None
+                    results[futures[future]] = future.result()
+                    if progress is not None:
+                        progress(sum(len(diffs) for diffs, _ in results.values()), total)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        diffs, histograms = _merge_chunks([results[i] for i in range(len(tasks))], ranges, total)
+        analysis = cls.from_statistics(diffs, histograms, frame_count, step, min_segment, max_keyframes)
+        analysis.save(source_path)
+        return analysis
+
+    """
+    Method: from_statistics
+    --------------------------
+    Builds the analysis from per-sample change statistics: diffs holds the mean absolute difference of each
+    sample to the previous one (0-1) and histograms the normalized intensity histogram of each sample.
+    """
+    @classmethod
+    def from_statistics(cls, diffs, histograms, frame_count, step=1, min_segment=MIN_SEGMENT,
+                        max_keyframes=MAX_KEYFRAMES):
+        histogram_distances = np.zeros(len(diffs), dtype=np.float32)
+        histogram_distances[1:] = 0.5 * np.abs(np.diff(histograms, axis=0)).sum(axis=1)
+        scores = histogram_distances + diffs
+        bounds = _split_segments(scores, histograms, min_segment)
+
+        representatives = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            segment = histograms[start:end]
+            # Closest to the segment's average histogram, with motion (likely blur) as a tie-breaker.
+            cost = 0.5 * np.abs(segment - segment.mean(axis=0)).sum(axis=1) + diffs[start:end]
+            cost[0] += scores[start]
+            representatives.append(start + int(np.argmin(cost)))
+
+        lengths = np.diff(bounds).astype(np.float64)
+        order, rank_scores = _rank_representatives(histograms[representatives], lengths, max_keyframes)
+        segments = [(int(start) * step, int(end) * step) for start, end in zip(bounds[:-1], bounds[1:])]
+        segments[-1] = (segments[-1][0], frame_count)
+        keyframes = [{'frame': int(representatives[i]) * step, 'start': segments[i][0], 'end': segments[i][1],
+                      'score': round(float(score), 4)}
+                     for i, score in zip(order, rank_scores)]
+        return cls(keyframes, segments, frame_count, step)
+
+"""
+Function: _analyze_range
+--------------------------
+Worker task. Decodes every step-th frame of [start, end) sequentially, starting with a single seek, shrinks
+it to a small grayscale image and returns (diffs, histograms) with the mean absolute difference to the
+previous sample and the normalized histogram of each sample. With skip_first the first sample is only read
+as the reference for the second one and is not part of the result.
+"""
+def _analyze_range(video_path, image_files, start, end, step, skip_first):
+    if image_files:
+        stream = FrameStream(image_files=image_files)
+    else:
+        stream = FrameStream(video_path=video_path, seek_index=SeekIndex.load(video_path))
+    diffs = []
+    histograms = []
+    previous = None
+    for _, frame in stream.frames(start, end, step=step, grayscale=True):
+        height = max(1, round(ANALYSIS_WIDTH * frame.shape[0] / frame.shape[1]))
+        small = cv2.resize(frame, (ANALYSIS_WIDTH, height), interpolation=cv2.INTER_AREA).astype(np.int16)
+        histogram = np.bincount((small // (256 // HISTOGRAM_BINS)).ravel(), minlength=HISTOGRAM_BINS)
+        diffs.append(0.0 if previous is None else float(np.abs(small - previous).mean()) / 255)
+        histograms.append(histogram / small.size)
+        previous = small
+    if skip_first:
+        diffs, histograms = diffs[1:], histograms[1:]
+    return (np.asarray(diffs, dtype=np.float32),
+            np.asarray(histograms, dtype=np.float32).reshape(-1, HISTOGRAM_BINS))
+
+"""
+Function: _merge_chunks
+--------------------------
+Concatenates the chunk results, given with the (first, last) sample range of each chunk. Samples missing at
+the end of the input (e.g. a truncated video) are dropped, and samples missing in between are filled in as
+unchanged copies of the last sample that was read.
+"""
+def _merge_chunks(chunks, ranges, total):
+    diffs = np.zeros(total, dtype=np.float32)
+    histograms = np.zeros((total, HISTOGRAM_BINS), dtype=np.float32)
+    read = np.zeros(total, dtype=bool)
+    for (chunk_diffs, chunk_histograms), (first, last) in zip(chunks, ranges):
+        count = min(len(chunk_diffs), last - first)
+        diffs[first:first + count] = chunk_diffs[:count]
+        histograms[first:first + count] = chunk_histograms[:count]
+        read[first:first + count] = True
+    if not read.any():
+        raise ValueError("No frame of the input could be read")
+    end = int(np.flatnonzero(read)[-1]) + 1
+    diffs, histograms, read = diffs[:end], histograms[:end], read[:end]
+    if not read.all():
+        last_read = np.maximum.accumulate(np.where(read, np.arange(end), -1))
+        last_read[last_read < 0] = np.flatnonzero(read)[0]
+        histograms = histograms[last_read]
+    return diffs, histograms
+
+"""
+Function: _split_segments
+--------------------------
+Returns the sample indices where segments start, followed by the number of samples. Cuts are the highest
+scores above an adaptive threshold (the median score plus several median deviations, at least
+CUT_THRESHOLD), taken greedily so no two cuts are closer than min_segment samples. Each segment is then
+split again wherever its histogram has moved more than DRIFT_THRESHOLD away from the start of the segment.
+"""
+def _split_segments(scores, histograms, min_segment):
+    total = len(scores)
+    median = float(np.median(scores))
+    threshold = max(median + 6 * float(np.median(np.abs(scores - median))), CUT_THRESHOLD)
+    candidates = np.flatnonzero(scores > threshold)
+    candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+    taken = np.zeros(total + 1, dtype=bool)
+    taken[0] = taken[total] = True
+    for cut in candidates:
+        if min_segment <= cut <= total - min_segment and not taken[cut - min_segment + 1:cut + min_segment].any():
+            taken[cut] = True
+
+    bounds = []
+    hard_cuts = np.flatnonzero(taken)
+    for start, end in zip(hard_cuts[:-1], hard_cuts[1:]):
+        anchor = start
+        while True:
+            bounds.append(anchor)
+            drift = 0.5 * np.abs(histograms[anchor + min_segment:end - min_segment + 1]
+                                 - histograms[anchor]).sum(axis=1)
+            beyond = np.flatnonzero(drift > DRIFT_THRESHOLD)
+            if not len(beyond):
+                break
+            anchor += min_segment + int(beyond[0])
+    bounds.append(total)
+    return np.asarray(bounds, dtype=np.int64)
+
+"""
+Function: _rank_representatives
+--------------------------
+Orders segment representatives greedily: the representative of the longest segment comes first, and each
+following one maximizes its histogram distance to the nearest already ranked one, weighted by the square
+root of its segment's share of the input so long segments win over brief flashes. Returns the order, at
+most max_keyframes long, and the score each one was picked with.
+"""
+def _rank_representatives(histograms, lengths, max_keyframes):
+    weights = np.sqrt(lengths / lengths.max())
+    first = int(np.argmax(lengths))
+    order = [first]
+    scores = [1.0]
+    nearest = 0.5 * np.abs(histograms - histograms[first]).sum(axis=1)
+    nearest[first] = -1
+    while len(order) < min(max_keyframes, len(histograms)):
+        priority = nearest * weights
+        best = int(np.argmax(priority))
+        order.append(best)
+        scores.append(float(priority[best]))
+        nearest = np.minimum(nearest, 0.5 * np.abs(histograms - histograms[best]).sum(axis=1))
+        nearest[order] = -1
+    return order, scores
@@ -0,0 +1,168 @@
+import numpy as np
+from matplotlib.lines import Line2D
+from matplotlib.patches import Rectangle
+from Instrumentation import timed
+
+class MarkerRenderer:
+    """
+    Method: __init__
+    --------------------------
+    Initializes the marker layer of an annotation axes. Every object is drawn as a single animated Line2D
+    holding all of its points as '+' markers. The rendered frame under the markers is cached after each full
+    draw of the figure, so adding or clearing points only restores that background, draws the marker
+    artists and blits the axes instead of re-rendering the image. Selected points are circled by a separate
+    selection artist, suggested points that have not been accepted yet are drawn as 'x' markers, and a
+    rubber band rectangle shows a selection being dragged.
+    """
+    def __init__(self, fig, ax, marker_size=12, line_width=1):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = fig.canvas
+        self.marker_size = marker_size
+        self.line_width = line_width
+        self.artists = {}
+        self.selection = Line2D([], [], linestyle='none', marker='o', markerfacecolor='none', color='white',
+                                markersize=marker_size, markeredgewidth=line_width, animated=True)
+        self.ax.add_line(self.selection)
+        self.suggestions = Line2D([], [], linestyle='none', marker='x', color='white',
+                                  markersize=marker_size * 0.75, markeredgewidth=line_width, animated=True)
+        self.ax.add_line(self.suggestions)
+        self.rubber_band = Rectangle((0, 0), 0, 0, fill=False, edgecolor='white', linestyle='--',
+                                     visible=False, animated=True)
+        self.ax.add_patch(self.rubber_band)
+        self.background = None
+        self.draw_cid = self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    """
+    Method: on_draw
+    --------------------------
+    Called after every full draw of the figure. Caches the freshly rendered axes as the blitting background
+    and draws the markers on top of it, since animated artists are skipped by normal draws.
+    """
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_markers()
+
+    def draw_markers(self):
+        for artist in self.artists.values():
+            self.ax.draw_artist(artist)
+        self.ax.draw_artist(self.selection)
+        self.ax.draw_artist(self.suggestions)
+        self.ax.draw_artist(self.rubber_band)
+
+    """
+    Method: artist_for
+    --------------------------
+    Returns the marker artist of an object, creating an empty one in the given color the first time the
+    object is drawn.
+    """
+    def artist_for(self, object_name, color):
+        artist = self.artists.get(object_name)
+        if artist is None:
+            artist = Line2D([], [], linestyle='none', marker='+', color=color,
+                            markersize=self.marker_size, markeredgewidth=self.line_width, animated=True)
+            self.ax.add_line(artist)
+            self.artists[object_name] = artist
+        return artist
+
+    """
+    Method: add_point
+    --------------------------
+    Adds a marker for one point of an object and blits the change.
+    """
+    def add_point(self, object_name, x, y, color):
+        artist = self.artist_for(object_name, color)
+        xs, ys = artist.get_data()
+        artist.set_data(list(xs) + [x], list(ys) + [y])
+        self.blit()
+
+    """
+    Method: set_points
+    --------------------------
+    Replaces all markers of an object with the given (x, y) points, a list or an (n, 2) array, and blits the
+    change unless blit is False.
+    """
+    def set_points(self, object_name, points, color, blit=True):
+        artist = self.artist_for(object_name, color)
+        artist.set_color(color)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        artist.set_data(points[:, 0], points[:, 1])
+        if blit:
+            self.blit()
+
+    """
+    Method: set_selection
+    --------------------------
+    Circles the given (x, y) points, a list or an (n, 2) array, as the current selection and blits the
+    change.
+    """
+    def set_selection(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.selection.set_data(points[:, 0], points[:, 1])
+        self.blit()
+
+    """
+    Method: set_suggestions
+    --------------------------
+    Shows the given (x, y) points, a list or an (n, 2) array, as suggested points in the given color and
+    blits the change. An empty list hides the suggestions.
+    """
+    def set_suggestions(self, points, color='white'):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.suggestions.set_data(points[:, 0], points[:, 1])
+        self.suggestions.set_color(color)
+        self.blit()
+
+    """
+    Method: set_rubber_band
+    --------------------------
+    Shows the selection rectangle spanned by two corners, or hides it if no corners are given, and blits the
+    change.
+    """
+    def set_rubber_band(self, corner=None, opposite=None):
+        if corner is None:
+            self.rubber_band.set_visible(False)
+        else:
+            self.rubber_band.set_bounds(min(corner[0], opposite[0]), min(corner[1], opposite[1]),
+                                        abs(opposite[0] - corner[0]), abs(opposite[1] - corner[1]))
+            self.rubber_band.set_visible(True)
+        self.blit()
+
+    """
+    Method: clear
+    --------------------------
+    Removes every marker of an object, or of all objects if no object name is given, and blits the change.
+    """
+    def clear(self, object_name=None):
+        names = list(self.artists) if object_name is None else [object_name]
+        for name in names:
+            artist = self.artists.get(name)
+            if artist is not None:
+                artist.set_data([], [])
+        if object_name is None:
+            self.selection.set_data([], [])
+            self.suggestions.set_data([], [])
+        self.blit()
+
+    """
+    Method: blit
+    --------------------------
+    Restores the cached background, draws every marker artist, the selection, the suggestions and the
+    rubber band and blits the axes. Falls back to a deferred full draw if no background has been cached yet.
+    """
+    def blit(self):
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        with timed('marker_draw'):
+            self.canvas.restore_region(self.background)
+            self.draw_markers()
+            self.canvas.blit(self.ax.bbox)
+
+    """
+    Method: disconnect
+    --------------------------
+    Disconnects the renderer from the figure's draw events.
+    """
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self.draw_cid)
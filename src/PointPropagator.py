@@ -0,0 +1,108 @@
+import cv2
+import numpy as np
+
+class PointPropagator:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a pyramidal Lucas-Kanade point tracker. win_size and max_level configure the LK search window
+    and pyramid depth. A point is dropped once the tracker loses it, once its LK error exceeds max_error,
+    once tracking it back to the previous frame misses its start by more than max_fb_error pixels, or once
+    it leaves the frame. Dropped points stay dropped for the rest of the range. Backward tracking reads the
+    frames before the anchor frame in chunks of at most backward_chunk frames, which bounds its memory use.
+    """
+    def __init__(self, win_size=21, max_level=3, max_error=30.0, max_fb_error=1.0, backward_chunk=32):
+        self.lk_params = {
+            'winSize': (win_size, win_size),
+            'maxLevel': max_level,
+            'criteria': (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01)
+        }
+        self.max_error = max_error
+        self.max_fb_error = max_fb_error
+        self.backward_chunk = backward_chunk
+
+    """
+    Method: track
+    --------------------------
+    Tracks the points of every object on frame_num forward to last_frame and backward to first_frame.
+    objects maps each object name to a list of (x, y) points. Frames are read sequentially from a
+    FrameStream. Returns a dictionary mapping each other frame in the range to a dictionary of object name to
+    tracked (x, y) points, leaving out frames on which every point was dropped. Raises ValueError if
+    frame_num lies outside [first_frame, last_frame].
+    """
+    def track(self, stream, objects, frame_num, first_frame, last_frame):
+        if not first_frame <= frame_num <= last_frame:
+            raise ValueError(f"Frame {frame_num} lies outside the range {first_frame}-{last_frame}")
+        names = [name for name, points in objects.items() for _ in points]
+        points = np.array([point for name in objects for point in objects[name]],
+                          dtype=np.float32).reshape(-1, 1, 2)
+        object_ids = np.arange(len(names))
+        results = {}
+        if len(points) == 0:
+            return results
+
+        forward = stream.frames(frame_num, last_frame + 1, grayscale=True)
+        self._track_sequence(forward, points, object_ids, names, results)
+
+        if first_frame < frame_num:
+            backward = self._reversed_frames(stream, first_frame, frame_num + 1)
+            self._track_sequence(backward, points, object_ids, names, results)
+        return results
+
+    """
+    Method: _reversed_frames
+    --------------------------
+    Yields the grayscale frames of [start, end) from last to first. A stream can only be read forward, so
+    the range is read in chunks of backward_chunk frames, starting with the last one, and each chunk is
+    yielded in reverse. Chunks are only read when they are reached, so tracking that loses every point
+    stops reading.
+    """
+    def _reversed_frames(self, stream, start, end):
+        chunk = max(self.backward_chunk, 1)
+        while end > start:
+            chunk_start = max(end - chunk, start)
+            frames = list(stream.frames(chunk_start, end, grayscale=True))
+            yield from reversed(frames)
+            if len(frames) < end - chunk_start:
+                return
+            end = chunk_start
+
+    """
+    Method: _track_sequence
+    --------------------------
+    Tracks points through a sequence of (frame_number, grayscale frame) pairs whose first frame is the
+    frame the points were placed on, adding the surviving points of every later frame to results.
+    """
+    def _track_sequence(self, frames, points, object_ids, names, results):
+        frames = iter(frames)
+        first = next(frames, None)
+        if first is None:
+            return
+        _, prev_gray = first
+        for frame_num, gray in frames:
+            points, object_ids = self.step(prev_gray, gray, points, object_ids)
+            if len(points) == 0:
+                return
+            frame_objects = results.setdefault(frame_num, {})
+            for object_id, (x, y) in zip(object_ids, points.reshape(-1, 2)):
+                frame_objects.setdefault(names[object_id], []).append((float(x), float(y)))
+            prev_gray = gray
+
+    """
+    Method: step
+    --------------------------
+    Tracks all points of all objects from one frame to the next in a single vectorized call, followed by a
+    backward call for the forward-backward check. Returns the surviving points and the object ids they
+    belong to.
+    """
+    def step(self, prev_gray, gray, points, object_ids):
+        next_points, status, error = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None, **self.lk_params)
+        back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, prev_gray, next_points, None,
+                                                               **self.lk_params)
+        fb_error = np.linalg.norm((back_points - points).reshape(-1, 2), axis=1)
+        height, width = gray.shape[:2]
+        xy = next_points.reshape(-1, 2)
+        keep = ((status.ravel() == 1) & (back_status.ravel() == 1)
+                & (error.ravel() <= self.max_error) & (fb_error <= self.max_fb_error)
+                & (xy[:, 0] >= 0) & (xy[:, 0] <= width - 1) & (xy[:, 1] >= 0) & (xy[:, 1] <= height - 1))
+        return next_points[keep], object_ids[keep]
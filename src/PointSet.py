@@ -0,0 +1,237 @@
+import numpy as np
+
+DEFAULT_CELL_SIZE = 32.0
+_KEY_STRIDE = np.int64(1 << 32)
+
+class PointSet:
+    """
+    Method: __init__
+    --------------------------
+    Initializes the points of all objects on one frame. Coordinates are kept in a growing NumPy array in the
+    order they were added, together with the id of the object every point belongs to. A uniform grid of
+    cell_size x cell_size pixel cells indexes the points for nearest-point and rectangle queries: the
+    points are sorted by cell key, so the points of a run of cells in one grid column form a contiguous
+    slice found with a binary search. The sort is redone lazily on the first query after an edit.
+    """
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self._xy = np.empty((16, 2), dtype=np.float64)
+        self._ids = np.empty(16, dtype=np.int32)
+        self._count = 0
+        self.object_names = []
+        self._object_ids = {}
+        self.colors = {}
+        self._order = None
+        self._sorted_keys = None
+        self._bounds = None
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, object_name):
+        return object_name in self._object_ids
+
+    @property
+    def xy(self):
+        return self._xy[:self._count]
+
+    @property
+    def ids(self):
+        return self._ids[:self._count]
+
+    """
+    Method: object_id
+    --------------------------
+    Returns the id of an object, registering it with the given color the first time it is seen. The color
+    of a known object is kept.
+    """
+    def object_id(self, object_name, color=None):
+        object_id = self._object_ids.get(object_name)
+        if object_id is None:
+            object_id = self._object_ids[object_name] = len(self.object_names)
+            self.object_names.append(object_name)
+            self.colors[object_name] = color
+        return object_id
+
+    def _reserve(self, count):
+        if count > len(self._xy):
+            capacity = max(count, 2 * len(self._xy))
+            self._xy = np.resize(self._xy, (capacity, 2))
+            self._ids = np.resize(self._ids, capacity)
+
+    """
+    Method: add
+    --------------------------
+    Adds one point to an object and returns its index.
+    """
+    def add(self, object_name, x, y, color=None):
+        return self.add_many(object_name, [(x, y)], color)[0]
+
+    """
+    Method: add_many
+    --------------------------
+    Adds a sequence or (n, 2) array of points to an object and returns their indices.
+    """
+    def add_many(self, object_name, points, color=None):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        object_id = self.object_id(object_name, color)
+        first = self._count
+        self._reserve(first + len(points))
+        self._xy[first:first + len(points)] = points
+        self._ids[first:first + len(points)] = object_id
+        self._count += len(points)
+        self._order = None
+        return np.arange(first, self._count)
+
+    """
+    Method: remove
+    --------------------------
+    Removes the points with the given indices, keeping the order of the remaining points. Indices of later
+    points shift down. Returns the removed points as (object_name, x, y) tuples.
+    """
+    def remove(self, indices):
+        indices = np.unique(np.asarray(indices, dtype=np.intp).ravel())
+        removed = [(self.object_names[self._ids[i]], float(self._xy[i, 0]), float(self._xy[i, 1]))
+                   for i in indices]
+        if len(indices):
+            keep = np.ones(self._count, dtype=bool)
+            keep[indices] = False
+            remaining = int(keep.sum())
+            self._xy[:remaining] = self.xy[keep]
+            self._ids[:remaining] = self.ids[keep]
+            self._count = remaining
+            self._order = None
+        return removed
+
+    """
+    Method: move
+    --------------------------
+    Moves the point with the given index to (x, y).
+    """
+    def move(self, index, x, y):
+        self._xy[index] = (x, y)
+        self._order = None
+
+    """
+    Method: clear
+    --------------------------
+    Removes every point of an object, or of all objects if no object name is given. Objects stay
+    registered with their colors.
+    """
+    def clear(self, object_name=None):
+        if object_name is None:
+            self._count = 0
+            self._order = None
+        elif object_name in self._object_ids:
+            self.remove(self.indices_of(object_name))
+
+    def object_of(self, index):
+        return self.object_names[self._ids[index]]
+
+    """
+    Method: indices_of
+    --------------------------
+    Returns the indices of the points of an object in the order they were added.
+    """
+    def indices_of(self, object_name):
+        object_id = self._object_ids.get(object_name)
+        if object_id is None:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero(self.ids == object_id)
+
+    """
+    Method: points
+    --------------------------
+    Returns the points of an object as an (n, 2) array in the order they were added.
+    """
+    def points(self, object_name):
+        return self.xy[self.indices_of(object_name)]
+
+    """
+    Method: rows
+    --------------------------
+    Yields every point as an (object_name, x, y) tuple in the order the points were added.
+    """
+    def rows(self):
+        for object_id, (x, y) in zip(self.ids.tolist(), self.xy.tolist()):
+            yield self.object_names[object_id], x, y
+
+    def _cell(self, x, y):
+        return np.floor(x / self.cell_size).astype(np.int64), np.floor(y / self.cell_size).astype(np.int64)
+
+    def _build_index(self):
+        cx, cy = self._cell(self.xy[:, 0], self.xy[:, 1])
+        keys = cx * _KEY_STRIDE + cy
+        self._order = np.argsort(keys, kind='stable')
+        self._sorted_keys = keys[self._order]
+        self._bounds = (self.xy.min(axis=0), self.xy.max(axis=0))
+
+    """
+    Method: in_rect
+    --------------------------
+    Returns the indices of the points inside the rectangle spanned by two corners, optionally only those of
+    one object, in ascending order. Only the grid cells overlapping the rectangle are searched.
+    """
+    def in_rect(self, x0, y0, x1, y1, object_name=None):
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        if self._count == 0:
+            return np.empty(0, dtype=np.intp)
+        if self._order is None:
+            self._build_index()
+        (cx0, cx1), (cy0, cy1) = self._cell(np.array([x0, x1]), np.array([y0, y1]))
+        columns = np.arange(cx0, cx1 + 1, dtype=np.int64)
+        starts = np.searchsorted(self._sorted_keys, columns * _KEY_STRIDE + cy0, side='left')
+        ends = np.searchsorted(self._sorted_keys, columns * _KEY_STRIDE + cy1, side='right')
+        candidates = np.concatenate([self._order[start:end] for start, end in zip(starts, ends)] or [[]])
+        candidates = candidates.astype(np.intp)
+        xy = self._xy[candidates]
+        inside = (xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1)
+        if object_name is not None:
+            inside &= self._ids[candidates] == self._object_ids.get(object_name, -1)
+        return np.sort(candidates[inside])
+
+    """
+    Method: nearest
+    --------------------------
+    Returns the index of the point closest to (x, y), optionally only among the points of one object and
+    within max_distance, or None if there is no such point. The search looks at a square of grid cells
+    around (x, y) and doubles it until a point is found whose distance proves no closer point lies outside
+    the square. Once the square would cover the bounding box of all points, they are scanned directly.
+    """
+    def nearest(self, x, y, max_distance=None, object_name=None):
+        if self._count == 0:
+            return None
+        if self._order is None:
+            self._build_index()
+        low, high = self._bounds
+        extent = float(max(x - low[0], high[0] - x, y - low[1], high[1] - y, 0.0))
+        limit = extent if max_distance is None else min(max_distance, extent)
+        radius = min(self.cell_size, limit)
+        while True:
+            if radius >= extent:
+                # x - extent can round to just inside a point on the bounding box, so no square is used.
+                candidates = np.arange(self._count) if object_name is None else self.indices_of(object_name)
+            else:
+                candidates = self.in_rect(x - radius, y - radius, x + radius, y + radius, object_name)
+            if len(candidates):
+                distances = np.hypot(self._xy[candidates, 0] - x, self._xy[candidates, 1] - y)
+                best = int(np.argmin(distances))
+                # Once the square covers every point, the closest candidate is the closest point.
+                if distances[best] <= radius or radius >= extent:
+                    if max_distance is not None and distances[best] > max_distance:
+                        return None
+                    return int(candidates[best])
+            if radius >= limit:
+                return None
+            radius = min(radius * 2, limit)
+
+    """
+    Method: objects
+    --------------------------
+    Returns a dictionary mapping each object name to {'points': [(x, y), ...], 'color': color}.
+    """
+    def objects(self):
+        return {name: {'points': [tuple(point) for point in self.points(name).tolist()],
+                       'color': self.colors[name]}
+                for name in self.object_names}
@@ -0,0 +1,131 @@
+import json
+import os
+import numpy as np
+
+PROMPTS_VERSION = 1
+PROMPT_ARRAYS = ('frames', 'offsets', 'object_ids', 'points', 'labels')
+POSITIVE_LABEL = 1
+
+"""
+Function: export_prompts
+--------------------------
+Writes the points of a video in an annotation store as a columnar prompt export: a directory of .npy
+arrays that can be memory-mapped. frames holds the sorted annotated frame numbers and offsets the start of
+each frame's points in the point arrays, with one extra entry at the end, so the points of frames[i] are
+rows offsets[i]:offsets[i + 1]. Within a frame the points are grouped by object id. object_ids, points
+(float32 x, y in frame pixels) and labels (1 for a positive prompt; every stored point is positive) hold one
+row per point, and meta.json maps object ids to object names. The arrays are written to temporary files and
+moved into place, with meta.json last, so a reader never sees a partial export. Returns the number of
+points written.
+"""
+def export_prompts(store, video_name, output_dir):
+    object_ids = {}
+    frames, counts, ids, points = [], [], [], []
+    for frame_number in store.frames(video_name):
+        rows = store.query_frame(video_name, frame_number)
+        if not rows:
+            continue
+        frame_ids = [object_ids.setdefault(row[2], len(object_ids)) for row in rows]
+        order = np.argsort(frame_ids, kind='stable')
+        frames.append(frame_number)
+        counts.append(len(rows))
+        ids.append(np.asarray(frame_ids, dtype=np.int32)[order])
+        points.append(np.asarray([(row[3], row[4]) for row in rows], dtype=np.float32)[order])
+
+    offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    arrays = {
+        'frames': np.asarray(frames, dtype=np.int64),
+        'offsets': offsets,
+        'object_ids': np.concatenate(ids) if ids else np.empty(0, dtype=np.int32),
+        'points': np.concatenate(points) if points else np.empty((0, 2), dtype=np.float32),
+    }
+    arrays['labels'] = np.full(len(arrays['object_ids']), POSITIVE_LABEL, dtype=np.int8)
+
+    os.makedirs(output_dir, exist_ok=True)
+    meta_path = os.path.join(output_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+    for name, array in arrays.items():
+        path = os.path.join(output_dir, f"{name}.npy")
+        with open(path + '.tmp', 'wb') as array_file:
+            np.save(array_file, array)
+        os.replace(path + '.tmp', path)
+    with open(meta_path + '.tmp', 'w') as meta_file:
+        json.dump({
+            'version': PROMPTS_VERSION,
+            'video_name': video_name,
+            'objects': sorted(object_ids, key=object_ids.get),
+            'frame_count': len(frames),
+            'point_count': int(offsets[-1])
+        }, meta_file)
+    os.replace(meta_path + '.tmp', meta_path)
+    return int(offsets[-1])
+
+class PromptReader:
+    """
+    Method: __init__
+    --------------------------
+    Opens a prompt export written by export_prompts. The arrays are memory-mapped, so opening is cheap and
+    only the frames that are read are loaded from disk. Raises ValueError if the directory holds no complete
+    export of a supported version.
+    """
+    def __init__(self, path):
+        try:
+            with open(os.path.join(path, 'meta.json'), 'r') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"No prompt export in {path}: {e}")
+        if meta.get('version') != PROMPTS_VERSION:
+            raise ValueError(f"Unsupported prompt export version {meta.get('version')} in {path}")
+        self.path = path
+        self.video_name = meta['video_name']
+        self.object_names = meta['objects']
+        for name in PROMPT_ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r'))
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __contains__(self, frame_number):
+        index = np.searchsorted(self.frames, frame_number)
+        return bool(index < len(self.frames) and self.frames[index] == frame_number)
+
+    """
+    Method: frame
+    --------------------------
+    Returns (object_ids, points, labels) for one frame, empty arrays if it has no points.
+    """
+    def frame(self, frame_number):
+        index = int(np.searchsorted(self.frames, frame_number))
+        if index == len(self.frames) or self.frames[index] != frame_number:
+            return (np.empty(0, dtype=np.int32), np.empty((0, 2), dtype=np.float32), np.empty(0, dtype=np.int8))
+        return self._batch(index)
+
+    def _batch(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return (np.asarray(self.object_ids[start:end]), np.asarray(self.points[start:end]),
+                np.asarray(self.labels[start:end]))
+
+    """
+    Method: batches
+    --------------------------
+    Yields (frame, object_ids, points, labels) for every annotated frame in [first, last], by default all of
+    them, in frame order. Each batch is read from the memory-mapped arrays when it is reached.
+    """
+    def batches(self, first=None, last=None):
+        start = 0 if first is None else int(np.searchsorted(self.frames, first, side='left'))
+        end = len(self.frames) if last is None else int(np.searchsorted(self.frames, last, side='right'))
+        for index in range(start, end):
+            yield (int(self.frames[index]), *self._batch(index))
+
+    def __iter__(self):
+        return self.batches()
+
+    """
+    Method: object_name
+    --------------------------
+    Returns the name of the object with the given id.
+    """
+    def object_name(self, object_id):
+        return self.object_names[object_id]
@@ -0,0 +1,150 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+
+class PromptSuggester:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a suggester of candidate point prompts inside a region of a frame. The region is shrunk to
+    at most analysis_size pixels on its longer side and every pixel gets a saliency score: its color
+    distance (in Lab) to the colors along the region's border, which are taken to be background, times its
+    distance to the edge of the salient area, so points land well inside the object rather than on its
+    outline. Candidates are Shi-Tomasi corners (at most max_keypoints) plus a regular grid of grid_size x
+    grid_size points. At most count candidates are returned, picked greedily by saliency with a penalty for
+    lying close to an already picked point so they spread over the object. Candidates scoring below
+    min_score times the best score are never suggested.
+    """
+    def __init__(self, count=8, analysis_size=256, grid_size=12, max_keypoints=100, min_score=0.2):
+        self.count = count
+        self.analysis_size = analysis_size
+        self.grid_size = grid_size
+        self.max_keypoints = max_keypoints
+        self.min_score = min_score
+
+    """
+    Method: suggest
+    --------------------------
+    Returns (points, scores) for the region spanned by two corners (x0, y0, x1, y1) of an RGB frame: points
+    is an (n, 2) array of suggested (x, y) prompts ranked best first and scores their saliency (0-1).
+    Coordinates are full-resolution frame pixels; scale is the size of the given image relative to the full
+    frame, so a screen-resolution proxy of the frame can be analyzed directly.
+    """
+    def suggest(self, image, rect, scale=1.0):
+        height, width = image.shape[:2]
+        x0, x1 = sorted((rect[0] * scale, rect[2] * scale))
+        y0, y1 = sorted((rect[1] * scale, rect[3] * scale))
+        left, top = max(int(np.floor(x0)), 0), max(int(np.floor(y0)), 0)
+        right, bottom = min(int(np.ceil(x1)), width), min(int(np.ceil(y1)), height)
+        if right - left < 4 or bottom - top < 4:
+            return np.empty((0, 2)), np.empty(0)
+
+        crop = image[top:bottom, left:right]
+        shrink = min(1.0, self.analysis_size / max(crop.shape[:2]))
+        if shrink < 1.0:
+            size = (max(4, round(crop.shape[1] * shrink)), max(4, round(crop.shape[0] * shrink)))
+            crop = cv2.resize(crop, size, interpolation=cv2.INTER_AREA)
+        saliency = self.saliency(crop)
+        candidates = self.candidates(crop, saliency)
+        scores = saliency[candidates[:, 1].astype(np.intp), candidates[:, 0].astype(np.intp)]
+        picked = self.spread(candidates, scores, np.sqrt((saliency > 0).sum() / max(self.count, 1)))
+
+        factor_x = (right - left) / crop.shape[1] / scale
+        factor_y = (bottom - top) / crop.shape[0] / scale
+        points = np.column_stack([left / scale + (candidates[picked, 0] + 0.5) * factor_x,
+                                  top / scale + (candidates[picked, 1] + 0.5) * factor_y])
+        return points, scores[picked]
+
+    """
+    Method: saliency
+    --------------------------
+    Returns the saliency map of a region as a float32 array in 0-1. Background colors are sampled along a
+    border ring a few pixels wide, and each pixel's color contrast is its Lab distance to the closest sample.
+    The contrast is thresholded with Otsu's method and the distance transform of the salient mask weights
+    pixels by how deep inside the salient area they lie.
+    """
+    def saliency(self, crop):
+        lab = cv2.cvtColor(crop, cv2.COLOR_RGB2LAB).astype(np.float32)
+        lab = cv2.GaussianBlur(lab, (5, 5), 0)
+        ring = max(2, min(crop.shape[:2]) // 20)
+        border = np.concatenate([lab[:ring].reshape(-1, 3), lab[-ring:].reshape(-1, 3),
+                                 lab[:, :ring].reshape(-1, 3), lab[:, -ring:].reshape(-1, 3)])
+        border = border[::max(1, len(border) // 48)]
+        pixels = lab.reshape(-1, 3)
+        contrast = np.full(len(pixels), np.inf, dtype=np.float32)
+        for sample in border:
+            np.minimum(contrast, np.square(pixels - sample).sum(axis=1), out=contrast)
+        contrast = np.sqrt(contrast).reshape(crop.shape[:2])
+        if contrast.max() <= 0:
+            return np.zeros(crop.shape[:2], dtype=np.float32)
+        contrast /= contrast.max()
+
+        _, mask = cv2.threshold((contrast * 255).astype(np.uint8), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        depth = cv2.distanceTransform(mask, cv2.DIST_L2, 3)
+        if depth.max() > 0:
+            depth /= depth.max()
+        return np.sqrt(contrast * depth)
+
+    """
+    Method: candidates
+    --------------------------
+    Returns the candidate points of a region as an (n, 2) array of pixel coordinates: corners found inside
+    the salient area followed by the grid points.
+    """
+    def candidates(self, crop, saliency):
+        height, width = saliency.shape
+        columns = (np.arange(self.grid_size) + 0.5) * width / self.grid_size
+        rows = (np.arange(self.grid_size) + 0.5) * height / self.grid_size
+        grid = np.stack(np.meshgrid(columns, rows), axis=-1).reshape(-1, 2)
+
+        gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+        mask = (saliency > 0).astype(np.uint8) * 255
+        corners = cv2.goodFeaturesToTrack(gray, self.max_keypoints, 0.01, max(3, min(width, height) // 20),
+                                          mask=mask)
+        corners = np.empty((0, 2)) if corners is None else corners.reshape(-1, 2)
+        candidates = np.floor(np.concatenate([corners, grid]))
+        candidates[:, 0] = np.clip(candidates[:, 0], 0, width - 1)
+        candidates[:, 1] = np.clip(candidates[:, 1], 0, height - 1)
+        return candidates
+
+    """
+    Method: spread
+    --------------------------
+    Picks up to count candidates greedily and returns their indices in the order picked. Each pick has the
+    highest saliency after scaling down candidates closer than spacing pixels to an already picked one.
+    """
+    def spread(self, candidates, scores, spacing):
+        if len(scores) == 0 or scores.max() <= 0:
+            return np.empty(0, dtype=np.intp)
+        floor = self.min_score * scores.max()
+        penalty = np.ones(len(scores))
+        picked = []
+        while len(picked) < self.count:
+            priority = np.where(scores >= floor, scores * penalty, -1.0)
+            best = int(np.argmax(priority))
+            if priority[best] <= 0:
+                break
+            picked.append(best)
+            distances = np.hypot(*(candidates - candidates[best]).T)
+            penalty = np.minimum(penalty, np.clip(distances / max(spacing, 1.0), 0.0, 1.0))
+        return np.asarray(picked, dtype=np.intp)
+
+    """
+    Method: suggest_many
+    --------------------------
+    Batch mode. Suggests prompts for the same region on a sequence of (frame_number, RGB frame) pairs and
+    yields (frame_number, points, scores) in input order. Frames are analyzed in a pool of worker threads
+    (OpenCV and NumPy release the GIL), while at most twice that many frames are held in memory.
+    """
+    def suggest_many(self, frames, rect, workers=4):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for frame_num, frame in frames:
+                pending.append((frame_num, executor.submit(self.suggest, frame, rect)))
+                if len(pending) >= 2 * workers:
+                    frame_num, future = pending.popleft()
+                    yield (frame_num, *future.result())
+            while pending:
+                frame_num, future = pending.popleft()
+                yield (frame_num, *future.result())
@@ -0,0 +1,201 @@
+import json
+import os
+import cv2
+import numpy as np
+
+INDEX_VERSION = 1
+INDEX_DTYPE = np.dtype([('timestamp_ms', '<f8'), ('keyframe', '?')])
+
+class SeekIndex:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a seek index from a record array holding the presentation timestamp of every frame and
+    whether that frame is a keyframe. The record array is usually memory-mapped from the sidecar file, so
+    opening the index of a long video does not read it all into memory.
+    """
+    def __init__(self, records):
+        self.records = records
+        self.frame_count = len(records)
+        self.timestamps_ms = records['timestamp_ms']
+        self.keyframes = np.flatnonzero(records['keyframe'])
+        if len(self.keyframes) == 0 or self.keyframes[0] != 0:
+            self.keyframes = np.concatenate(([0], self.keyframes))
+
+    """
+    Method: sidecar_paths
+    --------------------------
+    Returns the paths of the index array and its metadata file, which are stored next to the video as
+    <video>.seekindex.npy and <video>.seekindex.json.
+    """
+    @staticmethod
+    def sidecar_paths(video_path):
+        return f"{video_path}.seekindex.npy", f"{video_path}.seekindex.json"
+
+    """
+    Method: build
+    --------------------------
+    Runs the one-time indexing pass over a video. The video is read in raw packet mode so nothing is decoded;
+    every packet contributes its timestamp and keyframe flag. Timestamps are sorted into presentation order,
+    so the frame count and frame numbers do not depend on CAP_PROP_FRAME_COUNT or the nominal fps. Backends
+    that cannot report keyframes fall back to a decoding pass in which every frame is treated as a seek
+    target.
+    """
+    @classmethod
+    def build(cls, video_path):
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return None
+
+        timestamps = []
+        keyframe_timestamps = []
+        raw_mode = cap.set(cv2.CAP_PROP_FORMAT, -1)
+        try:
+            while cap.grab():
+                timestamp = cap.get(cv2.CAP_PROP_POS_MSEC)
+                timestamps.append(timestamp)
+                if raw_mode and cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                    keyframe_timestamps.append(timestamp)
+        finally:
+            cap.release()
+
+        if raw_mode and not keyframe_timestamps and timestamps:
+            print("[WARNING] Backend reported no keyframes, every frame will be used as a seek target.")
+            raw_mode = False
+
+        records = np.zeros(len(timestamps), dtype=INDEX_DTYPE)
+        records['timestamp_ms'] = np.sort(np.asarray(timestamps, dtype=np.float64))
+        if raw_mode:
+            positions = np.searchsorted(records['timestamp_ms'], keyframe_timestamps)
+            records['keyframe'][positions[positions < len(records)]] = True
+        else:
+            records['keyframe'] = True
+        return cls(records)
+
+    """
+    Method: load
+    --------------------------
+    Memory-maps the sidecar index of a video. Returns None if there is no sidecar, if it was written by a
+    different index version or if the video has changed since it was indexed.
+    """
+    @classmethod
+    def load(cls, video_path):
+        array_path, meta_path = cls.sidecar_paths(video_path)
+        if not (os.path.exists(array_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, 'r') as meta_file:
+                meta = json.load(meta_file)
+            stat = os.stat(video_path)
+            if (meta.get('version') != INDEX_VERSION or meta.get('video_size') != stat.st_size
+                    or meta.get('video_mtime') != stat.st_mtime):
+                return None
+            records = np.load(array_path, mmap_mode='r')
+            if records.dtype != INDEX_DTYPE or len(records) != meta.get('frame_count'):
+                return None
+            return cls(records)
+        except (OSError, ValueError):
+            return None
+
+    """
+    Method: save
+    --------------------------
+    Writes the index next to the video together with the size and modification time of the video it
+    describes. Failing to write the sidecar (for example on a read-only share) only costs a re-index on the
+    next load, so errors are reported and otherwise ignored.
+    """
+    def save(self, video_path):
+        array_path, meta_path = self.sidecar_paths(video_path)
+        try:
+            stat = os.stat(video_path)
+            np.save(array_path, np.asarray(self.records))
+            with open(meta_path, 'w') as meta_file:
+                json.dump({
+                    'version': INDEX_VERSION,
+                    'video_size': stat.st_size,
+                    'video_mtime': stat.st_mtime,
+                    'frame_count': self.frame_count
+                }, meta_file)
+        except OSError as e:
+            print(f"[WARNING] Could not write seek index for {video_path}: {e}")
+
+    """
+    Method: load_or_build
+    --------------------------
+    Returns the sidecar index of a video, running and saving the indexing pass first if there is no valid
+    sidecar yet.
+    """
+    @classmethod
+    def load_or_build(cls, video_path):
+        index = cls.load(video_path)
+        if index is not None:
+            return index
+        print(f"[INFO] Indexing {os.path.basename(video_path)}...")
+        index = cls.build(video_path)
+        if index is not None and index.frame_count > 0:
+            index.save(video_path)
+            index = cls.load(video_path) or index
+            print(f"[INFO] Indexed {index.frame_count} frames, {len(index.keyframes)} keyframes.")
+        return index
+
+    """
+    Method: keyframe_before
+    --------------------------
+    Returns the number of the last keyframe at or before the given frame.
+    """
+    def keyframe_before(self, frame_num):
+        position = np.searchsorted(self.keyframes, frame_num, side='right') - 1
+        return int(self.keyframes[max(position, 0)])
+
+    """
+    Method: frame_at_timestamp
+    --------------------------
+    Returns the number of the frame whose timestamp is closest to the given timestamp in milliseconds.
+    """
+    def frame_at_timestamp(self, timestamp_ms):
+        position = int(np.searchsorted(self.timestamps_ms, timestamp_ms))
+        if position >= self.frame_count:
+            return self.frame_count - 1
+        if position > 0 and (timestamp_ms - self.timestamps_ms[position - 1]
+                             < self.timestamps_ms[position] - timestamp_ms):
+            return position - 1
+        return position
+
+    """
+    Method: read_frame
+    --------------------------
+    Reads an exact frame from a capture. next_decode_frame is the frame the capture will return next, or None
+    if that is unknown. If the frame can be reached by decoding forward without passing a keyframe, no seek
+    is made. Otherwise the capture seeks to the nearest keyframe before the frame, the frame it actually
+    landed on is identified by its timestamp and the remaining frames are skipped with grab(). Returns the
+    BGR frame, or None, and the new next_decode_frame.
+    """
+    def read_frame(self, cap, frame_num, next_decode_frame):
+        if not 0 <= frame_num < self.frame_count:
+            return None, next_decode_frame
+
+        keyframe_position = np.searchsorted(self.keyframes, frame_num, side='right') - 1
+        keyframe = int(self.keyframes[keyframe_position])
+        if next_decode_frame is None or not keyframe <= next_decode_frame <= frame_num:
+            while True:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+                if not cap.grab():
+                    return None, None
+                position = self.frame_at_timestamp(cap.get(cv2.CAP_PROP_POS_MSEC))
+                if position <= frame_num or keyframe_position == 0:
+                    break
+                keyframe_position -= 1
+                keyframe = int(self.keyframes[keyframe_position])
+        else:
+            position = next_decode_frame
+            if not cap.grab():
+                return None, None
+
+        while position < frame_num:
+            if not cap.grab():
+                return None, None
+            position += 1
+        ret, frame = cap.retrieve()
+        if not ret:
+            return None, None
+        return frame, frame_num + 1
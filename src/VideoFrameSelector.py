@@ -1,26 +1,86 @@
-import cv2
-import numpy as np
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
-from matplotlib import pyplot as plt
-import os
-from matplotlib.widgets import TextBox, Button
-import csv
+import threading
+from FrameCache import DEFAULT_CACHE_BYTES
+from Instrumentation import timed
+
+PICK_RADIUS_PX = 8
+KEYFRAME_MARKER_HEIGHT = 10
+KEYFRAME_SNAP_PX = 5
+PLAYBACK_POLL_MS = 10
+PLAYBACK_MAX_SIZE = (480, 270)
+LOADER_DELAY_MS = 50
+
+# NumPy, OpenCV (imported by the session modules) and matplotlib take most of the startup time, so they are
+# bound here by load_modules once the window is up instead of at import time.
+np = plt = TextBox = Button = to_rgb = None
+Filmstrip = image_extent = KeyframeAnalysis = PromptSuggester = FramePlayer = SPEEDS = None
+MarkerRenderer = AnnotationSession = DEFAULT_MAX_OPEN = Workspace = None
+_modules_loaded = False
+_modules_lock = threading.Lock()
+
+"""
+Function: load_modules
+--------------------------
+Imports the heavy modules used by the front end and binds them as module globals. Returns at once once they
+are loaded; a call made while another thread is loading them waits for it to finish.
+"""
+def load_modules():
+    global np, plt, TextBox, Button, to_rgb, Filmstrip, image_extent, KeyframeAnalysis, PromptSuggester
+    global FramePlayer, SPEEDS, MarkerRenderer, AnnotationSession, DEFAULT_MAX_OPEN, Workspace, _modules_loaded
+    with _modules_lock:
+        if _modules_loaded:
+            return
+        with timed('startup_imports'):
+            import numpy
+            from matplotlib import pyplot
+            from matplotlib import widgets, colors
+            import Filmstrip as filmstrip_module
+            import KeyframeAnalyzer, PromptSuggester as suggester_module, FramePlayer as player_module
+            import MarkerRenderer as renderer_module, AnnotationSession as session_module
+            import CapturePool, Workspace as workspace_module
+        np, plt, TextBox, Button, to_rgb = numpy, pyplot, widgets.TextBox, widgets.Button, colors.to_rgb
+        Filmstrip, image_extent = filmstrip_module.Filmstrip, filmstrip_module.image_extent
+        KeyframeAnalysis = KeyframeAnalyzer.KeyframeAnalysis
+        PromptSuggester = suggester_module.PromptSuggester
+        FramePlayer, SPEEDS = player_module.FramePlayer, player_module.SPEEDS
+        MarkerRenderer = renderer_module.MarkerRenderer
+        AnnotationSession = session_module.AnnotationSession
+        DEFAULT_MAX_OPEN = CapturePool.DEFAULT_MAX_OPEN
+        Workspace = workspace_module.Workspace
+        _modules_loaded = True
 
 class VideoFrameSelector:
     """
     Method: __init__
     --------------------------
     Initializes the VideoFrameSelector application. Creates the main window and sets up the initial UI components
-    including the title, video selection button, and frame control elements. Initializes all necessary instance
-    variables for video handling and frame selection.
+    including the title, video selection button, and frame control elements. Video handling, frame access and
+    point storage are delegated to a GUI-free AnnotationSession. cache_bytes sets the memory budget of the decoded
+    frame cache, prefetch_ahead and prefetch_behind set the window of frames decoded in the background
+    around the slider position. store_backend selects how annotations are stored ('csv' or 'sqlite').
+    autosave_seconds, if set, saves the unsaved points of every frame in the background at that interval.
+    max_open_clips caps the number of video files kept open when a workspace of clips is loaded (by default
+    CapturePool's DEFAULT_MAX_OPEN).
+
+    Only Tk is needed to show the window. The heavy modules are imported on a background thread shortly
+    after the window appears, while the user picks a file, and the session is created once they are loaded.
     """
-    def __init__(self):
+    def __init__(self, cache_bytes=DEFAULT_CACHE_BYTES, prefetch_ahead=30, prefetch_behind=10,
+                 store_backend='csv', autosave_seconds=None, max_open_clips=None):
         self.root = tk.Tk()
         self.root.title("Video Frame Selector")
         self.root.geometry("800x400")
         
-        self.video_filename = None
+        self.session = None
+        self.session_options = {
+            'cache_bytes': cache_bytes, 'prefetch': True,
+            'prefetch_ahead': prefetch_ahead, 'prefetch_behind': prefetch_behind,
+            'store_backend': store_backend
+        }
+        self.module_loader = threading.Thread(target=load_modules, name="ModuleLoader", daemon=True)
+        self.root.after(LOADER_DELAY_MS, self.module_loader.start)
         
         self.main_frame = ttk.Frame(self.root, padding="20")
         self.main_frame.pack(expand=True, fill='both')
@@ -31,28 +91,80 @@ class VideoFrameSelector:
         self.select_video_btn = ttk.Button(self.main_frame, text="Select Video File", command=self.browse_video)
         self.select_video_btn.pack(pady=10)
         
+        self.open_workspace_btn = ttk.Button(self.main_frame, text="Open Workspace", command=self.browse_workspace)
+        self.open_workspace_btn.pack(pady=5)
+        
+        self.workspace = None
+        self.max_open_clips = max_open_clips
+        self.workspace_frame = ttk.Frame(self.main_frame)
+        self.clip_list = tk.Listbox(self.workspace_frame, height=6, exportselection=False)
+        self.clip_list.pack(fill='x')
+        self.clip_list.bind('<<ListboxSelect>>', self.on_clip_selected)
+        
         self.controls_frame = ttk.Frame(self.main_frame)
         
         self.slider_label = ttk.Label(self.controls_frame, text="Select Frame:")
         self.frame_slider = ttk.Scale(self.controls_frame, from_=0, to=100, orient=tk.HORIZONTAL)
+        self.preview_label = ttk.Label(self.controls_frame)
+        self.filmstrip_canvas = tk.Canvas(self.controls_frame, height=1, highlightthickness=0)
+        self.filmstrip_canvas.bind('<Configure>', self.draw_filmstrip)
+        self.filmstrip_canvas.bind('<Button-1>', self.on_filmstrip_click)
         
         self.view_button = ttk.Button(self.controls_frame, text="View Frame", command=self.select_frame)
+        self.keyframes_button = ttk.Button(self.controls_frame, text="Suggest Frames",
+                                           command=self.suggest_keyframes)
+        self.frame_entry_frame = None
+        self.status_label = ttk.Label(self.controls_frame, text="")
         
-        self.cap = None
-        self.frame_count = 0
-        self.current_frame = None
-        self.selected_points = []
+        self.filmstrip = None
+        self.filmstrip_cancel = None
+        self.preview_photo = None
+        self.filmstrip_photo = None
+        self.keyframes = None
+        self.keyframes_cancel = None
+        self.clip_scan_cancel = None
+        self.player = None
+        self.speed_var = tk.StringVar(master=self.root, value="1x")
+        self.overlay_var = tk.BooleanVar(master=self.root, value=True)
+        self.current_frame_num = None
+        self.frame_size = None
+        self.display_frame = None
+        self.selected_indices = []
+        self.drag = None
+        self.selection_start = None
+        self.selection_end = None
+        self.selection_action = None
+        self.suggester = None
+        self.suggestions = None
         self.current_fig = None
         self.current_ax = None
+        self.image_artist = None
+        self.control_buttons = []
+        self.marker_renderer = None
+        self.status_text = None
+        self.polling_saves = False
+        self.autosave_seconds = autosave_seconds
+        self.autosaved_edits = 0
+        if autosave_seconds:
+            self.root.after(int(autosave_seconds * 1000), self.autosave)
 
-        self.image_folder = None
-        self.image_files = []
+    """
+    Method: ensure_session
+    --------------------------
+    Makes sure the heavy modules are loaded, waiting for the background loader if it is still running, and
+    creates the session on first use. Returns the session.
+    """
+    def ensure_session(self):
+        if self.session is None:
+            load_modules()
+            self.session = AnnotationSession(**self.session_options)
+        return self.session
 
     """
     Method: browse_video
     --------------------------
     Opens a file dialog for the user to select a video file. Supports MP4 format and other video formats.
-    Once a video is selected, it stores the filename and calls load_video to process the selected file.
+    Once a video is selected, it calls load_video to process the selected file.
     """
     def browse_video(self):
         choice = messagebox.askquestion(
@@ -64,76 +176,613 @@ class VideoFrameSelector:
                 filetypes=(("MP4 files", "*.mp4"), ("All files", "*.*"))
             )
             if video_path:
-                self.video_filename = os.path.basename(video_path)
-                self.image_folder = None
-                self.image_files = []
                 self.load_video(video_path)
         else:
             folder_path = filedialog.askdirectory(
                 title="Select Folder of JPGs"
             )
             if folder_path:
-                self.image_folder = folder_path
-                self.video_filename = os.path.basename(folder_path)
-                self.cap = None
                 self.load_image_folder(folder_path)
 
-    def load_image_folder(self, folder_path):
-        # Only include supported image extensions
-        frame_names = [
-            p for p in os.listdir(folder_path)
-            if os.path.splitext(p)[-1].lower() in [".jpg", ".jpeg", ".png"]
-        ]
-        # Sort by integer frame number extracted from filename (before extension)
+    """
+    Method: browse_workspace
+    --------------------------
+    Opens a folder dialog for a workspace: a folder holding the videos and image folders of a recording
+    session. Lists the clips by name and loads the first one. Their frame count, size and number of
+    annotated frames are read on a background thread and filled in as they arrive. Clicking a clip in the
+    list switches to it.
+    """
+    def browse_workspace(self):
+        folder_path = filedialog.askdirectory(title="Select Workspace Folder")
+        if not folder_path:
+            return
+        self.ensure_session()
+        clips = Workspace.scan([folder_path])
+        if not clips:
+            messagebox.showerror("Error", "No videos or image folders found in folder.")
+            return
+        if self.clip_scan_cancel is not None:
+            self.clip_scan_cancel.set()
+        self.workspace = Workspace(self.session, clips, max_open=self.max_open_clips or DEFAULT_MAX_OPEN)
+        self.clip_list.delete(0, tk.END)
+        for clip in clips:
+            self.clip_list.insert(tk.END, os.path.basename(os.path.normpath(clip)))
+        # Placed right under the button rather than before the frame controls, which may not be packed yet.
+        self.workspace_frame.pack(fill='x', pady=5, after=self.open_workspace_btn)
+        self.switch_clip(0)
+        self.start_clip_scan()
+
+    """
+    Method: start_clip_scan
+    --------------------------
+    Reads the metadata of every clip of the workspace on a background thread, so opening a large workspace
+    does not block the window while every video is opened and every image folder is indexed.
+    """
+    def start_clip_scan(self):
+        workspace = self.workspace
+        cancel = threading.Event()
+        self.clip_scan_cancel = cancel
+        results = []
+
+        def scan():
+            for clip in workspace.clips:
+                if cancel.is_set():
+                    return
+                results.append(workspace.read_metadata(clip))
+
+        thread = threading.Thread(target=scan, name="ClipScanner", daemon=True)
+        thread.start()
+        self.root.after(250, self.poll_clip_scan, thread, cancel, workspace, results)
+
+    """
+    Method: poll_clip_scan
+    --------------------------
+    Fills in the clip list from the Tk main loop with the metadata read so far by the background scan. Clips
+    already described, such as the open one, keep their metadata.
+    """
+    def poll_clip_scan(self, thread, cancel, workspace, results):
+        if cancel.is_set():
+            return
+        alive = thread.is_alive()
+        while results:
+            info = results.pop(0)
+            info = workspace.metadata.setdefault(info['path'], info)
+            self.update_clip_label(info['path'], info)
+        if alive:
+            self.root.after(250, self.poll_clip_scan, thread, cancel, workspace, results)
+        else:
+            self.clip_scan_cancel = None
+
+    """
+    Method: clip_label
+    --------------------------
+    Returns the text shown for a clip in the workspace list.
+    """
+    def clip_label(self, info):
+        size = f"{info['width']}x{info['height']}" if info['width'] else "unknown size"
+        frames = info['frame_count'] if info['frame_count'] is not None else "?"
+        return f"{info['name']}  ({frames} frames, {size}, {info['annotated_frames']} annotated)"
+
+    """
+    Method: on_clip_selected
+    --------------------------
+    Switches to the clip selected in the workspace list.
+    """
+    def on_clip_selected(self, event=None):
+        selection = self.clip_list.curselection()
+        if selection and self.workspace is not None and self.workspace.clips[selection[0]] != self.workspace.current:
+            self.switch_clip(selection[0])
+
+    """
+    Method: switch_clip
+    --------------------------
+    Loads a clip of the workspace. The previous clip is parked by the session with its open capture, its
+    annotation store and its unsaved points, and its annotation progress in the list is updated. An open
+    annotation view moves to the first frame of the new clip.
+    """
+    def switch_clip(self, index):
+        previous = self.workspace.current
         try:
-            frame_names.sort(key=lambda p: int(os.path.splitext(p)[0]))
-        except ValueError:
-            messagebox.showerror("Error", "Image filenames must be integers (e.g., 0.jpg, 1.jpg, ...)")
+            info = self.workspace.open(index)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
+        if previous is not None:
+            self.update_clip_label(previous, self.workspace.refresh_progress(previous))
+        self.update_clip_label(info['path'], info)
+        self.clip_list.selection_clear(0, tk.END)
+        self.clip_list.selection_set(index)
+        self.start_filmstrip()
+        self.load_keyframes()
+        self.show_frame_controls()
+        if self.current_fig is not None:
+            self.show_annotation_frame(0)
+        pool = self.session.capture_pool.stats()
+        print(f"[INFO] Switched to {info['name']} ({pool['open']}/{pool['max_open']} videos open, "
+              f"{pool['opens']} opens, {pool['reuses']} reuses)")
+
+    """
+    Method: update_clip_label
+    --------------------------
+    Replaces the text of a clip in the workspace list with a label built from the given clip information.
+    """
+    def update_clip_label(self, path, info):
+        index = self.workspace.clips.index(path)
+        selected = index in self.clip_list.curselection()
+        self.clip_list.delete(index)
+        self.clip_list.insert(index, self.clip_label(info))
+        if selected:
+            self.clip_list.selection_set(index)
 
-        self.image_files = [os.path.join(folder_path, f) for f in frame_names]
-        self.frame_count = len(self.image_files)
-        if self.frame_count == 0:
-            messagebox.showerror("Error", "No JPG/PNG files found in folder.")
+    """
+    Method: load_image_folder
+    --------------------------
+    Loads a folder of images named by frame number into the session and shows the frame controls. Displays
+    an error message if the folder cannot be used.
+    """
+    def load_image_folder(self, folder_path):
+        self.ensure_session()
+        try:
+            self.session.load_image_folder(folder_path)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
+        self.start_filmstrip()
+        self.load_keyframes()
         self.show_frame_controls()
 
     """
     Method: load_video
     --------------------------
-    Takes a video path as input and loads the video using OpenCV. Releases any previously loaded video,
-    initializes the video capture object, and sets up the frame count. If the video fails to load,
-    displays an error message.
+    Takes a video path as input and loads the video into the session, then shows the frame controls. If the
+    video fails to load, displays an error message.
     """
     def load_video(self, video_path):
-        if self.cap is not None:
-            self.cap.release()
-            
-        self.cap = cv2.VideoCapture(video_path)
-        if not self.cap.isOpened():
-            messagebox.showerror("Error", "Failed to load video. Check the file path.")
+        self.ensure_session()
+        try:
+            self.session.load_video(video_path)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
             return
-            
-        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        
+        self.start_filmstrip()
+        self.load_keyframes()
         self.show_frame_controls()
 
+    """
+    Method: start_filmstrip
+    --------------------------
+    Loads the thumbnail filmstrip of the current video or image folder from its sidecar file. If there is no
+    up-to-date filmstrip yet, it is generated on a background thread and shown once it is ready. Generation
+    for a previously loaded input is cancelled.
+    """
+    def start_filmstrip(self):
+        if self.filmstrip_cancel is not None:
+            self.filmstrip_cancel.set()
+        self.filmstrip = None
+        self.filmstrip_canvas.delete('all')
+        self.preview_label.configure(image='')
+
+        session = self.session
+        source_path = session.source_path
+        if source_path is None:
+            return
+        filmstrip = Filmstrip.load(source_path, session.frame_count)
+        if filmstrip is not None:
+            self.filmstrip = filmstrip
+            self.draw_filmstrip()
+            return
+
+        cancel = threading.Event()
+        self.filmstrip_cancel = cancel
+        result = {}
+
+        def build():
+            result['filmstrip'] = Filmstrip.build(
+                source_path, session.frame_count,
+                video_path=session.video_path if session.cap is not None else None,
+                image_files=list(session.image_files), seek_index=session.seek_index,
+                cancelled=cancel.is_set
+            )
+
+        thread = threading.Thread(target=build, name="FilmstripBuilder", daemon=True)
+        thread.start()
+        self.root.after(250, self.poll_filmstrip, thread, cancel, result)
+
+    """
+    Method: poll_filmstrip
+    --------------------------
+    Checks from the Tk main loop whether the background filmstrip generation has finished and, if it has and
+    was not cancelled, shows the new filmstrip.
+    """
+    def poll_filmstrip(self, thread, cancel, result):
+        if cancel.is_set():
+            return
+        if thread.is_alive():
+            self.root.after(250, self.poll_filmstrip, thread, cancel, result)
+            return
+        self.filmstrip = result.get('filmstrip')
+        self.draw_filmstrip()
+
+    """
+    Method: draw_filmstrip
+    --------------------------
+    Draws the filmstrip across the full width of the slider and marks the current slider position on it.
+    Called again whenever the window is resized.
+    """
+    def draw_filmstrip(self, event=None):
+        width = self.filmstrip_canvas.winfo_width()
+        if self.filmstrip is None or width <= 1:
+            return
+        self.filmstrip_photo = self.photo_image(self.filmstrip.strip(width))
+        self.filmstrip_canvas.configure(height=self.filmstrip.thumb_height)
+        self.filmstrip_canvas.delete('all')
+        self.filmstrip_canvas.create_image(0, 0, anchor='nw', image=self.filmstrip_photo)
+        self.filmstrip_canvas.create_line(0, 0, 0, self.filmstrip.thumb_height,
+                                          fill='red', width=2, tags='position')
+        self.draw_keyframes()
+        self.show_preview(int(self.frame_slider.get()))
+
+    """
+    Method: show_preview
+    --------------------------
+    Shows the filmstrip thumbnail of the given frame next to the slider and moves the position marker on the
+    filmstrip. Does nothing until the filmstrip is available, and never decodes the video.
+    """
+    def show_preview(self, frame_num):
+        if self.filmstrip is None:
+            return
+        self.preview_photo = self.photo_image(self.filmstrip.thumbnail(frame_num))
+        self.preview_label.configure(image=self.preview_photo)
+        self.show_position(frame_num)
+
+    """
+    Method: show_position
+    --------------------------
+    Moves the position marker on the filmstrip to the given frame.
+    """
+    def show_position(self, frame_num):
+        if self.filmstrip is None:
+            return
+        width = self.filmstrip_canvas.winfo_width()
+        x = frame_num / max(self.session.frame_count - 1, 1) * (width - 1)
+        self.filmstrip_canvas.coords('position', x, 0, x, self.filmstrip.thumb_height)
+
+    """
+    Method: on_filmstrip_click
+    --------------------------
+    Moves the slider to the frame under the mouse when the filmstrip is clicked. A click close to a keyframe
+    marker moves to the keyframe.
+    """
+    def on_filmstrip_click(self, event):
+        width = self.filmstrip_canvas.winfo_width()
+        if self.session.frame_count == 0 or width <= 1:
+            return
+        scale = (width - 1) / max(self.session.frame_count - 1, 1)
+        frame_num = round(min(max(event.x / scale, 0), self.session.frame_count - 1))
+        if self.keyframes is not None and len(self.keyframes):
+            nearest = min(self.keyframes.frames(), key=lambda keyframe: abs(keyframe - frame_num))
+            if abs(nearest - frame_num) * scale <= KEYFRAME_SNAP_PX:
+                frame_num = nearest
+        self.frame_slider.set(frame_num)
+        self.update_frame_number(frame_num)
+
+    """
+    Method: load_keyframes
+    --------------------------
+    Loads the saved keyframe recommendation of the current video or image folder, if it is up to date, and
+    marks the keyframes under the slider. A running analysis of a previously loaded input is cancelled.
+    """
+    def load_keyframes(self):
+        if self.keyframes_cancel is not None:
+            self.keyframes_cancel.set()
+            self.keyframes_cancel = None
+        self.keyframes = None
+        if self.session.source_path is not None:
+            self.keyframes = KeyframeAnalysis.load(self.session.source_path, self.session.frame_count)
+        self.keyframes_button.configure(state='normal')
+        self.draw_keyframes()
+
+    """
+    Method: suggest_keyframes
+    --------------------------
+    Analyzes the current video or image folder for scene changes in background worker processes and marks
+    the recommended frames to annotate under the slider once the analysis is done. Progress is shown in the
+    status line. The result is saved next to the input, so the analysis runs once per input.
+    """
+    def suggest_keyframes(self):
+        session = self.session
+        if session.source_path is None:
+            return
+        if self.keyframes is not None:
+            self.show_keyframe_summary()
+            return
+
+        cancel = threading.Event()
+        self.keyframes_cancel = cancel
+        result = {'done': 0, 'total': 0}
+
+        def progress(done, total):
+            result['done'], result['total'] = done, total
+
+        def analyze():
+            try:
+                result['analysis'] = KeyframeAnalysis.analyze(
+                    session.source_path, session.frame_count,
+                    video_path=session.video_path if session.cap is not None else None,
+                    image_files=list(session.image_files), progress=progress, cancelled=cancel.is_set
+                )
+            except Exception as e:
+                result['error'] = e
+
+        self.keyframes_button.configure(state='disabled')
+        self.set_status("Analyzing scene changes...")
+        thread = threading.Thread(target=analyze, name="KeyframeAnalyzer", daemon=True)
+        thread.start()
+        self.root.after(250, self.poll_keyframes, thread, cancel, result)
+
+    """
+    Method: poll_keyframes
+    --------------------------
+    Checks from the Tk main loop whether the background keyframe analysis has finished, showing its progress
+    until it has, and marks the keyframes unless the analysis was cancelled.
+    """
+    def poll_keyframes(self, thread, cancel, result):
+        if cancel.is_set():
+            return
+        if thread.is_alive():
+            if result['total']:
+                self.status_label.configure(
+                    text=f"Analyzing scene changes... {100 * result['done'] // result['total']}%")
+            self.root.after(250, self.poll_keyframes, thread, cancel, result)
+            return
+        self.keyframes_cancel = None
+        self.keyframes_button.configure(state='normal')
+        if 'error' in result:
+            self.set_status(f"Scene analysis failed: {str(result['error'])}")
+            return
+        self.keyframes = result.get('analysis')
+        self.draw_keyframes()
+        self.show_keyframe_summary()
+
+    """
+    Method: show_keyframe_summary
+    --------------------------
+    Shows the number of segments and the highest ranked keyframes in the status line.
+    """
+    def show_keyframe_summary(self):
+        frames = self.keyframes.frames()
+        listed = ", ".join(str(frame_num) for frame_num in frames[:10])
+        more = ", ..." if len(frames) > 10 else ""
+        self.set_status(f"{len(self.keyframes.segments)} segments, suggested frames: {listed}{more} "
+                        f"([ and ] jump between them)")
+
+    """
+    Method: draw_keyframes
+    --------------------------
+    Marks the recommended keyframes on the filmstrip under the slider with ticks that are taller for higher
+    ranked frames. Without a filmstrip the canvas is shown as a thin strip holding only the ticks.
+    """
+    def draw_keyframes(self):
+        canvas = self.filmstrip_canvas
+        canvas.delete('keyframes')
+        width = canvas.winfo_width()
+        if self.keyframes is None or width <= 1:
+            return
+        height = self.filmstrip.thumb_height if self.filmstrip is not None else KEYFRAME_MARKER_HEIGHT
+        if self.filmstrip is None:
+            canvas.configure(height=height)
+        scale = (width - 1) / max(self.session.frame_count - 1, 1)
+        for rank, frame_num in reversed(list(enumerate(self.keyframes.frames()))):
+            x = frame_num * scale
+            tick = height if rank < 10 else height / 2
+            canvas.create_line(x, height - tick, x, height, fill='yellow' if rank < 10 else 'orange',
+                               width=2, tags='keyframes')
+        canvas.tag_raise('position')
+
+    """
+    Method: previous_keyframe
+    --------------------------
+    Moves the slider to the closest recommended keyframe before the current frame, if there is one.
+    """
+    def previous_keyframe(self):
+        current_frame = int(self.frame_slider.get())
+        earlier = [frame_num for frame_num in self.keyframes.frames() if frame_num < current_frame] \
+            if self.keyframes is not None else []
+        if earlier:
+            self.frame_slider.set(max(earlier))
+            self.update_frame_number(max(earlier))
+
+    """
+    Method: next_keyframe
+    --------------------------
+    Moves the slider to the closest recommended keyframe after the current frame, if there is one.
+    """
+    def next_keyframe(self):
+        current_frame = int(self.frame_slider.get())
+        later = [frame_num for frame_num in self.keyframes.frames() if frame_num > current_frame] \
+            if self.keyframes is not None else []
+        if later:
+            self.frame_slider.set(min(later))
+            self.update_frame_number(min(later))
+
+    """
+    Method: toggle_playback
+    --------------------------
+    Starts playback from the slider position, or pauses it if it is running.
+    """
+    def toggle_playback(self):
+        if self.player is not None:
+            self.pause_playback()
+        else:
+            self.start_playback()
+
+    """
+    Method: start_playback
+    --------------------------
+    Plays the input from the slider position (from the start if the slider is at the end) in the preview
+    next to the slider. Frames are decoded sequentially on a background thread at the native frame rate
+    times the selected speed, dropping frames when decoding or drawing falls behind. With "Show points"
+    checked, saved points are drawn on the frames they belong to.
+    """
+    def start_playback(self):
+        session = self.session
+        if session.source_path is None or session.frame_count == 0:
+            return
+        start_frame = int(self.frame_slider.get())
+        if start_frame >= session.frame_count - 1:
+            start_frame = 0
+        self.player = FramePlayer(
+            session.frame_count, start_frame,
+            video_path=session.video_path if session.cap is not None else None,
+            image_manifest=session.image_manifest, seek_index=session.seek_index, speed=self.playback_speed(),
+            max_width=PLAYBACK_MAX_SIZE[0], max_height=PLAYBACK_MAX_SIZE[1],
+            overlay=self.saved_point_overlay() if self.overlay_var.get() else None
+        )
+        self.play_button.configure(text="⏸")
+        self.root.after(PLAYBACK_POLL_MS, self.poll_playback, self.player)
+
+    """
+    Method: poll_playback
+    --------------------------
+    Shows the newest frame decoded by the player and moves the slider along with it. Pauses at the end of
+    the input.
+    """
+    def poll_playback(self, player):
+        if player is not self.player:
+            return
+        latest = player.latest()
+        if latest is not None:
+            frame_num, image = latest
+            self.playback_photo = self.photo_image(image)
+            self.preview_label.configure(image=self.playback_photo)
+            self.frame_slider.set(frame_num)
+            self.update_frame_number(frame_num)
+            self.show_position(frame_num)
+        elif not player.playing():
+            self.pause_playback()
+            return
+        self.root.after(PLAYBACK_POLL_MS, self.poll_playback, player)
+
+    """
+    Method: pause_playback
+    --------------------------
+    Pauses playback on the frame on screen: the slider stays there and an open annotation view moves to it,
+    so annotation starts from the frame that was being watched.
+    """
+    def pause_playback(self):
+        player = self.player
+        frame_num = self.stop_playback()
+        if frame_num is None:
+            return
+        self.frame_slider.set(frame_num)
+        self.update_frame_number(frame_num)
+        if self.filmstrip is None:
+            self.preview_label.configure(image='')
+        if self.current_fig is not None:
+            self.show_annotation_frame(frame_num)
+        self.set_status(f"Paused at frame {frame_num} ({player.shown} frames shown, {player.dropped} dropped)")
+
+    """
+    Method: stop_playback
+    --------------------------
+    Stops playback, if it is running, and returns the frame on screen.
+    """
+    def stop_playback(self):
+        if self.player is None:
+            return None
+        player, self.player = self.player, None
+        self.play_button.configure(text="▶")
+        return player.stop()
+
+    """
+    Method: playback_speed
+    --------------------------
+    Returns the speed selected in the speed box as a factor of the native frame rate.
+    """
+    def playback_speed(self):
+        return float(self.speed_var.get().rstrip('x'))
+
+    """
+    Method: on_space
+    --------------------------
+    Toggles playback with the space bar, unless a button, check box or entry has the focus and uses the key
+    itself.
+    """
+    def on_space(self, event):
+        if event.widget.winfo_class() in ('TButton', 'TCheckbutton', 'TEntry', 'TCombobox'):
+            return
+        self.toggle_playback()
+
+    """
+    Method: on_speed_changed
+    --------------------------
+    Applies the speed selected in the speed box to the running playback, if any.
+    """
+    def on_speed_changed(self, event=None):
+        if self.player is not None:
+            self.player.set_speed(self.playback_speed())
+
+    """
+    Method: saved_point_overlay
+    --------------------------
+    Returns the saved points of the loaded input as a dictionary mapping frame numbers to lists of
+    (x, y, rgb_color) for the playback overlay. Objects are drawn in the color they were given in this
+    session, or in one of the default colors otherwise.
+    """
+    def saved_point_overlay(self):
+        session = self.session
+        store = session.get_annotation_store()
+        session.flush_saves()
+        colors = {}
+        for point_set in session.points.values():
+            for object_name, color in point_set.colors.items():
+                if color is not None:
+                    colors.setdefault(object_name, color)
+        palette = ['red', 'blue', 'green', 'purple', 'orange', 'cyan', 'magenta', 'yellow']
+        overlay = {}
+        for frame_num in store.frames(session.video_filename):
+            points = overlay[frame_num] = []
+            for _, _, object_name, x, y in store.query_frame(session.video_filename, frame_num):
+                if object_name not in colors:
+                    colors[object_name] = palette[len(colors) % len(palette)]
+                points.append((x, y, tuple(int(255 * channel) for channel in to_rgb(colors[object_name]))))
+        return overlay
+
+    """
+    Method: photo_image
+    --------------------------
+    Converts an RGB array into a Tk PhotoImage by way of an in-memory PPM image.
+    """
+    def photo_image(self, image):
+        height, width = image.shape[:2]
+        header = f"P6 {width} {height} 255 ".encode()
+        return tk.PhotoImage(master=self.root, data=header + np.ascontiguousarray(image).tobytes(),
+                             format='PPM')
+
     """
     Method: show_frame_controls
     --------------------------
     Sets up and displays the frame control interface including the slider, frame entry box, and navigation
     buttons. Configures the slider range based on video frame count and sets up keyboard shortcuts for
-    frame navigation.
+    frame navigation. Playback of a previously loaded input is stopped. The widgets are created on the first
+    call; later calls only reset them for the newly loaded input.
     """
     def show_frame_controls(self):
-        self.frame_slider.configure(to=self.frame_count - 1)
+        self.stop_playback()
+        self.frame_slider.configure(to=self.session.frame_count - 1)
         self.frame_slider.set(0)
+        if self.frame_entry_frame is not None:
+            self.frame_entry.delete(0, tk.END)
+            self.frame_entry.insert(0, "0")
+            return
         
         self.controls_frame.pack(fill='x', pady=20)
         self.slider_label.pack(pady=5)
+        self.preview_label.pack(pady=5)
         self.frame_slider.pack(fill='x', pady=5)
+        self.filmstrip_canvas.pack(fill='x')
         
-        frame_entry_frame = ttk.Frame(self.controls_frame)
+        frame_entry_frame = self.frame_entry_frame = ttk.Frame(self.controls_frame)
         frame_entry_frame.pack(pady=5)
         
         prev_button = ttk.Button(frame_entry_frame, text="←", width=3, 
@@ -149,26 +798,44 @@ class VideoFrameSelector:
                                command=self.next_frame)
         next_button.pack(side=tk.LEFT, padx=5)
         
+        self.play_button = ttk.Button(frame_entry_frame, text="▶", width=3, command=self.toggle_playback)
+        self.play_button.pack(side=tk.LEFT, padx=5)
+        speed_box = ttk.Combobox(frame_entry_frame, textvariable=self.speed_var, width=5, state='readonly',
+                                 values=[f"{speed:g}x" for speed in SPEEDS])
+        speed_box.pack(side=tk.LEFT, padx=5)
+        speed_box.bind('<<ComboboxSelected>>', self.on_speed_changed)
+        ttk.Checkbutton(frame_entry_frame, text="Show points", variable=self.overlay_var).pack(side=tk.LEFT, padx=5)
+        
         self.frame_entry.bind('<Return>', self.update_from_entry)
         self.frame_entry.bind('<FocusOut>', self.update_from_entry)
         
         self.view_button.pack(pady=10)
+        self.keyframes_button.pack(pady=5)
+        self.status_label.pack(pady=5)
         
         self.frame_slider.configure(command=self.update_frame_number)
         
         self.root.bind('<Left>', lambda e: self.previous_frame())
         self.root.bind('<Right>', lambda e: self.next_frame())
+        self.root.bind('<bracketleft>', lambda e: self.previous_keyframe())
+        self.root.bind('<bracketright>', lambda e: self.next_keyframe())
+        self.root.bind('<space>', self.on_space)
 
     """
     Method: update_frame_number
     --------------------------
     Updates the frame entry box when the slider value changes. Converts the slider value to an integer
-    and updates the display accordingly.
+    and updates the display accordingly. Moves the prefetch window to the new frame, except during playback,
+    which decodes on its own.
     """
     def update_frame_number(self, value):
         frame_num = int(float(value))
         self.frame_entry.delete(0, tk.END)
         self.frame_entry.insert(0, str(frame_num))
+        if self.player is not None:
+            return
+        self.session.request_prefetch(frame_num)
+        self.show_preview(frame_num)
 
     """
     Method: update_from_entry
@@ -179,11 +846,13 @@ class VideoFrameSelector:
     def update_from_entry(self, event=None):
         try:
             frame_num = int(self.frame_entry.get())
-            if 0 <= frame_num < self.frame_count:
+            if 0 <= frame_num < self.session.frame_count:
                 self.frame_slider.set(frame_num)
+                self.session.request_prefetch(frame_num)
+                self.show_preview(frame_num)
             else:
                 messagebox.showwarning("Invalid Frame", 
-                    f"Please enter a frame number between 0 and {self.frame_count-1}")
+                    f"Please enter a frame number between 0 and {self.session.frame_count-1}")
                 self.frame_entry.delete(0, tk.END)
                 self.frame_entry.insert(0, str(int(self.frame_slider.get())))
         except ValueError:
@@ -195,59 +864,169 @@ class VideoFrameSelector:
     """
     Method: select_frame
     --------------------------
-    Displays the selected video frame in a matplotlib figure. Sets up the interactive plotting environment
-    with object selection tools, color options, and control buttons. Initializes the point selection system
-    for marking objects in the frame.
+    Displays the selected video frame in the annotation view. The view is created on first use and then kept
+    open: later frames are swapped into the existing figure, so the object list and its widgets persist
+    across frames.
     """
     def select_frame(self):
-        if self.cap is None and not self.image_files:
+        if self.session.source_path is None:
             messagebox.showerror("Error", "No video or image folder loaded")
             return
             
         try:
             frame_num = int(self.frame_slider.get())
             print(f"[INFO] Selected frame: {frame_num}")
-
-            img = self.get_frame(frame_num)
-            if img is not None:
-                plt.close('all')
-                self.current_frame = img
-                self.current_fig, self.current_ax = plt.subplots(figsize=(10, 6))
-                self.current_ax.imshow(img)
-                self.current_ax.set_title(f"Selected Frame: {frame_num}")
-                self.current_ax.axis("off")
-                
-                self.object_points = {}
-                self.default_colors = ['red', 'blue', 'green', 'purple', 'orange', 'cyan', 'magenta', 'yellow']
-                self.current_color = self.default_colors[0]
-                self.object_entries = []
-                self.object_count = 0
-                
-                self.toolbar_frame = plt.axes([0.1, 0.01, 0.8, 0.08])
-                self.toolbar_frame.axis('off')
-                
-                self.add_object_entry()
-                
-                plus_button_ax = plt.axes([0.91, 0.05, 0.03, 0.03])
-                plus_button = Button(plus_button_ax, '+')
-                plus_button.on_clicked(self.add_object_entry)
-                
-                save_button_ax = plt.axes([0.825, 0.01, 0.06, 0.03])
-                save_button = Button(save_button_ax, 'Save')
-                save_button.on_clicked(self.save_points)
-                
-                clear_button_ax = plt.axes([0.895, 0.01, 0.06, 0.03])
-                clear_button = Button(clear_button_ax, 'Clear')
-                clear_button.on_clicked(self.clear_points)
-                
-                self.current_fig.canvas.mpl_connect('button_press_event', self.on_click)
-                
-                plt.show()
-            else:
+            if self.current_fig is None:
+                self.create_annotation_view()
+            if not self.show_annotation_frame(frame_num):
                 messagebox.showerror("Error", "Failed to load selected frame.")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
+    """
+    Method: create_annotation_view
+    --------------------------
+    Creates the long-lived annotation figure with an empty image, the object selection tools, color options
+    and control buttons, and shows it without blocking the tkinter main loop. References to the widgets are
+    kept so their callbacks stay alive. The left and right arrow keys are taken out of matplotlib's default
+    key bindings and step through frames instead.
+    """
+    def create_annotation_view(self):
+        for keymap in ('keymap.back', 'keymap.forward'):
+            plt.rcParams[keymap] = [key for key in plt.rcParams[keymap] if key not in ('left', 'right')]
+
+        self.current_fig, self.current_ax = plt.subplots(figsize=(10, 6))
+        self.image_artist = self.current_ax.imshow(np.zeros((1, 1, 3), dtype=np.uint8))
+        self.current_ax.axis("off")
+        self.status_text = self.current_fig.text(0.01, 0.97, self.status_label.cget('text'), fontsize=8)
+        self.marker_renderer = MarkerRenderer(self.current_fig, self.current_ax)
+
+        self.default_colors = ['red', 'blue', 'green', 'purple', 'orange', 'cyan', 'magenta', 'yellow']
+        self.current_color = self.default_colors[0]
+        self.object_entries = []
+        self.object_count = 0
+
+        self.toolbar_frame = self.current_fig.add_axes([0.1, 0.01, 0.8, 0.08])
+        self.toolbar_frame.axis('off')
+
+        self.add_object_entry()
+
+        plus_button = Button(self.current_fig.add_axes([0.91, 0.05, 0.03, 0.03]), '+')
+        plus_button.on_clicked(self.add_object_entry)
+
+        save_button = Button(self.current_fig.add_axes([0.825, 0.01, 0.06, 0.03]), 'Save')
+        save_button.on_clicked(self.save_points)
+
+        clear_button = Button(self.current_fig.add_axes([0.895, 0.01, 0.06, 0.03]), 'Clear')
+        clear_button.on_clicked(self.clear_points)
+
+        propagate_button = Button(self.current_fig.add_axes([0.73, 0.01, 0.085, 0.03]), 'Propagate')
+        propagate_button.on_clicked(self.propagate_points)
+
+        accept_button = Button(self.current_fig.add_axes([0.73, 0.05, 0.085, 0.03]), 'Accept')
+        accept_button.on_clicked(self.accept_suggestions)
+
+        self.control_buttons = [plus_button, save_button, clear_button, propagate_button, accept_button]
+
+        self.current_fig.canvas.mpl_connect('button_press_event', self.on_click)
+        self.current_fig.canvas.mpl_connect('motion_notify_event', self.on_motion)
+        self.current_fig.canvas.mpl_connect('button_release_event', self.on_release)
+        self.current_fig.canvas.mpl_connect('key_press_event', self.on_key_press)
+        self.current_fig.canvas.mpl_connect('close_event', self.on_view_closed)
+
+        plt.show(block=False)
+
+    """
+    Method: show_annotation_frame
+    --------------------------
+    Swaps a frame into the annotation view by replacing the image data in place. A screen-resolution proxy
+    of the frame is drawn over the full-resolution pixel grid so clicked coordinates stay in full-resolution
+    pixels. The unsaved points kept for the frame are drawn again, so points survive moving between frames.
+    Returns False if the frame cannot be read.
+    """
+    def show_annotation_frame(self, frame_num):
+        img, frame_size = self.session.get_preview(frame_num, self.root.winfo_screenwidth(),
+                                                   self.root.winfo_screenheight())
+        if img is None:
+            return False
+
+        self.current_frame_num = frame_num
+        self.frame_size = frame_size
+        self.display_frame = img
+        with timed('display'):
+            self._swap_frame(frame_num, img, frame_size)
+        return True
+
+    """
+    Method: _swap_frame
+    --------------------------
+    Replaces the image, title and markers of the annotation view and renders the figure.
+    """
+    def _swap_frame(self, frame_num, img, frame_size):
+        self.image_artist.set_data(img)
+        self.image_artist.set_extent(image_extent(*frame_size))
+        self.current_ax.set_title(f"Selected Frame: {frame_num}")
+
+        self.object_points = self.session.frame_points(frame_num)
+        self.selected_indices = []
+        self.drag = None
+        self.selection_start = None
+        self.suggestions = None
+        self.marker_renderer.selection.set_data([], [])
+        self.marker_renderer.suggestions.set_data([], [])
+        for object_name in list(self.marker_renderer.artists):
+            if object_name not in self.object_points:
+                self.marker_renderer.artists[object_name].set_data([], [])
+        for object_name in self.object_points.object_names:
+            self.marker_renderer.set_points(object_name, self.object_points.points(object_name),
+                                            self.object_points.colors[object_name], blit=False)
+
+        self.current_fig.canvas.draw()
+
+    """
+    Method: on_key_press
+    --------------------------
+    Steps to the previous or next frame with the left and right arrow keys while the annotation view has
+    focus. Delete or Backspace removes the selected points, Enter accepts the suggested points and Escape
+    clears the selection and discards the suggestions. Keys typed into an object name box are left to the
+    box.
+    """
+    def on_key_press(self, event):
+        if event.key not in ('left', 'right', 'delete', 'backspace', 'escape', 'enter'):
+            return
+        if any(obj['entry'].capturekeystrokes for obj in self.object_entries):
+            return
+        if event.key in ('delete', 'backspace'):
+            self.delete_selected_points()
+            return
+        if event.key == 'enter':
+            self.accept_suggestions()
+            return
+        if event.key == 'escape':
+            self.set_selection([])
+            if self.suggestions is not None:
+                self.suggestions = None
+                self.marker_renderer.set_suggestions([])
+            return
+        frame_num = self.current_frame_num + (1 if event.key == 'right' else -1)
+        if 0 <= frame_num < self.session.frame_count:
+            self.frame_slider.set(frame_num)
+            self.update_frame_number(frame_num)
+            self.show_annotation_frame(frame_num)
+
+    """
+    Method: on_view_closed
+    --------------------------
+    Forgets the annotation view when its window is closed, so the next View Frame creates a new one. Unsaved
+    points stay in the session.
+    """
+    def on_view_closed(self, event):
+        self.marker_renderer.disconnect()
+        self.current_fig = None
+        self.current_ax = None
+        self.marker_renderer = None
+        self.status_text = None
+
     """
     Method: add_object_entry
     --------------------------
@@ -261,12 +1040,12 @@ class VideoFrameSelector:
         color_index = (self.object_count - 1) % len(self.default_colors)
         self.current_color = self.default_colors[color_index]
         
-        entry_ax = plt.axes([0.1, y_pos, 0.4, 0.02])
+        entry_ax = self.current_fig.add_axes([0.1, y_pos, 0.4, 0.02])
         entry = TextBox(entry_ax, f'Obj {self.object_count}: ', initial=f'object{self.object_count}')
         entry.label.set_fontsize(8)
         entry.text_disp.set_fontsize(8)
         
-        color_ax = plt.axes([0.55, y_pos, 0.1, 0.02])
+        color_ax = self.current_fig.add_axes([0.55, y_pos, 0.1, 0.02])
         color_button = Button(color_ax, 'Color', color=self.current_color)
         
         object_data = {
@@ -324,49 +1103,239 @@ class VideoFrameSelector:
     """
     Method: on_click
     --------------------------
-    Handles mouse click events on the frame. Records clicked coordinates for the active object and
-    draws a marker at the selected point. Updates the object_points dictionary with the new coordinates.
+    Handles mouse presses on the frame. A left click records the clicked coordinates for the active object
+    and draws a marker at the selected point; pressing on an existing point instead starts dragging it, and
+    it only gets a new point next to it if the mouse is released without moving. A right click deletes the
+    nearest point, a left drag with Shift held selects the points inside a rectangle and a left drag with
+    Ctrl held suggests points for the active object inside a rectangle. Only the markers
+    are redrawn, by blitting over the cached frame. Points are looked up in the frame's grid-indexed
+    PointSet, which stays fast with tens of thousands of points.
     """
     def on_click(self, event):
-        if event.inaxes != self.current_ax:
+        if event.inaxes != self.current_ax or event.xdata is None:
+            return
+        toolbar = self.current_fig.canvas.toolbar
+        if toolbar is not None and toolbar.mode:
             return
 
         x, y = event.xdata, event.ydata
-        
-        active_object = None
-        for obj in self.object_entries:
-            if obj['active']:
-                active_object = obj
-                break
-                
+        if event.button == 3:
+            self.delete_nearest_point(x, y)
+            return
+        if event.button != 1:
+            return
+        if event.key in ('shift', 'control'):
+            self.selection_start = self.selection_end = (x, y)
+            self.selection_action = 'suggest' if event.key == 'control' else 'select'
+            return
+
+        index = self.object_points.nearest(x, y, self.pick_radius())
+        if index is not None:
+            self.drag = {'index': index, 'origin': (x, y), 'moved': False}
+            return
+        self.add_point(x, y)
+
+    """
+    Method: on_motion
+    --------------------------
+    Moves the dragged point, or stretches the selection rectangle, while the mouse moves over the frame.
+    """
+    def on_motion(self, event):
+        if event.inaxes != self.current_ax or event.xdata is None:
+            return
+        if self.drag is not None:
+            self.drag['moved'] = True
+            self.session.move_point(self.current_frame_num, self.drag['index'], event.xdata, event.ydata)
+            self.redraw_object(self.object_points.object_of(self.drag['index']))
+            if self.selected_indices:
+                self.set_selection(self.selected_indices)
+        elif self.selection_start is not None:
+            self.selection_end = (event.xdata, event.ydata)
+            self.marker_renderer.set_rubber_band(self.selection_start, self.selection_end)
+
+    """
+    Method: on_release
+    --------------------------
+    Finishes a drag, a rectangle selection or a rectangle for suggestions. A press on an existing point that
+    did not move adds a point like a normal click.
+    """
+    def on_release(self, event):
+        if self.drag is not None:
+            drag, self.drag = self.drag, None
+            if drag['moved']:
+                x, y = self.object_points.xy[drag['index']]
+                print(f"Moved point of {self.object_points.object_of(drag['index'])} to ({int(x)}, {int(y)})")
+            else:
+                self.add_point(*drag['origin'])
+        elif self.selection_start is not None:
+            start, self.selection_start = self.selection_start, None
+            self.marker_renderer.set_rubber_band()
+            if self.selection_action == 'suggest':
+                self.suggest_points(*start, *self.selection_end)
+                return
+            self.set_selection(self.object_points.in_rect(*start, *self.selection_end))
+            self.set_status(f"Selected {len(self.selected_indices)} points, press Delete to remove them")
+
+    """
+    Method: suggest_points
+    --------------------------
+    Suggests prompt points inside the rectangle spanned by (x0, y0) and (x1, y1). The suggestions are
+    computed on a background thread from the screen-resolution proxy of the frame, so the view stays
+    responsive, and shown as 'x' markers once they are ready.
+    """
+    def suggest_points(self, x0, y0, x1, y1):
+        if self.suggester is None:
+            self.suggester = PromptSuggester()
+        image, frame_num = self.display_frame, self.current_frame_num
+        scale = image.shape[1] / self.frame_size[0]
+        result = {}
+
+        def suggest():
+            try:
+                result['points'], _ = self.suggester.suggest(image, (x0, y0, x1, y1), scale)
+            except Exception as e:
+                result['error'] = e
+
+        self.suggestions = {'frame': frame_num, 'points': None}
+        thread = threading.Thread(target=suggest, name="PromptSuggester", daemon=True)
+        thread.start()
+        self.root.after(50, self.poll_suggestions, thread, self.suggestions, result)
+
+    """
+    Method: poll_suggestions
+    --------------------------
+    Checks from the Tk main loop whether the background suggestion has finished and shows the suggested
+    points, unless the view has moved to another frame or another suggestion was started since.
+    """
+    def poll_suggestions(self, thread, suggestions, result):
+        if self.suggestions is not suggestions or self.marker_renderer is None:
+            return
+        if thread.is_alive():
+            self.root.after(50, self.poll_suggestions, thread, suggestions, result)
+            return
+        if 'error' in result:
+            self.suggestions = None
+            self.set_status(f"Failed to suggest points: {str(result['error'])}")
+            return
+        suggestions['points'] = result['points']
+        active_object = self.active_object()
+        self.marker_renderer.set_suggestions(result['points'],
+                                             active_object['color'] if active_object else 'white')
+        self.set_status(f"Suggested {len(result['points'])} points, press Enter or Accept to add them "
+                        f"and Escape to discard them")
+
+    """
+    Method: accept_suggestions
+    --------------------------
+    Adds the suggested points to the active object.
+    """
+    def accept_suggestions(self, event=None):
+        suggestions = self.suggestions
+        if suggestions is None or suggestions['points'] is None:
+            return
+        active_object = self.active_object()
+        if active_object is None:
+            self.set_status("Select an object to add the suggested points to")
+            return
+        object_name = active_object['entry'].text
+        self.session.add_points(suggestions['frame'], object_name, suggestions['points'], active_object['color'])
+        self.suggestions = None
+        self.marker_renderer.suggestions.set_data([], [])
+        self.redraw_object(object_name)
+        self.set_status(f"Added {len(suggestions['points'])} suggested points to {object_name}")
+
+    """
+    Method: add_point
+    --------------------------
+    Adds a point for the active object at (x, y) and blits its marker.
+    """
+    def add_point(self, x, y):
+        active_object = self.active_object()
         if not active_object:
             return
             
         object_name = active_object['entry'].text
         
-        if object_name not in self.object_points:
-            self.object_points[object_name] = {'points': [], 'color': active_object['color']}
+        self.session.add_point(self.current_frame_num, object_name, x, y, active_object['color'])
         
-        self.object_points[object_name]['points'].append((x, y))
-        
-        marker_size = 10
-        line_width = 1
-        color = active_object['color']
-        
-        self.current_ax.plot([x-marker_size, x+marker_size], [y, y], 
-                           color=color, linewidth=line_width)
-        self.current_ax.plot([x, x], [y-marker_size, y+marker_size], 
-                           color=color, linewidth=line_width)
+        self.marker_renderer.add_point(object_name, x, y,
+                                       self.session.frame_points(self.current_frame_num).colors[object_name])
         
         print(f"Selected point for {object_name}: ({int(x)}, {int(y)})")
-        
-        self.current_fig.canvas.draw()
+
+    """
+    Method: active_object
+    --------------------------
+    Returns the entry of the active object, or None if no object is active.
+    """
+    def active_object(self):
+        for obj in self.object_entries:
+            if obj['active']:
+                return obj
+        return None
+
+    """
+    Method: delete_nearest_point
+    --------------------------
+    Deletes the point of any object closest to (x, y) if it lies within the pick radius.
+    """
+    def delete_nearest_point(self, x, y):
+        removed = self.session.remove_nearest_point(self.current_frame_num, x, y, self.pick_radius())
+        if removed is None:
+            return
+        object_name, x, y = removed
+        self.selected_indices = []
+        self.marker_renderer.selection.set_data([], [])
+        self.redraw_object(object_name)
+        print(f"Deleted point of {object_name}: ({int(x)}, {int(y)})")
+
+    """
+    Method: delete_selected_points
+    --------------------------
+    Deletes every selected point and redraws the markers of the objects they belonged to.
+    """
+    def delete_selected_points(self):
+        if not len(self.selected_indices):
+            return
+        removed = self.session.remove_points(self.current_frame_num, self.selected_indices)
+        self.selected_indices = []
+        self.marker_renderer.selection.set_data([], [])
+        for object_name in {object_name for object_name, _, _ in removed}:
+            self.redraw_object(object_name)
+        self.set_status(f"Deleted {len(removed)} points")
+
+    """
+    Method: set_selection
+    --------------------------
+    Makes the points with the given indices the current selection and circles them.
+    """
+    def set_selection(self, indices):
+        self.selected_indices = list(indices)
+        self.marker_renderer.set_selection(self.object_points.xy[self.selected_indices])
+
+    """
+    Method: redraw_object
+    --------------------------
+    Redraws the markers of one object from the frame's point set.
+    """
+    def redraw_object(self, object_name):
+        self.marker_renderer.set_points(object_name, self.object_points.points(object_name),
+                                        self.object_points.colors[object_name])
+
+    """
+    Method: pick_radius
+    --------------------------
+    Returns the distance in frame pixels that PICK_RADIUS_PX screen pixels cover at the current zoom.
+    """
+    def pick_radius(self):
+        (x0, _), (x1, _) = self.current_ax.transData.inverted().transform([(0, 0), (PICK_RADIUS_PX, 0)])
+        return abs(x1 - x0)
 
     """
     Method: clear_points
     --------------------------
-    Clears all points for the currently active object. Redraws the frame and maintains points for other
-    objects. Only affects the currently selected object's points.
+    Clears all points for the currently active object. Removes the object's markers without redrawing the
+    frame and maintains points for other objects. Only affects the currently selected object's points.
     """
     def clear_points(self, event):
         active_object = None
@@ -380,54 +1349,46 @@ class VideoFrameSelector:
             
         object_name = active_object['entry'].text
         
-        if object_name in self.object_points:
-            self.object_points[object_name]['points'] = []
-        
-        self.current_ax.clear()
-        self.current_ax.imshow(self.current_frame)
-        self.current_ax.axis('off')
-        
-        for obj_name, obj_data in self.object_points.items():
-            if obj_name != object_name:
-                for x, y in obj_data['points']:
-                    marker_size = 10
-                    line_width = 1
-                    color = obj_data['color']
-                    
-                    self.current_ax.plot([x-marker_size, x+marker_size], [y, y], 
-                                       color=color, linewidth=line_width)
-                    self.current_ax.plot([x, x], [y-marker_size, y+marker_size], 
-                                       color=color, linewidth=line_width)
+        self.session.clear_object(self.current_frame_num, object_name)
         
-        self.current_fig.canvas.draw()
+        self.selected_indices = []
+        self.marker_renderer.selection.set_data([], [])
+        self.marker_renderer.clear(object_name)
+
+    """
+    Method: propagate_points
+    --------------------------
+    Asks for a frame range and tracks the saved points of the displayed frame across it with optical flow.
+    The tracked points are saved to the annotation store like points saved with the Save button.
+    """
+    def propagate_points(self, event):
+        frame_range = simpledialog.askstring(
+            "Propagate Points",
+            "Track the saved points of this frame over frames (first-last):",
+            initialvalue=f"{max(self.current_frame_num - 30, 0)}-"
+                         f"{min(self.current_frame_num + 30, self.session.frame_count - 1)}"
+        )
+        if not frame_range:
+            return
+        try:
+            first_frame, last_frame = (int(value) for value in frame_range.split('-'))
+            added = self.session.propagate(self.current_frame_num, first_frame, last_frame)
+            messagebox.showinfo("Success", f"Added {added} propagated points")
+        except ValueError:
+            messagebox.showwarning("Invalid Input",
+                                   f"Please enter a frame range such as 10-50 that contains frame "
+                                   f"{self.current_frame_num}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to propagate points: {str(e)}")
 
     """
     Method: get_frame
     --------------------------
-    Retrieves a specific frame from the video by frame number. Converts the frame from BGR to RGB color
-    space and returns it. Prints status messages about frame retrieval.
+    Retrieves a specific frame by frame number as an RGB image through the annotation session, which serves
+    it from the frame cache or decodes it. Returns None if the frame cannot be retrieved.
     """
     def get_frame(self, frame_num):
-        if self.cap is not None:
-            # ...existing code for video...
-            print(f"[INFO] Retrieving frame {frame_num}/{self.frame_count} from video...")
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-            ret, frame = self.cap.read()
-            if ret:
-                return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            print(f"[WARNING] Frame {frame_num} could not be retrieved.")
-            return None
-        elif self.image_files:
-            print(f"[INFO] Retrieving frame {frame_num}/{self.frame_count} from images...")
-            if 0 <= frame_num < len(self.image_files):
-                img = cv2.imread(self.image_files[frame_num])
-                if img is not None:
-                    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            print(f"[WARNING] Image frame {frame_num} could not be retrieved.")
-            return None
-        else:
-            print("[WARNING] No video or image folder loaded.")
-            return None
+        return self.session.get_frame(frame_num)
 
     """
     Method: run
@@ -446,8 +1407,16 @@ class VideoFrameSelector:
     """
     def on_closing(self):
         if messagebox.askokcancel("Quit", "Do you want to close the application?"):
-            if self.cap is not None:
-                self.cap.release()
+            if self.filmstrip_cancel is not None:
+                self.filmstrip_cancel.set()
+            if self.keyframes_cancel is not None:
+                self.keyframes_cancel.set()
+            self.stop_playback()
+            if self.session is not None:
+                stats = self.session.frame_cache.stats()
+                print(f"[INFO] Frame cache: {stats['hits']} hits, {stats['misses']} misses, "
+                      f"{stats['frames']} frames ({stats['bytes'] / 2**20:.1f} MiB) cached")
+                self.session.close()
             self.root.destroy()
 
     """
@@ -470,57 +1439,89 @@ class VideoFrameSelector:
     """
     def next_frame(self):
         current_frame = int(self.frame_slider.get())
-        if current_frame < self.frame_count - 1:
+        if current_frame < self.session.frame_count - 1:
             self.frame_slider.set(current_frame + 1)
             self.update_frame_number(current_frame + 1)
 
     """
     Method: save_points
     --------------------------
-    Saves the selected points for all objects to a CSV file. Creates an annotations directory if it
-    doesn't exist, handles both new files and updates to existing files. Prevents duplicate entries
-    and provides feedback about the save operation.
+    Saves the selected points for all objects of the displayed frame to the annotation store of the video,
+    by default annotations/<video_name>/points.csv. The points are written by a background writer, so the
+    window stays responsive; rapid repeated saves are merged into one write. Only rows that are not stored
+    yet are added, which prevents duplicate entries, and rows saved earlier from points that have since
+    been moved or deleted are removed. Progress and the outcome are shown in the status line.
     """
     def save_points(self, event):
-        if not self.object_points:
-            messagebox.showinfo("Info", "No points to save.")
-            return
-            
         try:
-            frame_num = int(self.frame_slider.get())
-            base_filename = os.path.splitext(self.video_filename)[0]
-            dir_path = f'annotations/{base_filename}'
-            os.makedirs(dir_path, exist_ok=True)
-            csv_filename = f'{dir_path}/points.csv'
-            
-            existing_entries = set()
-            if os.path.exists(csv_filename):
-                with open(csv_filename, 'r', newline='') as csvfile:
-                    reader = csv.reader(csvfile)
-                    next(reader)
-                    for row in reader:
-                        entry = (row[0], int(row[1]), row[2], int(row[3]), int(row[4]))
-                        existing_entries.add(entry)
-            
-            mode = 'a' if os.path.exists(csv_filename) else 'w'
-            new_points_added = 0
-            
-            with open(csv_filename, mode, newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                if mode == 'w':
-                    writer.writerow(['video_name', 'frame_number', 'object_name', 'x', 'y'])
-                
-                for obj_name, obj_data in self.object_points.items():
-                    for x, y in obj_data['points']:
-                        entry = (self.video_filename, frame_num, obj_name, int(x), int(y))
-                        if entry not in existing_entries:
-                            writer.writerow(list(entry))
-                            new_points_added += 1
-            
-            if new_points_added > 0:
-                messagebox.showinfo("Success", f"Added {new_points_added} new points to {csv_filename}")
-            else:
-                messagebox.showinfo("Info", "No new points to add (all points already exist in file)")
-            
+            queued = self.session.save_async(self.current_frame_num)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save points: {str(e)}")
+            self.set_status(f"Failed to save points: {str(e)}")
+            return
+        if queued == 0:
+            self.set_status("No points to save.")
+            return
+        self.set_status(f"Saving {queued} points...")
+        self.watch_saves()
+
+    """
+    Method: autosave
+    --------------------------
+    Saves the unsaved points of every frame in the background if points were added, moved or removed since
+    the last autosave, and schedules the next autosave. No autosave happens while a point is being dragged,
+    so only its final position is saved.
+    """
+    def autosave(self):
+        if (self.session is not None and self.session.source_path is not None and self.drag is None
+                and self.session.edits != self.autosaved_edits):
+            self.autosaved_edits = self.session.edits
+            try:
+                if self.session.save_async():
+                    self.watch_saves()
+            except Exception as e:
+                self.set_status(f"Autosave failed: {str(e)}")
+        self.root.after(int(self.autosave_seconds * 1000), self.autosave)
+
+    """
+    Method: watch_saves
+    --------------------------
+    Starts polling for finished background saves unless polling is already running.
+    """
+    def watch_saves(self):
+        if not self.polling_saves:
+            self.polling_saves = True
+            self.root.after(100, self.poll_saves)
+
+    """
+    Method: poll_saves
+    --------------------------
+    Reports finished background saves in the status line from the Tk main loop, polling until the writer
+    is idle.
+    """
+    def poll_saves(self):
+        idle = not self.session.saving()
+        for result in self.session.save_results():
+            if result['error'] is not None:
+                self.set_status(f"Failed to save points: {str(result['error'])}")
+            elif result['removed'] > 0:
+                self.set_status(f"Added {result['added']} new points to {result['path']} and removed "
+                                f"{result['removed']} moved or deleted points")
+            elif result['added'] > 0:
+                self.set_status(f"Added {result['added']} new points to {result['path']}")
+            else:
+                self.set_status("No new points to add (all points already exist in file)")
+        self.polling_saves = not idle
+        if self.polling_saves:
+            self.root.after(100, self.poll_saves)
+
+    """
+    Method: set_status
+    --------------------------
+    Shows a message in the status line of the main window and of the annotation view.
+    """
+    def set_status(self, message):
+        print(f"[INFO] {message}")
+        self.status_label.configure(text=message)
+        if self.status_text is not None:
+            self.status_text.set_text(message)
+            self.current_fig.canvas.draw_idle()
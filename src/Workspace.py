@@ -0,0 +1,143 @@
+import os
+import cv2
+from AnnotationStore import read_annotated_frames
+from CapturePool import CapturePool, DEFAULT_MAX_OPEN
+from ImageFolderManifest import ImageFolderManifest, IMAGE_EXTENSIONS
+from SeekIndex import SeekIndex
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.m4v', '.webm')
+
+class Workspace:
+    """
+    Method: __init__
+    --------------------------
+    Initializes a workspace over a list of clips, each a video file or a folder of numbered images, annotated
+    through one AnnotationSession. The session is switched to workspace mode with a pool of at most max_open
+    capture handles, so switching between clips keeps recently used files open and never reparses their
+    annotations. Metadata of every clip (kind, frame count, frame size and number of annotated frames) is
+    cached after it is first read; reading it neither opens a clip in the session nor creates its store.
+    """
+    def __init__(self, session, clips, max_open=DEFAULT_MAX_OPEN):
+        if session.capture_pool is None:
+            session.capture_pool = CapturePool(max_open)
+        self.session = session
+        self.clips = list(clips)
+        self.metadata = {}
+        self.current = None
+
+    """
+    Method: scan
+    --------------------------
+    Expands paths into a sorted list of clips. A video file is a clip and a folder holding images is a clip.
+    Any other folder contributes the videos and image folders directly inside it, and a .txt file lists one
+    path per line.
+    """
+    @staticmethod
+    def scan(paths):
+        clips = []
+        for path in paths:
+            if os.path.isdir(path):
+                if is_image_folder(path):
+                    clips.append(path)
+                    continue
+                with os.scandir(path) as entries:
+                    clips.extend(sorted(
+                        entry.path for entry in entries
+                        if (entry.is_dir() and is_image_folder(entry.path))
+                        or (entry.is_file() and os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS)
+                    ))
+            elif os.path.splitext(path)[1].lower() == '.txt':
+                with open(path, 'r') as list_file:
+                    clips.extend(Workspace.scan([line.strip() for line in list_file if line.strip()]))
+            else:
+                clips.append(path)
+        return list(dict.fromkeys(clips))
+
+    """
+    Method: open
+    --------------------------
+    Loads a clip, given by its index or path, into the session. The previous clip is parked by the session.
+    Raises ValueError if the clip cannot be loaded.
+    """
+    def open(self, clip):
+        path = self.clips[clip] if isinstance(clip, int) else clip
+        if os.path.isdir(path):
+            self.session.load_image_folder(path)
+        else:
+            self.session.load_video(path)
+        self.current = path
+        self.metadata.pop(path, None)
+        return self.refresh_progress(path)
+
+    """
+    Method: describe
+    --------------------------
+    Returns the cached metadata of a clip, reading it with read_metadata on first use.
+    """
+    def describe(self, path):
+        info = self.metadata.get(path)
+        if info is None:
+            info = self.metadata[path] = self.read_metadata(path)
+        return info
+
+    """
+    Method: read_metadata
+    --------------------------
+    Reads the metadata of a clip as a dictionary with its path, name, kind ('video' or 'images'),
+    frame_count, width, height and annotated_frames. The frame size of a video is read from its capture
+    properties and its frame count from the seek index when one has been built. The annotated frames are
+    counted from the store file, if there is one, without creating it. Values that cannot be read are None.
+    Only files are read, never the session's open captures or stores, so this may run on a background
+    thread; the result is not cached.
+    """
+    def read_metadata(self, path):
+        name = os.path.basename(os.path.normpath(path))
+        info = {'path': path, 'name': name, 'frame_count': None, 'width': None, 'height': None}
+        if os.path.isdir(path):
+            info['kind'] = 'images'
+            try:
+                manifest = ImageFolderManifest.load_or_build(path)
+                info['frame_count'] = len(manifest)
+                size = manifest.frame_size(0)
+                if size is not None:
+                    info['width'], info['height'] = size
+                manifest.close()
+            except (OSError, ValueError):
+                pass
+        else:
+            info['kind'] = 'video'
+            cap = cv2.VideoCapture(path)
+            if cap.isOpened():
+                info['width'] = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+                info['height'] = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                index = SeekIndex.load(path)
+                info['frame_count'] = (index.frame_count if index is not None
+                                       else int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+            cap.release()
+        info['annotated_frames'] = len(read_annotated_frames(
+            self.session.annotation_dir(name), name, self.session.store_backend))
+        return info
+
+    """
+    Method: refresh_progress
+    --------------------------
+    Recounts the annotated frames of a clip, by default the current one, e.g. after its points were saved.
+    Waits for pending background saves first.
+    """
+    def refresh_progress(self, path=None):
+        path = path or self.current
+        if path is None:
+            return None
+        info = self.describe(path)
+        info['annotated_frames'] = len(self.session.annotated_frames(info['name']))
+        return info
+
+"""
+Function: is_image_folder
+--------------------------
+Returns True if a folder directly holds at least one JPG/PNG file.
+"""
+def is_image_folder(path):
+    with os.scandir(path) as entries:
+        return any(entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+                   for entry in entries)
@@ -0,0 +1,303 @@
+import argparse
+import csv
+import json
+import os
+import time
+from AnnotationSession import AnnotationSession
+from AnnotationStore import STORE_BACKENDS
+from FrameExtractor import extract_frames, IMAGE_FORMATS
+from KeyframeAnalyzer import KeyframeAnalysis, MAX_KEYFRAMES
+from PromptSuggester import PromptSuggester
+from PromptExport import PromptReader
+from Workspace import Workspace
+
+"""
+Function: read_point_prompts
+--------------------------
+Reads point prompts from a CSV or JSON file and yields them as (frame_number, object_name, x, y) tuples.
+CSV files need frame_number, object_name, x and y columns, as in points.csv. JSON files hold either a list of
+records with frame_number/frame, object_name/object and x, y or a points list of [x, y] pairs, or a mapping
+of frame number to a mapping of object name to a list of [x, y] pairs. Coordinates may be fractional and are
+rounded to whole pixels. Malformed prompts are reported with a warning and skipped.
+"""
+def read_point_prompts(path):
+    for number, (frame_number, object_name, point) in enumerate(_read_raw_prompts(path), 1):
+        try:
+            if object_name is None or object_name == '':
+                raise ValueError("missing object name")
+            x, y = point
+            yield (int(frame_number), str(object_name), round(float(x)), round(float(y)))
+        except (TypeError, ValueError, OverflowError) as e:
+            print(f"[WARNING] {path}: skipping malformed point {number} "
+                  f"({frame_number}, {object_name}, {point}): {e}")
+
+def _read_raw_prompts(path):
+    if os.path.splitext(path)[1].lower() == '.csv':
+        with open(path, 'r', newline='') as csvfile:
+            for row in csv.DictReader(csvfile):
+                yield (row.get('frame_number', row.get('frame')), row.get('object_name', row.get('object')),
+                       (row.get('x'), row.get('y')))
+        return
+
+    with open(path, 'r') as json_file:
+        data = json.load(json_file)
+    if isinstance(data, dict):
+        for frame_number, objects in data.items():
+            for object_name, points in objects.items():
+                for point in points:
+                    yield (frame_number, object_name, point)
+        return
+    for record in data:
+        frame_number = record.get('frame_number', record.get('frame'))
+        object_name = record.get('object_name', record.get('object'))
+        if 'points' in record:
+            for point in record['points']:
+                yield (frame_number, object_name, point)
+        else:
+            yield (frame_number, object_name, (record.get('x'), record.get('y')))
+
+"""
+Function: import_command
+--------------------------
+Bulk-imports the point prompts of every given file into the annotation store of a video in one batch per
+file and reports how many points were added.
+"""
+def import_command(args):
+    session = AnnotationSession(store_backend=args.backend, annotations_root=args.annotations_dir)
+    video_filename = os.path.basename(os.path.normpath(args.video))
+    try:
+        for path in args.files:
+            start = time.perf_counter()
+            points = list(read_point_prompts(path))
+            added = session.import_points(points, video_filename=video_filename)
+            elapsed = time.perf_counter() - start
+            print(f"[INFO] {path}: added {added} of {len(points)} points in {elapsed:.2f}s")
+        print(f"[INFO] Annotations saved to {session.get_annotation_store(video_filename).path}")
+    finally:
+        session.close()
+
+"""
+Function: frames_command
+--------------------------
+Lists the annotated frames of a video with the number of points on each.
+"""
+def frames_command(args):
+    session = AnnotationSession(store_backend=args.backend, annotations_root=args.annotations_dir)
+    video_filename = os.path.basename(os.path.normpath(args.video))
+    try:
+        store = session.get_annotation_store(video_filename)
+        for frame_number in store.frames(video_filename):
+            print(f"{frame_number}\t{len(store.query_frame(video_filename, frame_number))}")
+    finally:
+        session.close()
+
+"""
+Function: propagate_command
+--------------------------
+Tracks the saved points of one frame over a frame range with optical flow and saves the tracked points.
+"""
+def propagate_command(args):
+    session = AnnotationSession(store_backend=args.backend, annotations_root=args.annotations_dir)
+    try:
+        if os.path.isdir(args.video):
+            session.load_image_folder(args.video)
+        else:
+            session.load_video(args.video)
+        start = time.perf_counter()
+        try:
+            added = session.propagate(args.frame, args.first, args.last)
+        except ValueError as e:
+            raise SystemExit(f"Cannot propagate points: {e}")
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] Added {added} propagated points in {elapsed:.2f}s")
+    finally:
+        session.close()
+
+"""
+Function: extract_command
+--------------------------
+Extracts the frames of a video into a folder of numbered images for the image-folder input mode.
+"""
+def extract_command(args):
+    start = time.perf_counter()
+    written = extract_frames(args.video, args.output, stride=args.stride, width=args.width, height=args.height,
+                             image_format=args.format, quality=args.quality, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] Wrote {written} frames to {args.output} in {elapsed:.2f}s")
+
+"""
+Function: clips_command
+--------------------------
+Lists the clips of a workspace with their frame count, frame size and number of annotated frames.
+"""
+def clips_command(args):
+    session = AnnotationSession(store_backend=args.backend, annotations_root=args.annotations_dir)
+    try:
+        workspace = Workspace(session, Workspace.scan(args.paths))
+        for clip in workspace.clips:
+            info = workspace.describe(clip)
+            print(f"{info['name']}\t{info['kind']}\t{info['frame_count']}\t{info['width']}x{info['height']}\t"
+                  f"{info['annotated_frames']}")
+    finally:
+        session.close()
+
+"""
+Function: keyframes_command
+--------------------------
+Recommends the frames of a video or image folder to annotate and lists them by rank with the segment each
+one represents. A saved analysis is reused unless --force is given.
+"""
+def keyframes_command(args):
+    session = AnnotationSession(store_backend=args.backend, annotations_root=args.annotations_dir)
+    try:
+        if os.path.isdir(args.video):
+            session.load_image_folder(args.video)
+        else:
+            session.load_video(args.video)
+        analysis = None if args.force else KeyframeAnalysis.load(session.source_path, session.frame_count)
+        if analysis is None:
+            start = time.perf_counter()
+            analysis = KeyframeAnalysis.analyze(
+                session.source_path, session.frame_count,
+                video_path=session.video_path if session.cap is not None else None,
+                image_files=list(session.image_files), step=args.step, workers=args.workers,
+                max_keyframes=args.max_keyframes
+            )
+            elapsed = time.perf_counter() - start
+            print(f"[INFO] Analyzed {session.frame_count} frames in {elapsed:.2f}s "
+                  f"({session.frame_count / max(elapsed, 1e-9):.1f} frames/s)")
+        print(f"[INFO] {len(analysis.segments)} segments")
+        for rank, keyframe in enumerate(analysis.keyframes, start=1):
+            print(f"{rank}\t{keyframe['frame']}\t{keyframe['start']}-{keyframe['end'] - 1}\t{keyframe['score']}")
+    finally:
+        session.close()
+
+"""
+Function: suggest_command
+--------------------------
+Batch mode of the point suggestions. Suggests prompts for one object inside the same rectangle on a range of
+frames, or on the recommended keyframes, and saves them.
+"""
+def suggest_command(args):
+    session = AnnotationSession(store_backend=args.backend, annotations_root=args.annotations_dir)
+    try:
+        if os.path.isdir(args.video):
+            session.load_image_folder(args.video)
+        else:
+            session.load_video(args.video)
+        if args.keyframes:
+            analysis = KeyframeAnalysis.load(session.source_path, session.frame_count)
+            if analysis is None:
+                raise SystemExit(f"No keyframes for {args.video}, run the keyframes command first")
+            frame_numbers = analysis.frames()
+        else:
+            last = session.frame_count - 1 if args.last is None else args.last
+            frame_numbers = range(args.first, last + 1, args.step)
+        start = time.perf_counter()
+        added = session.suggest_frames(frame_numbers, args.rect, args.object,
+                                       suggester=PromptSuggester(count=args.count), workers=args.workers)
+        elapsed = time.perf_counter() - start
+        saved = session.save()
+        print(f"[INFO] Suggested {sum(added.values())} points on {len(added)} frames in {elapsed:.2f}s, "
+              f"saved {saved} new points")
+    finally:
+        session.close()
+
+"""
+Function: export_command
+--------------------------
+Writes the saved points of a video as a columnar prompt export for the segmentation model.
+"""
+def export_command(args):
+    session = AnnotationSession(store_backend=args.backend, annotations_root=args.annotations_dir)
+    video_filename = os.path.basename(os.path.normpath(args.video))
+    try:
+        start = time.perf_counter()
+        output_dir, written = session.export_prompts(args.output, video_filename)
+        elapsed = time.perf_counter() - start
+        reader = PromptReader(output_dir)
+        print(f"[INFO] Exported {written} points of {len(reader.object_names)} objects on {len(reader)} frames "
+              f"to {output_dir} in {elapsed:.2f}s")
+    finally:
+        session.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless point prompt annotation tools.")
+    parser.add_argument('--backend', choices=STORE_BACKENDS, default='csv',
+                        help="annotation store backend (default: csv)")
+    parser.add_argument('--annotations-dir', default='annotations',
+                        help="directory holding one annotation folder per video (default: annotations)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help="bulk-import point prompts from JSON or CSV files")
+    import_parser.add_argument('video', help="video file or image folder the points belong to")
+    import_parser.add_argument('files', nargs='+', help="JSON or CSV files with point prompts")
+    import_parser.set_defaults(func=import_command)
+
+    frames_parser = subparsers.add_parser('frames', help="list annotated frames and their point counts")
+    frames_parser.add_argument('video', help="video file or image folder")
+    frames_parser.set_defaults(func=frames_command)
+
+    propagate_parser = subparsers.add_parser(
+        'propagate', help="track the saved points of a frame over a frame range with optical flow")
+    propagate_parser.add_argument('video', help="video file or image folder")
+    propagate_parser.add_argument('--frame', type=int, required=True, help="frame holding the saved points")
+    propagate_parser.add_argument('--first', type=int, required=True, help="first frame of the range")
+    propagate_parser.add_argument('--last', type=int, required=True, help="last frame of the range")
+    propagate_parser.set_defaults(func=propagate_command)
+
+    extract_parser = subparsers.add_parser(
+        'extract', help="extract the frames of a video into a folder of numbered images")
+    extract_parser.add_argument('video', help="video file")
+    extract_parser.add_argument('output', help="output folder")
+    extract_parser.add_argument('--stride', type=int, default=1, help="keep every n-th frame (default: 1)")
+    extract_parser.add_argument('--width', type=int, help="output width, keeps the aspect ratio if alone")
+    extract_parser.add_argument('--height', type=int, help="output height, keeps the aspect ratio if alone")
+    extract_parser.add_argument('--format', choices=IMAGE_FORMATS, default='jpg', help="image format")
+    extract_parser.add_argument('--quality', type=int,
+                                help="JPEG quality (0-100) or PNG compression level (0-9)")
+    extract_parser.add_argument('--workers', type=int, help="worker processes (default: number of CPUs)")
+    extract_parser.set_defaults(func=extract_command)
+
+    clips_parser = subparsers.add_parser(
+        'clips', help="list the clips of a workspace with their size and annotation progress")
+    clips_parser.add_argument('paths', nargs='+',
+                              help="videos, image folders, folders of clips or .txt files listing clips")
+    clips_parser.set_defaults(func=clips_command)
+
+    keyframes_parser = subparsers.add_parser(
+        'keyframes', help="recommend the frames to annotate from a scene-change analysis")
+    keyframes_parser.add_argument('video', help="video file or image folder")
+    keyframes_parser.add_argument('--step', type=int, default=1, help="analyze every n-th frame (default: 1)")
+    keyframes_parser.add_argument('--max-keyframes', type=int, default=MAX_KEYFRAMES,
+                                  help=f"number of frames to recommend at most (default: {MAX_KEYFRAMES})")
+    keyframes_parser.add_argument('--workers', type=int, help="worker processes (default: number of CPUs)")
+    keyframes_parser.add_argument('--force', action='store_true', help="redo a saved analysis")
+    keyframes_parser.set_defaults(func=keyframes_command)
+
+    suggest_parser = subparsers.add_parser(
+        'suggest', help="suggest and save point prompts for an object inside a rectangle on many frames")
+    suggest_parser.add_argument('video', help="video file or image folder")
+    suggest_parser.add_argument('--object', required=True, help="object the points are added to")
+    suggest_parser.add_argument('--rect', type=float, nargs=4, required=True, metavar=('X0', 'Y0', 'X1', 'Y1'),
+                                help="corners of the region, in frame pixels")
+    suggest_parser.add_argument('--first', type=int, default=0, help="first frame (default: 0)")
+    suggest_parser.add_argument('--last', type=int, help="last frame (default: last frame of the input)")
+    suggest_parser.add_argument('--step', type=int, default=1, help="use every n-th frame (default: 1)")
+    suggest_parser.add_argument('--keyframes', action='store_true',
+                                help="use the recommended keyframes instead of a frame range")
+    suggest_parser.add_argument('--count', type=int, default=8, help="points per frame at most (default: 8)")
+    suggest_parser.add_argument('--workers', type=int, default=4, help="worker threads (default: 4)")
+    suggest_parser.set_defaults(func=suggest_command)
+
+    export_parser = subparsers.add_parser(
+        'export', help="write the saved points as memory-mappable arrays grouped by frame and object")
+    export_parser.add_argument('video', help="video file or image folder the points belong to")
+    export_parser.add_argument('--output', help="output folder (default: prompts next to the annotations)")
+    export_parser.set_defaults(func=export_command)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+import pytest
+
+FRAME_SIZE = (96, 64)
+CODE_BITS = 8
+
+
+def _frame_code(frame):
+    width = frame.shape[1] // CODE_BITS
+    blocks = frame[:16, :width * CODE_BITS].reshape(16, CODE_BITS, width, -1).mean(axis=(0, 2, 3))
+    return sum(1 << bit for bit, level in enumerate(blocks) if level > 127)
+
+
+@pytest.fixture
+def frame_code():
+    """Returns a function reading back the frame number drawn by write_video."""
+    return _frame_code
+
+
+@pytest.fixture
+def write_video(tmp_path):
+    """Returns a function writing a synthetic video. Unless code is False, every frame carries its number."""
+    def write(frame_count, name='clip.mp4', background=None, code=True):
+        path = str(tmp_path / name)
+        width, height = FRAME_SIZE
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), 25, FRAME_SIZE)
+        block = width // CODE_BITS
+        for frame_num in range(frame_count):
+            frame = np.zeros((height, width, 3), np.uint8)
+            if background is not None:
+                frame[16 if code else 0:] = background(frame_num)
+            for bit in range(CODE_BITS if code else 0):
+                if frame_num >> bit & 1:
+                    frame[:16, bit * block:(bit + 1) * block] = 255
+            writer.write(frame)
+        writer.release()
+        return path
+    return write
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AnnotationSession import AnnotationSession
+
+VIDEO_NAME = 'clip.mp4'
+
+
+@pytest.mark.parametrize('backend', ['csv', 'sqlite'])
+@pytest.mark.parametrize('asynchronous', [False, True])
+def test_save_replaces_moved_and_deleted_points(tmp_path, backend, asynchronous):
+    session = AnnotationSession(store_backend=backend, annotations_root=str(tmp_path))
+    session.video_filename = VIDEO_NAME
+    store = session.get_annotation_store()
+    store.upsert([(VIDEO_NAME, 3, 'other', 1, 1)])
+    save = session.save_async if asynchronous else session.save
+    try:
+        session.add_point(3, 'door', 10, 10)
+        session.add_point(3, 'door', 20, 20)
+        save(3)
+        session.flush_saves()
+        session.move_point(3, 0, 15, 15)
+        session.remove_nearest_point(3, 20, 20)
+        save(3)
+        session.flush_saves()
+        assert sorted(store.query_frame(VIDEO_NAME, 3)) == [
+            (VIDEO_NAME, 3, 'door', 15, 15), (VIDEO_NAME, 3, 'other', 1, 1)]
+    finally:
+        session.close()
+
+
+def test_failed_background_save_retries_removing_stale_rows(tmp_path):
+    session = AnnotationSession(annotations_root=str(tmp_path))
+    session.video_filename = VIDEO_NAME
+    store = session.get_annotation_store()
+    try:
+        session.add_point(3, 'door', 10, 10)
+        session.save(3)
+        session.move_point(3, 0, 15, 15)
+        delete, store.delete = store.delete, None
+        session.save_async(3)
+        session.flush_saves()
+        assert session.save_results()[0]['error'] is not None
+        store.delete = delete
+        session.save(3)
+        assert store.query_frame(VIDEO_NAME, 3) == [(VIDEO_NAME, 3, 'door', 15, 15)]
+    finally:
+        session.close()
+
+
+def test_get_frame_returns_exact_frames_in_any_order(tmp_path, write_video, frame_code):
+    session = AnnotationSession(annotations_root=str(tmp_path / 'annotations'))
+    try:
+        session.load_video(write_video(60))
+        session.frame_cache.max_bytes = 0
+        for frame_num in [0, 1, 2, 7, 17, 16, 59, 3, 40, 41, 45, 30]:
+            assert frame_code(session.get_frame(frame_num)) == frame_num
+    finally:
+        session.close()
@@ -0,0 +1,90 @@
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AnnotationStore import CsvAnnotationStore
+
+SHIPPED_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'annotations',
+                           'REU_example_input_video_SAM', 'points.csv')
+VIDEO_NAME = 'REU_example_input_video_SAM.mp4'
+LAST_ROW = (VIDEO_NAME, 653, 'Test', 833, 1375)
+
+
+def copy_shipped_csv(tmp_path):
+    path = str(tmp_path / 'points.csv')
+    shutil.copyfile(SHIPPED_CSV, path)
+    return path
+
+
+def test_open_keeps_last_row_without_newline(tmp_path):
+    path = copy_shipped_csv(tmp_path)
+    with open(path, 'rb') as csvfile:
+        original = csvfile.read()
+    assert not original.endswith(b'\n')
+
+    store = CsvAnnotationStore(path)
+    assert LAST_ROW in store.query_frame(VIDEO_NAME, 653)
+    with open(path, 'rb') as csvfile:
+        assert csvfile.read() == original
+
+
+def test_append_after_row_without_newline(tmp_path):
+    path = copy_shipped_csv(tmp_path)
+    store = CsvAnnotationStore(path)
+    count = len(store)
+    assert store.upsert([(VIDEO_NAME, 700, 'Test', 10, 20)]) == 1
+
+    reopened = CsvAnnotationStore(path)
+    assert len(reopened) == count + 1
+    assert LAST_ROW in reopened.query_frame(VIDEO_NAME, 653)
+    assert reopened.query_frame(VIDEO_NAME, 700) == [(VIDEO_NAME, 700, 'Test', 10, 20)]
+
+
+def test_partial_last_line_is_cut_on_next_save(tmp_path):
+    path = copy_shipped_csv(tmp_path)
+    with open(path, 'ab') as csvfile:
+        csvfile.write(b'\r\nREU_example_input_video_SAM.mp4,65')
+    with open(path, 'rb') as csvfile:
+        torn = csvfile.read()
+
+    store = CsvAnnotationStore(path)
+    count = len(store)
+    assert LAST_ROW in store.query_frame(VIDEO_NAME, 653)
+    with open(path, 'rb') as csvfile:
+        assert csvfile.read() == torn
+
+    store.upsert([(VIDEO_NAME, 700, 'Test', 10, 20)])
+    reopened = CsvAnnotationStore(path)
+    assert len(reopened) == count + 1
+    with open(path, 'rb') as csvfile:
+        assert b',65\r\n' not in csvfile.read()
+
+
+def test_unfinished_append_is_ignored_even_if_it_parses(tmp_path):
+    path = str(tmp_path / 'points.csv')
+    store = CsvAnnotationStore(path)
+    store.upsert([('v.mp4', 1, 'A', 10, 20)])
+    # A crash during an append leaves the journal behind and a cut last line that still has five fields.
+    with open(path, 'rb') as csvfile:
+        length = len(csvfile.read())
+    with open(path + '.journal', 'w') as journal:
+        journal.write(str(length))
+    with open(path, 'ab') as csvfile:
+        csvfile.write(b'v.mp4,653,A,833,137')
+
+    reopened = CsvAnnotationStore(path)
+    assert reopened.query_frame('v.mp4', 653) == []
+    reopened.upsert([('v.mp4', 2, 'A', 5, 5)])
+    assert not os.path.exists(path + '.journal')
+    assert sorted(CsvAnnotationStore(path)) == [('v.mp4', 1, 'A', 10, 20), ('v.mp4', 2, 'A', 5, 5)]
+
+
+def test_save_after_torn_header_writes_header(tmp_path):
+    path = str(tmp_path / 'points.csv')
+    with open(path, 'wb') as csvfile:
+        csvfile.write(b'video_na')
+    store = CsvAnnotationStore(path)
+    assert store.upsert([('v.mp4', 1, 'A', 1, 1), ('v.mp4', 2, 'A', 2, 2)]) == 2
+    assert len(CsvAnnotationStore(path)) == 2
@@ -0,0 +1,95 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AnnotationStore import CsvAnnotationStore
+from AnnotationWriter import AnnotationWriter
+
+VIDEO_NAME = 'clip.mp4'
+
+
+def row(frame_number, x):
+    return (VIDEO_NAME, frame_number, 'door', x, 0)
+
+
+class RecordingStore:
+    # Records the writes made to it; upsert fails while fail is set.
+    def __init__(self, path):
+        self.path = path
+        self.calls = []
+        self.fail = False
+
+    def delete(self, rows):
+        self.calls.append(('delete', sorted(rows)))
+        return len(rows)
+
+    def upsert(self, rows):
+        self.calls.append(('upsert', list(rows)))
+        if self.fail:
+            raise OSError("disk full")
+        return len(rows)
+
+
+@pytest.fixture
+def writer():
+    writer = AnnotationWriter(coalesce_delay=0.5)
+    yield writer
+    writer.stop()
+
+
+def test_burst_of_saves_is_written_once_per_store(writer):
+    first, second = RecordingStore('first'), RecordingStore('second')
+    writer.submit(first, [row(0, 1)])
+    writer.submit(second, [row(0, 1)])
+    writer.submit(first, [row(1, 1), row(0, 1)])
+    writer.submit(first, [row(2, 1)], stale=[row(5, 1)])
+    writer.flush()
+
+    assert first.calls == [('delete', [row(5, 1)]), ('upsert', [row(0, 1), row(1, 1), row(2, 1)])]
+    assert second.calls == [('upsert', [row(0, 1)])]
+    results = {result['path']: result for result in writer.poll()}
+    assert results['first'] == {'path': 'first', 'added': 3, 'removed': 1, 'saves': 3, 'error': None,
+                                'stale': [row(5, 1)]}
+    assert results['second']['saves'] == 1
+    assert writer.idle() and writer.poll() == []
+
+
+def test_later_saves_win_over_earlier_ones(writer):
+    store = RecordingStore('store')
+    writer.submit(store, [row(0, 1), row(0, 2)])
+    writer.submit(store, [row(0, 3)], stale=[row(0, 1), row(0, 4)])
+    writer.submit(store, [row(0, 4)], stale=[row(0, 3)])
+    writer.flush()
+    assert store.calls == [('delete', [row(0, 1), row(0, 3)]), ('upsert', [row(0, 2), row(0, 4)])]
+
+
+def test_failed_write_is_reported_and_writer_keeps_going(writer):
+    store = RecordingStore('store')
+    store.fail = True
+    writer.submit(store, [row(0, 1)], stale=[row(0, 2)])
+    writer.flush()
+    [result] = writer.poll()
+    assert isinstance(result['error'], OSError)
+    assert (result['added'], result['removed'], result['stale']) == (0, 1, [row(0, 2)])
+
+    store.fail = False
+    writer.submit(store, [row(0, 1)])
+    writer.flush()
+    [result] = writer.poll()
+    assert result['error'] is None and result['added'] == 1
+
+
+def test_stop_writes_queued_saves_to_disk(tmp_path):
+    store = CsvAnnotationStore(str(tmp_path / 'points.csv'))
+    writer = AnnotationWriter(coalesce_delay=0.2)
+    writer.submit(store, [row(0, 1), row(1, 2)])
+    writer.submit(store, [row(2, 3)], stale=[row(1, 2)])
+    writer.stop()
+    with pytest.raises(RuntimeError):
+        writer.submit(store, [row(3, 4)])
+
+    assert sorted(CsvAnnotationStore(store.path)) == [row(0, 1), row(2, 3)]
+    assert [result['saves'] for result in writer.poll()] == [2]
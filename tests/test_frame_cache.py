@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from FrameCache import FrameCache
+
+
+def frame(value, size=10):
+    return np.full((size, size, 3), value, dtype=np.uint8)
+
+
+def test_evicts_least_recently_used_frames_beyond_byte_budget():
+    cache = FrameCache(max_bytes=3 * frame(0).nbytes)
+    for frame_num in range(3):
+        cache.put(frame_num, frame(frame_num))
+    assert cache.get(0) is not None
+    cache.put(3, frame(3))
+    assert 1 not in cache
+    assert [frame_num in cache for frame_num in (0, 2, 3)] == [True, True, True]
+    assert cache.current_bytes == 3 * frame(0).nbytes
+
+    cache.put(4, frame(4, size=17))
+    assert len(cache) == 1 and 4 in cache
+    assert cache.current_bytes == frame(4, size=17).nbytes
+
+
+def test_replacing_a_frame_keeps_the_byte_count():
+    cache = FrameCache(max_bytes=10 * frame(0).nbytes)
+    cache.put(0, frame(0))
+    cache.put(0, frame(1, size=5))
+    assert len(cache) == 1
+    assert cache.current_bytes == frame(1, size=5).nbytes
+    assert cache.get(0)[0, 0, 0] == 1
+
+
+def test_frame_larger_than_budget_is_not_cached():
+    cache = FrameCache(max_bytes=frame(0).nbytes - 1)
+    cache.put(0, frame(0))
+    assert len(cache) == 0 and cache.current_bytes == 0
+
+
+def test_counts_hits_and_misses_until_cleared():
+    cache = FrameCache(max_bytes=frame(0).nbytes)
+    cache.put(0, frame(0))
+    cache.get(0)
+    cache.get(0)
+    cache.get(1)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['frames']) == (2, 1, 1)
+    assert stats['hit_rate'] == pytest.approx(2 / 3)
+
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'frames': 0, 'bytes': 0,
+                             'max_bytes': frame(0).nbytes}
+
+
+def test_cached_frames_are_read_only():
+    cache = FrameCache()
+    cache.put(0, frame(0))
+    with pytest.raises(ValueError):
+        cache.get(0)[0, 0, 0] = 1
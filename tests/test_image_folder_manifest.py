@@ -0,0 +1,68 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from ImageFolderManifest import ImageFolderManifest, image_size
+
+
+@pytest.fixture
+def folder(tmp_path):
+    path = tmp_path / 'frames'
+    path.mkdir()
+    for frame_num, (width, height) in enumerate([(64, 48), (80, 40), (32, 96)]):
+        extension = 'png' if frame_num == 1 else 'jpg'
+        cv2.imwrite(str(path / f'{frame_num * 10}.{extension}'), np.zeros((height, width, 3), np.uint8))
+    (path / 'notes.txt').write_text('not a frame')
+    return str(path)
+
+
+def test_build_sorts_by_frame_number_and_reads_sizes(folder):
+    cv2.imwrite(os.path.join(folder, '5.jpg'), np.zeros((10, 20, 3), np.uint8))
+    manifest = ImageFolderManifest.build(folder)
+    assert manifest.names == ['0.jpg', '5.jpg', '10.png', '20.jpg']
+    sizes = [manifest.frame_size(frame_num) for frame_num in range(len(manifest))]
+    assert sizes == [(64, 48), (20, 10), (80, 40), (32, 96)]
+    assert manifest.read(3).shape == (96, 32, 3)
+
+
+def test_saving_the_manifest_keeps_it_valid(folder):
+    entries, mtime_ns = sorted(os.listdir(folder)), os.stat(folder).st_mtime_ns
+    ImageFolderManifest.load_or_build(folder)
+    assert sorted(os.listdir(folder)) == entries and os.stat(folder).st_mtime_ns == mtime_ns
+    loaded = ImageFolderManifest.load(folder)
+    assert loaded is not None and loaded.names == ['0.jpg', '10.png', '20.jpg']
+    assert loaded.frame_size(1) == (80, 40)
+
+
+def test_manifest_is_invalidated_when_the_folder_changes(folder):
+    ImageFolderManifest.load_or_build(folder)
+    cv2.imwrite(os.path.join(folder, '30.jpg'), np.zeros((8, 8, 3), np.uint8))
+    stat = os.stat(folder)
+    # The new file and the manifest may share a timestamp on coarse filesystems, so move the mtime on.
+    os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert ImageFolderManifest.load(folder) is None
+
+    manifest = ImageFolderManifest.load_or_build(folder)
+    assert manifest.names[-1] == '30.jpg'
+    assert ImageFolderManifest.load(folder).names == manifest.names
+
+    stat = os.stat(folder)
+    os.utime(folder, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert ImageFolderManifest.load(folder) is None
+
+
+def test_non_numeric_image_name_is_rejected(folder):
+    cv2.imwrite(os.path.join(folder, 'cover.jpg'), np.zeros((8, 8, 3), np.uint8))
+    with pytest.raises(ValueError):
+        ImageFolderManifest.build(folder)
+
+
+def test_unreadable_header_has_unknown_size(tmp_path):
+    path = tmp_path / '0.jpg'
+    path.write_bytes(b'\xff\xd8\xff')
+    assert image_size(str(path)) == (0, 0)
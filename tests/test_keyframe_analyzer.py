@@ -0,0 +1,60 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from KeyframeAnalyzer import KeyframeAnalysis
+
+SCENE_LENGTH = 40
+SCENE_COUNT = 3
+FRAME_COUNT = SCENE_LENGTH * SCENE_COUNT
+
+
+def scene(index, width=96, height=64):
+    # Gradients of different direction and range, so every scene has its own spread-out histogram.
+    ramp_x, ramp_y = np.meshgrid(np.linspace(0, 1, width), np.linspace(0, 1, height))
+    level = [20 + 100 * ramp_x, 120 + 120 * ramp_y, 60 + 180 * np.abs(ramp_x - ramp_y)][index]
+    return np.repeat(level[:, :, None], 3, axis=2)
+
+
+@pytest.fixture
+def cut_video(write_video):
+    # Hard cuts between the scenes and a slow drift of a few levels within each scene.
+    scenes = [scene(index) for index in range(SCENE_COUNT)]
+
+    def background(frame_num):
+        return (scenes[frame_num // SCENE_LENGTH] + frame_num % SCENE_LENGTH / 8).astype(np.uint8)
+    return write_video(FRAME_COUNT, name='cuts.mp4', background=background, code=False)
+
+
+def test_cuts_split_the_video_into_scenes(cut_video):
+    analysis = KeyframeAnalysis.analyze(cut_video, FRAME_COUNT, video_path=cut_video, workers=1)
+    assert analysis.segments == [(0, 40), (40, 80), (80, 120)]
+    assert sorted(keyframe['start'] for keyframe in analysis.keyframes) == [0, 40, 80]
+    for keyframe in analysis.keyframes:
+        assert keyframe['start'] <= keyframe['frame'] < keyframe['end']
+
+
+def test_chunked_and_parallel_analysis_match_a_single_pass(cut_video):
+    single = KeyframeAnalysis.analyze(cut_video, FRAME_COUNT, video_path=cut_video, workers=1,
+                                      chunk_samples=FRAME_COUNT)
+    chunked = KeyframeAnalysis.analyze(cut_video, FRAME_COUNT, video_path=cut_video, workers=1,
+                                       chunk_samples=25)
+    parallel = KeyframeAnalysis.analyze(cut_video, FRAME_COUNT, video_path=cut_video, workers=2,
+                                        chunk_samples=25)
+    assert chunked.segments == parallel.segments == single.segments
+    assert chunked.keyframes == parallel.keyframes == single.keyframes
+
+
+def test_step_and_saved_result(cut_video):
+    analysis = KeyframeAnalysis.analyze(cut_video, FRAME_COUNT, video_path=cut_video, step=4, workers=1,
+                                        min_segment=3)
+    assert [start for start, _ in analysis.segments] == [0, 40, 80]
+    assert all(frame % 4 == 0 for frame in analysis.frames())
+
+    loaded = KeyframeAnalysis.load(cut_video, FRAME_COUNT)
+    assert loaded.keyframes == analysis.keyframes and loaded.segments == analysis.segments
+    assert KeyframeAnalysis.load(cut_video, FRAME_COUNT + 1) is None
@@ -0,0 +1,77 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PointSet import PointSet
+
+
+def random_point_set(rng, count, cell_size):
+    point_set = PointSet(cell_size=cell_size)
+    names = rng.choice(['a', 'b', 'c'], size=count)
+    xy = rng.random((count, 2)) * 500
+    for name, (x, y) in zip(names, xy):
+        point_set.add(name, x, y)
+    return point_set, names, xy
+
+
+def brute_force_nearest(names, xy, x, y, max_distance=None, object_name=None):
+    mask = np.ones(len(xy), dtype=bool) if object_name is None else names == object_name
+    if not mask.any():
+        return None
+    distances = np.where(mask, np.hypot(xy[:, 0] - x, xy[:, 1] - y), np.inf)
+    best = int(np.argmin(distances))
+    if max_distance is not None and distances[best] > max_distance:
+        return None
+    return best
+
+
+@pytest.mark.parametrize('cell_size', [4.0, 32.0, 256.0])
+def test_nearest_matches_brute_force(cell_size):
+    rng = np.random.default_rng(0)
+    point_set, names, xy = random_point_set(rng, 200, cell_size)
+    for _ in range(300):
+        x, y = rng.random(2) * 800 - 150
+        object_name = rng.choice([None, 'a', 'b', 'c', 'missing'])
+        max_distance = rng.choice([None, 5.0, 50.0])
+        expected = brute_force_nearest(names, xy, x, y, max_distance, object_name)
+        found = point_set.nearest(x, y, max_distance, object_name)
+        if expected is None:
+            assert found is None
+        else:
+            assert found is not None
+            assert np.isclose(np.hypot(*(xy[found] - (x, y))), np.hypot(*(xy[expected] - (x, y))))
+
+
+def test_nearest_finds_point_on_bounding_box():
+    point_set = PointSet()
+    point_set.add('target', 0.1, 50)
+    point_set.add('other', 0.6, 50)
+    assert point_set.nearest(1.1, 50, object_name='target') == 0
+
+
+def test_in_rect_matches_brute_force():
+    rng = np.random.default_rng(1)
+    point_set, names, xy = random_point_set(rng, 300, 16.0)
+    for _ in range(200):
+        x0, y0, x1, y1 = rng.random(4) * 600 - 50
+        object_name = rng.choice([None, 'a', 'b'])
+        inside = ((xy[:, 0] >= min(x0, x1)) & (xy[:, 0] <= max(x0, x1))
+                  & (xy[:, 1] >= min(y0, y1)) & (xy[:, 1] <= max(y0, y1)))
+        if object_name is not None:
+            inside &= names == object_name
+        assert point_set.in_rect(x0, y0, x1, y1, object_name).tolist() == np.flatnonzero(inside).tolist()
+
+
+def test_queries_follow_edits():
+    point_set = PointSet()
+    point_set.add_many('a', [(10, 10), (20, 20), (30, 30)])
+    assert point_set.nearest(21, 21) == 1
+    point_set.move(1, 100, 100)
+    assert point_set.nearest(21, 21) in (0, 2)
+    point_set.remove([0])
+    assert point_set.in_rect(0, 0, 200, 200).tolist() == [0, 1]
+    assert point_set.nearest(99, 99) == 0
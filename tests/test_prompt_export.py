@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AnnotationStore import open_annotation_store
+from PromptExport import PromptReader, export_prompts
+
+VIDEO_NAME = 'clip.mp4'
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = open_annotation_store(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_roundtrip_matches_store(store, tmp_path):
+    rng = random.Random(0)
+    rows = [(VIDEO_NAME, rng.randrange(50), rng.choice(['door', 'hand', 'cup']), rng.randrange(1920),
+             rng.randrange(1080)) for _ in range(300)]
+    store.upsert(rows + [('other.mp4', 3, 'door', 1, 1)])
+    output_dir = str(tmp_path / 'prompts')
+    count = export_prompts(store, VIDEO_NAME, output_dir)
+
+    reader = PromptReader(output_dir)
+    assert count == len(set(rows)) and reader.video_name == VIDEO_NAME
+    assert list(reader.frames) == store.frames(VIDEO_NAME) and len(reader) == len(reader.frames)
+    for frame_number, object_ids, points, labels in reader:
+        exported = sorted((reader.object_name(object_id), int(x), int(y))
+                          for object_id, (x, y) in zip(object_ids.tolist(), points.tolist()))
+        stored = sorted((row[2], row[3], row[4]) for row in store.query_frame(VIDEO_NAME, frame_number))
+        assert exported == stored
+        assert list(object_ids) == sorted(object_ids) and set(labels.tolist()) == {1}
+
+
+def test_frame_lookup_and_ranges(store, tmp_path):
+    store.upsert([(VIDEO_NAME, 2, 'door', 1, 2), (VIDEO_NAME, 7, 'hand', 3, 4),
+                  (VIDEO_NAME, 7, 'door', 5, 6), (VIDEO_NAME, 9, 'hand', 7, 8)])
+    export_prompts(store, VIDEO_NAME, str(tmp_path / 'prompts'))
+    reader = PromptReader(str(tmp_path / 'prompts'))
+
+    object_ids, points, labels = reader.frame(7)
+    assert [reader.object_name(object_id) for object_id in object_ids] == ['door', 'hand']
+    assert points.tolist() == [[5, 6], [3, 4]] and labels.tolist() == [1, 1]
+    assert 7 in reader and 3 not in reader and 10 not in reader
+    assert [len(batch) for batch in reader.frame(3)] == [0, 0, 0]
+    assert [batch[0] for batch in reader.batches(3, 9)] == [7, 9]
+    assert [batch[0] for batch in reader.batches(last=7)] == [2, 7]
+
+
+def test_empty_export_and_missing_export(store, tmp_path):
+    assert export_prompts(store, VIDEO_NAME, str(tmp_path / 'prompts')) == 0
+    assert list(PromptReader(str(tmp_path / 'prompts'))) == []
+    with pytest.raises(ValueError):
+        PromptReader(str(tmp_path / 'missing'))
+
+
+def test_reexport_replaces_previous_export(store, tmp_path):
+    output_dir = str(tmp_path / 'prompts')
+    store.upsert([(VIDEO_NAME, 1, 'door', 1, 1), (VIDEO_NAME, 4, 'door', 2, 2)])
+    export_prompts(store, VIDEO_NAME, output_dir)
+    store.delete_frame(VIDEO_NAME, 1)
+    export_prompts(store, VIDEO_NAME, output_dir)
+    reader = PromptReader(output_dir)
+    assert list(reader.frames) == [4] and reader.frame(4)[1].tolist() == [[2, 2]]
@@ -0,0 +1,75 @@
+import os
+import random
+import sys
+
+import cv2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from SeekIndex import SeekIndex
+
+FRAME_COUNT = 90
+
+
+def test_build_indexes_every_frame_and_keyframes(write_video):
+    index = SeekIndex.build(write_video(FRAME_COUNT))
+    assert index.frame_count == FRAME_COUNT
+    assert index.keyframes[0] == 0 and 1 < len(index.keyframes) < FRAME_COUNT
+    assert all(index.keyframe_before(frame_num) <= frame_num for frame_num in range(FRAME_COUNT))
+    frame_nums = [index.frame_at_timestamp(timestamp) for timestamp in index.timestamps_ms]
+    assert frame_nums == list(range(FRAME_COUNT))
+
+
+def test_read_frame_is_exact_in_random_order(write_video, frame_code):
+    path = write_video(FRAME_COUNT)
+    index = SeekIndex.build(path)
+    cap = cv2.VideoCapture(path)
+    frame_nums = list(range(FRAME_COUNT)) * 2
+    random.Random(0).shuffle(frame_nums)
+    next_decode_frame = None
+    try:
+        for frame_num in frame_nums + [5, 6, 7, 30, 29]:
+            frame, next_decode_frame = index.read_frame(cap, frame_num, next_decode_frame)
+            assert frame_code(frame) == frame_num
+            assert next_decode_frame == frame_num + 1
+    finally:
+        cap.release()
+    assert index.read_frame(cap, FRAME_COUNT, 3) == (None, 3)
+
+
+class LateSeekingCapture:
+    # Lands a few frames after the requested one, like a backend that seeks by an inexact timestamp.
+    def __init__(self, path, late_by):
+        self.cap = cv2.VideoCapture(path)
+        self.late_by = late_by
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value + self.late_by if prop == cv2.CAP_PROP_POS_FRAMES else value)
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+
+def test_read_frame_corrects_inexact_seeks(write_video, frame_code):
+    path = write_video(FRAME_COUNT)
+    index = SeekIndex.build(path)
+    cap = LateSeekingCapture(path, late_by=3)
+    try:
+        for frame_num in [80, 40, 13, 12, 60, 61, 3]:
+            frame, _ = index.read_frame(cap, frame_num, None)
+            assert frame_code(frame) == frame_num
+    finally:
+        cap.release()
+
+
+def test_sidecar_is_reused_until_the_video_changes(write_video):
+    path = write_video(FRAME_COUNT)
+    assert SeekIndex.load(path) is None
+    index = SeekIndex.load_or_build(path)
+    loaded = SeekIndex.load(path)
+    assert loaded is not None and loaded.frame_count == index.frame_count
+    assert list(loaded.keyframes) == list(index.keyframes)
+
+    write_video(FRAME_COUNT // 2)
+    assert SeekIndex.load(path) is None
+    assert SeekIndex.load_or_build(path).frame_count == FRAME_COUNT // 2
@@ -0,0 +1,68 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from AnnotationStore import open_annotation_store, read_annotated_frames, STORE_BACKENDS
+
+VIDEOS = ('a.mp4', 'b.mp4')
+OBJECTS = ('door', 'hand', 'cup')
+
+
+def random_rows(rng, count):
+    return [(rng.choice(VIDEOS), rng.randrange(6), rng.choice(OBJECTS), rng.randrange(4), rng.randrange(4))
+            for _ in range(count)]
+
+
+def snapshot(store):
+    return {
+        'len': len(store),
+        'frames': {video: store.frames(video) for video in VIDEOS},
+        'by_frame': {(video, frame): store.query_frame(video, frame)
+                     for video in VIDEOS for frame in range(6)},
+        'by_object': {(video, name): store.query_object(video, name)
+                      for video in VIDEOS for name in OBJECTS}
+    }
+
+
+def random_operation(rng):
+    operation = rng.choice(('upsert', 'upsert', 'delete', 'delete_frame'))
+    if operation == 'delete_frame':
+        object_name = rng.choice(OBJECTS + (None,))
+        return operation, (rng.choice(VIDEOS), rng.randrange(6), object_name)
+    rows = random_rows(rng, rng.randrange(1, 8))
+    if operation == 'upsert':
+        # Coordinates and frame numbers given as floats or strings are stored as integers.
+        video_name, frame_number, object_name, x, y = rows[0]
+        rows.append((video_name, str(frame_number), object_name, x + 0.4, float(y)))
+    return operation, (rows,)
+
+
+def test_csv_and_sqlite_stores_agree(tmp_path):
+    stores = {}
+    for backend in STORE_BACKENDS:
+        os.makedirs(tmp_path / backend)
+        stores[backend] = open_annotation_store(str(tmp_path / backend), backend)
+    rng = random.Random(0)
+    try:
+        for step in range(200):
+            operation, args = random_operation(rng)
+            counts = [getattr(store, operation)(*args) for store in stores.values()]
+            assert counts[0] == counts[1], (step, operation)
+            assert snapshot(stores['csv']) == snapshot(stores['sqlite']), (step, operation)
+        expected = snapshot(stores['csv'])
+    finally:
+        for store in stores.values():
+            store.close()
+    assert expected['len'] > 0
+
+    for backend in STORE_BACKENDS:
+        reopened = open_annotation_store(str(tmp_path / backend), backend)
+        try:
+            assert snapshot(reopened) == expected
+        finally:
+            reopened.close()
+        for video_name in VIDEOS:
+            assert read_annotated_frames(str(tmp_path / backend), video_name, backend) == \
+                expected['frames'][video_name]